@@ -1,6 +1,7 @@
 -- ==========================================
 -- BUSINESS QUESTION 7:
 -- Best & Worst Performing Days for Each Stock
+-- Python equivalent: analytics/ranking.py (extremes_table, any N and date range)
 -- ==========================================
 
 WITH daily_changes AS (
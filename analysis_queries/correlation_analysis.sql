@@ -2,6 +2,7 @@
 -- BUSINESS QUESTION 5:
 -- How correlated are these stocks?
 -- Important for portfolio diversification
+-- Python equivalent: analytics/correlation.py (pairs_table)
 -- ==========================================
 
 WITH daily_returns AS (
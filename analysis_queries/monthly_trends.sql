@@ -2,6 +2,8 @@
 -- BUSINESS QUESTION 4:
 -- How do stocks perform by month?
 -- Identify seasonal patterns
+-- Python equivalent: analytics/periods.py (monthly_performance)
+-- Seasonality statistics: analytics/seasonality.py
 -- ==========================================
 
 WITH monthly_returns AS (
@@ -13,7 +15,11 @@ WITH monthly_returns AS (
         (LAST_VALUE(close_price) OVER w - FIRST_VALUE(close_price) OVER w) / 
         FIRST_VALUE(close_price) OVER w * 100 as monthly_return_pct
     FROM stock_prices 
-    WINDOW w AS (PARTITION BY ticker, DATE_TRUNC('month', date) ORDER BY date)
+    WINDOW w AS (
+        PARTITION BY ticker, DATE_TRUNC('month', date)
+        ORDER BY date
+        ROWS BETWEEN UNBOUNDED PRECEDING AND UNBOUNDED FOLLOWING
+    )
 ),
 monthly_avg AS (
     SELECT 
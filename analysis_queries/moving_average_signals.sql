@@ -2,6 +2,8 @@
 -- BUSINESS QUESTION 6:
 -- Moving Average Crossover Signals
 -- Technical analysis for buy/sell signals
+-- Python equivalent: analytics/rolling.py (signals_table)
+-- Backtest and parameter sweeps: analytics/backtest.py
 -- ==========================================
 
 WITH moving_averages AS (
@@ -2,6 +2,7 @@
 -- BUSINESS QUESTION 8:
 -- Quarterly Performance Trends
 -- Seasonal patterns and business cycle analysis
+-- Python equivalent: analytics/periods.py (quarterly_returns)
 -- ==========================================
 
 WITH quarterly_data AS (
@@ -12,7 +13,13 @@ WITH quarterly_data AS (
         FIRST_VALUE(close_price) OVER w as quarter_start,
         LAST_VALUE(close_price) OVER w as quarter_end
     FROM stock_prices
-    WINDOW w AS (PARTITION BY ticker, EXTRACT(YEAR FROM date), EXTRACT(QUARTER FROM date) ORDER BY date)
+    -- Full frame: without it LAST_VALUE is the current row and every day
+    -- becomes its own "quarter" row.
+    WINDOW w AS (
+        PARTITION BY ticker, EXTRACT(YEAR FROM date), EXTRACT(QUARTER FROM date)
+        ORDER BY date
+        ROWS BETWEEN UNBOUNDED PRECEDING AND UNBOUNDED FOLLOWING
+    )
 )
 SELECT 
     ticker,
@@ -37,4 +37,5 @@ SELECT
         ELSE 'POOR'
     END as risk_adjusted_grade
 FROM risk_metrics
-ORDER BY sharpe_ratio DESC;
\ No newline at end of file
+-- Equal (rounded) ratios: the less volatile stock first
+ORDER BY sharpe_ratio DESC, daily_volatility_pct;
\ No newline at end of file
@@ -2,29 +2,38 @@
 -- BUSINESS QUESTION 9:
 -- High Volume Days Analysis
 -- Identify unusual trading activity
+-- Each day is scored against the 20 trading days before it, not the
+-- full history, so a change in the normal volume level is not flagged
+-- for years afterwards.
+-- Python equivalent: analytics/volume.py (anomalies_table)
 -- ==========================================
 
 WITH volume_stats AS (
     SELECT 
         ticker,
-        AVG(volume) as avg_volume,
-        STDDEV(volume) as std_volume
+        date,
+        close_price,
+        volume,
+        AVG(volume) OVER w as avg_volume,
+        STDDEV(volume) OVER w as std_volume,
+        COUNT(volume) OVER w as baseline_days
     FROM stock_prices
-    GROUP BY ticker
+    WINDOW w AS (PARTITION BY ticker ORDER BY date ROWS BETWEEN 20 PRECEDING AND 1 PRECEDING)
 ),
 high_volume_days AS (
     SELECT 
-        p.ticker,
-        p.date,
-        p.close_price,
-        p.volume,
-        ROUND(p.volume / s.avg_volume, 2) as volume_ratio,
-        ROUND((p.volume - s.avg_volume) / s.std_volume, 2) as volume_z_score
-    FROM stock_prices p
-    JOIN volume_stats s ON p.ticker = s.ticker
-    WHERE p.volume > s.avg_volume + (s.std_volume * 2)  -- 2 standard deviations above average
+        ticker,
+        date,
+        close_price,
+        volume,
+        ROUND(volume / avg_volume, 2) as volume_ratio,
+        ROUND((volume - avg_volume) / std_volume, 2) as volume_z_score,
+        (volume - avg_volume) / std_volume as z_score
+    FROM volume_stats
+    WHERE baseline_days = 20
+      AND volume > avg_volume + (std_volume * 2)  -- 2 standard deviations above the trailing average
 )
-SELECT *
+SELECT ticker, date, close_price, volume, volume_ratio, volume_z_score
 FROM high_volume_days
-ORDER BY volume_z_score DESC
+ORDER BY z_score DESC, ticker, date
 LIMIT 20;
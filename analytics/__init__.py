@@ -0,0 +1 @@
+"""Shared data and analytics layer for the Streamlit dashboard and batch jobs."""
@@ -0,0 +1,252 @@
+"""Parameter sweeps of the moving-average crossover strategy.
+
+analysis_queries/moving_average_signals.sql lists 50/200 crossovers but never
+says what trading them would have earned. Here every (fast, slow) window pair
+and every threshold is evaluated on every ticker at once:
+
+    * all moving averages come from one cumulative sum of the price panel
+      (rolling._window_sums), so each extra window costs O(T) per ticker;
+    * the position is long while fast > slow * (1 + threshold) and, with
+      short=True, short while fast < slow * (1 - threshold), flat otherwise;
+    * the position is set at the close and earns the next day's return, and
+      each unit of position change costs `cost` (a fraction of the trade).
+
+Per (fast, slow, threshold, ticker) the sweep reports total and annualized
+return, Sharpe ratio, hit rate (share of days in the market with a positive
+return), trades, annual turnover and exposure. Tickers can be split across
+worker processes.
+
+    python -m analytics.backtest --fast 10:100:10 --slow 50:300:25 --thresholds 0 0.01 0.02
+"""
+
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from analytics.metrics import TRADING_DAYS, daily_returns, forward_fill, total_return
+from analytics.rolling import _as_2d, _window_sums
+
+THRESHOLDS = (0.0,)
+COLUMNS = ['fast', 'slow', 'threshold', 'ticker', 'Total Return %', 'Annual Return %',
+           'Sharpe Ratio', 'Hit Rate %', 'Trades', 'Annual Turnover', 'Exposure %',
+           'Buy & Hold %']
+
+
+def window_pairs(fasts, slows):
+    """Every (fast, slow) combination with fast < slow."""
+    return [(fast, slow) for fast in sorted(set(fasts)) for slow in sorted(set(slows)) if fast < slow]
+
+
+def positions(ma_fast, ma_slow, thresholds=THRESHOLDS, short=False):
+    """(tickers x thresholds x days) positions in {-1, 0, 1}; 0 until both averages exist.
+
+    ma_fast and ma_slow are (tickers x days).
+    """
+    thresholds = np.asarray(thresholds, dtype=np.float64)[:, None]
+    with np.errstate(invalid='ignore', divide='ignore'):
+        spread = (ma_fast / ma_slow - 1.0)[:, None, :]
+        pos = (spread > thresholds).view(np.int8)
+        if short:
+            pos = pos - (spread < -thresholds).view(np.int8)
+    return pos
+
+
+def _prefix(values):
+    """Running sums along the last axis with a leading 0, so [a, b) sums are p[b] - p[a]."""
+    out = np.zeros(values.shape[:-1] + (values.shape[-1] + 1,))
+    np.cumsum(values, axis=-1, out=out[..., 1:])
+    return out
+
+
+def prefix_sums(returns):
+    """Per-ticker prefix sums of everything evaluate() aggregates over holding periods.
+
+    returns is (tickers x days - 1) with NaN replaced by 0.
+    """
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return {
+            'r': _prefix(returns),
+            'r2': _prefix(returns * returns),
+            'up': _prefix(returns > 0),
+            'down': _prefix(returns < 0),
+            'log_long': _prefix(np.log1p(returns)),
+            'log_short': _prefix(np.log1p(-returns)),
+        }
+
+
+def evaluate(pos, returns, prefix, cost=0.0):
+    """Strategy statistics for positions held over the following day's return.
+
+    pos is (tickers x thresholds x days), returns the matching (tickers x
+    days - 1) return panel with NaN replaced by 0 and prefix its
+    prefix_sums(). A position only changes at a crossing, so each holding
+    period is summed from the prefix sums between consecutive changes and
+    only the trade days themselves (where the cost applies) are visited.
+    Returns {name: (thresholds x tickers) array}.
+    """
+    n_tickers, n_thresholds, _ = pos.shape
+    held = pos[:, :, :-1]
+    days = held.shape[2]
+    change = np.empty(held.shape, dtype=bool)
+    change[:, :, 0] = held[:, :, 0] != 0
+    np.not_equal(held[:, :, 1:], held[:, :, :-1], out=change[:, :, 1:])
+    tick, thr, day = np.nonzero(change)
+
+    group = tick * n_thresholds + thr
+    value = held[tick, thr, day].astype(np.int64)
+    previous = np.where(day > 0, held[tick, thr, np.maximum(day - 1, 0)], 0)
+    traded = np.abs(value - previous).astype(np.float64)
+    last = np.append(group[1:] != group[:-1], True)
+    stop = np.where(last, days, np.append(day[1:], days))
+
+    def between(name):
+        return prefix[name][tick, stop] - prefix[name][tick, day]
+
+    long, short = value == 1, value == -1
+    sign = value.astype(np.float64)
+    sum_r = sign * between('r')
+    sum_r2 = np.abs(sign) * between('r2')
+    hits = np.where(long, between('up'), 0.0) + np.where(short, between('down'), 0.0)
+    with np.errstate(invalid='ignore'):
+        log = np.where(long, between('log_long'), 0.0) + np.where(short, between('log_short'), 0.0)
+    in_market = np.abs(sign) * (stop - day)
+
+    if cost:
+        # Swap the gross return of each trade day for the return net of costs.
+        gross = sign * returns[tick, day]
+        net = gross - cost * traded
+        sum_r += net - gross
+        sum_r2 += net * net - gross * gross
+        hits += (net > 0).astype(np.float64) - (gross > 0)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            log += np.log1p(net) - np.log1p(gross)
+
+    size = n_tickers * n_thresholds
+    def total(weights):
+        return np.bincount(group, weights, minlength=size).reshape(n_tickers, n_thresholds).T
+
+    sum_r, sum_r2, hits, log = total(sum_r), total(sum_r2), total(hits), total(log)
+    trades, in_market = total(traded), total(in_market)
+    mean = sum_r / days
+    std = np.sqrt(np.maximum(sum_r2 - days * mean * mean, 0.0) / (days - 1))
+    growth = np.exp(log)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return {
+            'total_return': growth - 1.0,
+            'annual_return': growth ** (TRADING_DAYS / days) - 1.0,
+            'sharpe': np.where(std > 0, mean / std * np.sqrt(TRADING_DAYS), np.nan),
+            'hit_rate': np.where(in_market > 0, hits / in_market, np.nan),
+            'trades': trades,
+            'turnover': trades * TRADING_DAYS / days,
+            'exposure': in_market / days,
+        }
+
+
+def sweep_block(close, pairs, thresholds=THRESHOLDS, short=False, cost=0.0):
+    """Statistics for every pair and threshold on one block of tickers.
+
+    Returns {name: (pairs x thresholds x tickers) array}.
+    """
+    close = forward_fill(_as_2d(close))
+    returns = np.ascontiguousarray(np.nan_to_num(daily_returns(close)).T)
+    prefix = prefix_sums(returns)
+    windows = sorted({window for pair in pairs for window in pair})
+    # tickers x days, so each ticker's history is contiguous
+    averages = {window: np.ascontiguousarray((sums / window).T)
+                for window, sums in _window_sums(close, windows).items()}
+
+    stats = {}
+    for i, (fast, slow) in enumerate(pairs):
+        pos = positions(averages[fast], averages[slow], thresholds, short)
+        for name, values in evaluate(pos, returns, prefix, cost).items():
+            if name not in stats:
+                stats[name] = np.empty((len(pairs), len(thresholds), close.shape[1]))
+            stats[name][i] = values
+    stats['buy_hold'] = np.broadcast_to(total_return(close), stats['trades'].shape)
+    return stats
+
+
+def _run_block(args):
+    return sweep_block(*args)
+
+
+def sweep(tickers, close, fasts, slows, thresholds=THRESHOLDS, short=False, cost=0.0,
+          workers=1):
+    """One row per (fast, slow, threshold, ticker), in COLUMNS (returns in percent).
+
+    With workers > 1 the tickers are split into one block per worker.
+    """
+    close = _as_2d(close)
+    pairs = window_pairs(fasts, slows)
+    thresholds = tuple(float(t) for t in thresholds)
+    blocks = [block for block in np.array_split(np.arange(close.shape[1]), max(workers, 1)) if len(block)]
+    jobs = [(close[:, block], pairs, thresholds, short, cost) for block in blocks]
+    if len(jobs) == 1:
+        parts = [_run_block(jobs[0])]
+    else:
+        with ProcessPoolExecutor(len(jobs)) as pool:
+            parts = list(pool.map(_run_block, jobs))
+    stats = {name: np.concatenate([part[name] for part in parts], axis=2) for name in parts[0]}
+
+    shape = stats['trades'].shape
+    pair_index, threshold_index, ticker_index = (index.ravel() for index in np.indices(shape))
+    pair_array = np.asarray(pairs, dtype=np.int64).reshape(-1, 2)
+    return pd.DataFrame({
+        'fast': pair_array[pair_index, 0],
+        'slow': pair_array[pair_index, 1],
+        'threshold': np.asarray(thresholds)[threshold_index],
+        'ticker': np.asarray(tickers, dtype=object)[ticker_index],
+        'Total Return %': stats['total_return'].ravel() * 100,
+        'Annual Return %': stats['annual_return'].ravel() * 100,
+        'Sharpe Ratio': stats['sharpe'].ravel(),
+        'Hit Rate %': stats['hit_rate'].ravel() * 100,
+        'Trades': stats['trades'].ravel().astype(np.int64),
+        'Annual Turnover': stats['turnover'].ravel(),
+        'Exposure %': stats['exposure'].ravel() * 100,
+        'Buy & Hold %': stats['buy_hold'].ravel() * 100,
+    }, columns=COLUMNS)
+
+
+def leaderboard(results, by='Sharpe Ratio', top=None):
+    """Parameter sets ranked by their average across tickers."""
+    summary = (results.drop(columns='ticker')
+               .groupby(['fast', 'slow', 'threshold'], as_index=False).mean()
+               .sort_values(by, ascending=False, ignore_index=True))
+    return summary if top is None else summary.head(top)
+
+
+def _windows(spec):
+    """'50' or 'start:stop:step' (stop inclusive) as a list of window lengths."""
+    if ':' not in spec:
+        return [int(spec)]
+    start, stop, step = (int(part) for part in spec.split(':'))
+    return list(range(start, stop + 1, step))
+
+
+if __name__ == '__main__':
+    import argparse
+
+    from analytics import store
+
+    parser = argparse.ArgumentParser(description='Sweep MA crossover parameters over every ticker.')
+    parser.add_argument('--fast', nargs='+', default=['50'], help='windows or start:stop:step')
+    parser.add_argument('--slow', nargs='+', default=['200'], help='windows or start:stop:step')
+    parser.add_argument('--thresholds', nargs='+', type=float, default=list(THRESHOLDS))
+    parser.add_argument('--short', action='store_true', help='go short below the slow average')
+    parser.add_argument('--cost', type=float, default=0.0, help='cost per unit traded, e.g. 0.001')
+    parser.add_argument('--workers', type=int, default=1)
+    parser.add_argument('--top', type=int, default=10)
+    args = parser.parse_args()
+
+    _, tickers, close = store.open_store().panel('close')
+    fasts = [w for spec in args.fast for w in _windows(spec)]
+    slows = [w for spec in args.slow for w in _windows(spec)]
+    started = time.perf_counter()
+    results = sweep(tickers, close, fasts, slows, args.thresholds, args.short, args.cost, args.workers)
+    seconds = time.perf_counter() - started
+    combos = len(results) // len(tickers)
+    print(f'{combos:,} parameter sets x {len(tickers)} tickers in {seconds:.2f} s '
+          f'({len(results) / seconds:,.0f} backtests/s)')
+    print(leaderboard(results, top=args.top).round(2).to_string(index=False))
@@ -0,0 +1,196 @@
+"""Size-bounded LRU cache for computed metric tables.
+
+Entries are keyed by (metric name, ticker set, date range, data version,
+parameters). The data version is the price store's content hash, so a new
+CSV invalidates everything computed from the old data without any explicit
+flushing. One instance is shared by all dashboard pages (see
+analytics.dashboard.metric_cache), and it can also persist entries to disk
+so a restarted server starts warm. The disk tier is an LRU of its own under
+the same entry and byte limits (file sizes, recency kept in file mtimes), so
+pickles of superseded data versions age out instead of accumulating.
+"""
+
+import hashlib
+import os
+import pickle
+import sys
+import tempfile
+import threading
+from collections import OrderedDict
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+DEFAULT_MAX_ENTRIES = 256
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+
+
+def make_key(metric, tickers=None, start=None, end=None, version='', **params):
+    """Normalized, hashable cache key; ticker order does not matter."""
+    ticker_key = None if tickers is None else tuple(sorted(tickers))
+    start = None if start is None else str(np.datetime64(start, 'D'))
+    end = None if end is None else str(np.datetime64(end, 'D'))
+    return (metric, ticker_key, start, end, version, tuple(sorted(params.items())))
+
+
+def estimate_size(value):
+    """Approximate memory held by a cached value, in bytes."""
+    if isinstance(value, pd.DataFrame):
+        return int(value.memory_usage(index=True, deep=True).sum())
+    if isinstance(value, pd.Series):
+        return int(value.memory_usage(index=True, deep=True))
+    if isinstance(value, np.ndarray):
+        return value.nbytes
+    if isinstance(value, (tuple, list)):
+        return sys.getsizeof(value) + sum(estimate_size(item) for item in value)
+    if isinstance(value, dict):
+        return sys.getsizeof(value) + sum(estimate_size(item) for item in value.values())
+    return sys.getsizeof(value)
+
+
+class MetricCache:
+    """Thread-safe LRU cache bounded by entry count and by approximate bytes."""
+
+    def __init__(self, max_entries=DEFAULT_MAX_ENTRIES, max_bytes=DEFAULT_MAX_BYTES, disk_dir=None):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.disk_dir = Path(disk_dir) if disk_dir else None
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._disk = OrderedDict()
+        self._disk_bytes = 0
+        if self.disk_dir:
+            self.disk_dir.mkdir(parents=True, exist_ok=True)
+            self._load_disk_index()
+        self._lock = threading.RLock()
+        self.hits = 0
+        self.misses = 0
+        self.disk_hits = 0
+        self.evictions = 0
+
+    def _disk_path(self, key):
+        digest = hashlib.sha1(repr(key).encode()).hexdigest()
+        return self.disk_dir / f'{digest}.pkl'
+
+    def _load_disk_index(self):
+        files = []
+        for path in self.disk_dir.glob('*.pkl'):
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            files.append((stat.st_mtime, path.name, stat.st_size))
+        for _, name, size in sorted(files):
+            self._disk[name] = size
+            self._disk_bytes += size
+        self._prune_disk()
+
+    def _track_disk(self, name, size):
+        if name in self._disk:
+            self._disk_bytes -= self._disk.pop(name)
+        self._disk[name] = size
+        self._disk_bytes += size
+
+    def _forget_disk(self, name):
+        if name in self._disk:
+            self._disk_bytes -= self._disk.pop(name)
+
+    def _prune_disk(self):
+        while self._disk and (len(self._disk) > self.max_entries or self._disk_bytes > self.max_bytes):
+            name, size = self._disk.popitem(last=False)
+            self._disk_bytes -= size
+            (self.disk_dir / name).unlink(missing_ok=True)
+
+    def _store(self, key, value):
+        size = estimate_size(value)
+        if key in self._entries:
+            self._bytes -= self._entries.pop(key)[1]
+        if size > self.max_bytes:
+            # Caching it would flush everything else; hand it back uncached.
+            return
+        self._entries[key] = (value, size)
+        self._bytes += size
+        while self._entries and (len(self._entries) > self.max_entries or self._bytes > self.max_bytes):
+            _, (_, evicted) = self._entries.popitem(last=False)
+            self._bytes -= evicted
+            self.evictions += 1
+
+    def get(self, key, default=None):
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key][0]
+        if self.disk_dir:
+            path = self._disk_path(key)
+            try:
+                with open(path, 'rb') as fh:
+                    value = pickle.load(fh)
+                os.utime(path)
+            except FileNotFoundError:
+                # Never written, or pruned by another process sharing the directory.
+                with self._lock:
+                    self._forget_disk(path.name)
+            else:
+                with self._lock:
+                    self.disk_hits += 1
+                    self._store(key, value)
+                    if path.name in self._disk:
+                        self._disk.move_to_end(path.name)
+                return value
+        with self._lock:
+            self.misses += 1
+        return default
+
+    def put(self, key, value):
+        with self._lock:
+            self._store(key, value)
+        if self.disk_dir:
+            path = self._disk_path(key)
+            # A unique temporary name, so concurrent writers of one key never share a file.
+            with tempfile.NamedTemporaryFile(dir=self.disk_dir, prefix=path.stem, suffix='.tmp',
+                                             delete=False) as fh:
+                pickle.dump(value, fh, protocol=pickle.HIGHEST_PROTOCOL)
+            size = os.path.getsize(fh.name)
+            if size > self.max_bytes:
+                os.unlink(fh.name)
+                return
+            os.replace(fh.name, path)
+            with self._lock:
+                self._track_disk(path.name, size)
+                self._prune_disk()
+
+    def get_or_compute(self, key, compute):
+        """Return the cached value for key, computing and storing it on a miss."""
+        missing = object()
+        value = self.get(key, missing)
+        if value is missing:
+            value = compute()
+            self.put(key, value)
+        return value
+
+    def clear(self, disk=False):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+            if disk and self.disk_dir:
+                for path in self.disk_dir.glob('*.pkl'):
+                    path.unlink(missing_ok=True)
+                self._disk.clear()
+                self._disk_bytes = 0
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.disk_hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'bytes': self._bytes,
+                'disk_entries': len(self._disk),
+                'disk_bytes': self._disk_bytes,
+                'hits': self.hits,
+                'disk_hits': self.disk_hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'hit_rate': (self.hits + self.disk_hits) / lookups if lookups else 0.0,
+            }
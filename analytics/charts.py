@@ -0,0 +1,99 @@
+"""Rendered-chart cache for the dashboard.
+
+Pages describe a chart as a draw(fig) function plus the data it plots. The
+figure is built on a standalone matplotlib Figure (never registered with
+pyplot, so nothing accumulates in pyplot's figure manager), rasterized to PNG
+once, released, and the bytes are cached under a hash of the data and the
+chart parameters. Reruns with the same data reuse the PNG without touching
+matplotlib.
+
+lttb() thins long time series to a fixed number of points while keeping
+their visual shape, for charts like the 5-year price/MA plot.
+"""
+
+import hashlib
+import io
+
+import numpy as np
+import pandas as pd
+
+from analytics import instrument
+
+DEFAULT_DPI = 100
+
+
+def data_hash(*parts):
+    """Stable content hash of arrays, frames, series and plain values."""
+    digest = hashlib.sha1()
+    for part in parts:
+        if isinstance(part, (pd.DataFrame, pd.Series)):
+            digest.update(pd.util.hash_pandas_object(part, index=True).to_numpy().tobytes())
+            digest.update(repr(list(part.columns) if isinstance(part, pd.DataFrame) else part.name).encode())
+        elif isinstance(part, np.ndarray):
+            digest.update(str((part.dtype, part.shape)).encode())
+            digest.update(np.ascontiguousarray(part).tobytes())
+        else:
+            digest.update(repr(part).encode())
+        digest.update(b'|')
+    return digest.hexdigest()
+
+
+@instrument.timed('render.matplotlib')
+def render_png(draw, figsize, dpi=DEFAULT_DPI):
+    """Build a figure with draw(fig), rasterize it, and release it."""
+    from matplotlib.figure import Figure
+
+    fig = Figure(figsize=figsize, dpi=dpi)
+    try:
+        draw(fig)
+        buffer = io.BytesIO()
+        fig.savefig(buffer, format='png', dpi=dpi, bbox_inches='tight')
+        return buffer.getvalue()
+    finally:
+        fig.clear()
+        del fig
+
+
+def render(cache, name, draw, data, figsize, dpi=DEFAULT_DPI, **params):
+    """PNG bytes for a chart, from `cache` when the same data was drawn before.
+
+    `data` is a tuple of everything the chart depends on; `params` are extra
+    drawing options that change the output.
+    """
+    key = ('chart', name, data_hash(*data), tuple(figsize), dpi, tuple(sorted(params.items())))
+    return cache.get_or_compute(key, lambda: render_png(draw, figsize, dpi))
+
+
+def lttb(x, y, threshold):
+    """Largest-Triangle-Three-Buckets downsampling; returns selected indices.
+
+    Keeps the first and last points and, from each of threshold - 2 equal
+    buckets in between, the point forming the largest triangle with the
+    previously kept point and the mean of the next bucket. x must be numeric
+    and increasing (convert dates with .astype('int64') first). NaN points
+    are never selected.
+    """
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    valid = np.flatnonzero(~np.isnan(y))
+    n = len(valid)
+    if threshold >= n or threshold < 3:
+        return valid
+    xs, ys = x[valid], y[valid]
+
+    edges = np.linspace(1, n - 1, threshold - 1).astype(np.int64)
+    selected = np.empty(threshold, dtype=np.int64)
+    selected[0], selected[-1] = 0, n - 1
+    previous = 0
+    for i in range(threshold - 2):
+        lo, hi = edges[i], edges[i + 1]
+        if i + 2 < len(edges):
+            next_lo, next_hi = edges[i + 1], edges[i + 2]
+            avg_x, avg_y = xs[next_lo:next_hi].mean(), ys[next_lo:next_hi].mean()
+        else:
+            avg_x, avg_y = xs[-1], ys[-1]
+        px, py = xs[previous], ys[previous]
+        area = np.abs((px - avg_x) * (ys[lo:hi] - py) - (px - xs[lo:hi]) * (avg_y - py))
+        previous = lo + int(area.argmax())
+        selected[i + 1] = previous
+    return valid[selected]
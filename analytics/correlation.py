@@ -0,0 +1,152 @@
+"""Pairwise correlation of daily returns from matrix products.
+
+analysis_queries/correlation_analysis.sql self-joins the returns table on
+date, which is O(T * N^2) rows before aggregation. Here the full matrix comes
+from BLAS products of the (dates x tickers) returns matrix:
+
+- correlation_matrix: one product when there are no gaps, or a few masked
+  products giving pairwise-complete correlations and overlap counts.
+- blocked_correlation: the same, tile by tile, for universes too large to
+  standardize or multiply in one go; the output can be a np.memmap.
+- rolling_correlation: trailing-window correlation of every ticker against a
+  reference series from cumulative sums, O(T * N).
+"""
+
+import numpy as np
+import pandas as pd
+
+from analytics.rolling import _window_sums
+
+STRENGTH_BANDS = [
+    (0.7, 'HIGHLY CORRELATED'),
+    (0.3, 'MODERATELY CORRELATED'),
+    (0.0, 'WEAKLY CORRELATED'),
+]
+
+
+def _moments(x, y, mx, my):
+    """Pairwise-complete correlation and counts between column sets x and y.
+
+    x/y hold centred returns with missing values set to 0; mx/my are the
+    matching float masks (1.0 where a value is present).
+    """
+    n = mx.T @ my
+    sx = x.T @ my
+    sy = mx.T @ y
+    sxy = x.T @ y
+    sxx = (x * x).T @ my
+    syy = mx.T @ (y * y)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        corr = (n * sxy - sx * sy) / np.sqrt((n * sxx - sx * sx) * (n * syy - sy * sy))
+    return np.clip(corr, -1.0, 1.0), n
+
+
+def _prepare(returns):
+    returns = np.asarray(returns, dtype=np.float64)
+    mask = ~np.isnan(returns)
+    with np.errstate(invalid='ignore'):
+        centered = np.where(mask, returns - np.nanmean(returns, axis=0), 0.0)
+    return centered, mask
+
+
+def _standardize(centered):
+    """Scale centred, gap-free columns to unit norm so X.T @ X is the correlation."""
+    norms = np.sqrt(np.einsum('ij,ij->j', centered, centered))
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return centered / norms
+
+
+def correlation_matrix(returns):
+    """Full correlation matrix and pairwise overlap counts.
+
+    Returns (corr, counts); both are (tickers x tickers).
+    """
+    centered, mask = _prepare(returns)
+    if mask.all():
+        scaled = _standardize(centered)
+        corr = np.clip(scaled.T @ scaled, -1.0, 1.0)
+        counts = np.full(corr.shape, centered.shape[0], dtype=np.int64)
+        return corr, counts
+    weights = mask.astype(np.float64)
+    corr, counts = _moments(centered, centered, weights, weights)
+    return corr, counts.round().astype(np.int64)
+
+
+def blocked_correlation(returns, block=512, out=None):
+    """Tiled correlation matrix for large universes.
+
+    Only two column blocks of the returns are centred and multiplied at a
+    time, and only tiles on or above the diagonal are computed. Pass a
+    preallocated (N x N) array or np.memmap as `out` to keep the result on
+    disk. Returns the correlation matrix; overlap counts are not kept.
+    """
+    returns = np.asarray(returns)
+    n_tickers = returns.shape[1]
+    if out is None:
+        out = np.empty((n_tickers, n_tickers))
+    starts = range(0, n_tickers, block)
+
+    def tile(start):
+        centered, mask = _prepare(returns[:, start:start + block])
+        scaled = _standardize(centered) if mask.all() else None
+        return centered, mask.astype(np.float64), scaled
+
+    for i in starts:
+        xi, mi, si = tile(i)
+        for j in starts:
+            if j < i:
+                continue
+            xj, mj, sj = (xi, mi, si) if j == i else tile(j)
+            if si is not None and sj is not None:
+                corr = np.clip(si.T @ sj, -1.0, 1.0)
+            else:
+                corr, _ = _moments(xi, xj, mi, mj)
+            out[i:i + block, j:j + block] = corr
+            if j != i:
+                out[j:j + block, i:i + block] = corr.T
+    return out
+
+
+def rolling_correlation(returns, reference, window):
+    """Trailing-window correlation of every column against one series.
+
+    Five cumulative sums (x, y, x^2, y^2, xy) give each window in O(1), so
+    the whole (dates x tickers) result costs O(T * N). Windows with a missing
+    day on either side are NaN.
+    """
+    returns = np.asarray(returns, dtype=np.float64)
+    if returns.ndim == 1:
+        returns = returns[:, None]
+    y = np.asarray(reference, dtype=np.float64)[:, None]
+    sx = _window_sums(returns, [window])[window]
+    sxx = _window_sums(returns, [window], power=2)[window]
+    sxy = _window_sums(returns * y, [window])[window]
+    sy = _window_sums(y, [window])[window]
+    syy = _window_sums(y, [window], power=2)[window]
+    with np.errstate(invalid='ignore', divide='ignore'):
+        corr = (window * sxy - sx * sy) / np.sqrt(
+            (window * sxx - sx * sx) * (window * syy - sy * sy))
+    return np.clip(corr, -1.0, 1.0)
+
+
+def strength_label(value):
+    for threshold, label in STRENGTH_BANDS:
+        if value > threshold:
+            return label
+    return 'NO CORRELATION' if value == 0 else 'NEGATIVELY CORRELATED'
+
+
+def pairs_table(tickers, corr, counts):
+    """Unique pairs in the layout of data_outputs/stock_correlationscsv.csv."""
+    tickers = np.asarray(tickers)
+    order = np.argsort(tickers)
+    tickers, corr, counts = tickers[order], corr[np.ix_(order, order)], counts[np.ix_(order, order)]
+    a, b = np.triu_indices(len(tickers), k=1)
+    table = pd.DataFrame({
+        'stock_a': tickers[a],
+        'stock_b': tickers[b],
+        'correlation': corr[a, b].round(3),
+        'overlapping_days': counts[a, b],
+    })
+    table['correlation_strength'] = table['correlation'].map(strength_label)
+    return table.sort_values('correlation', ascending=False, ignore_index=True)
@@ -0,0 +1,306 @@
+"""Streamlit-side accessors shared by the dashboard pages."""
+
+import os
+import uuid
+
+import numpy as np
+import streamlit as st
+
+from analytics import (cache, charts, dateindex, instrument, montecarlo, portfolio, snapshot, store,
+                       views, volume)
+
+# Cached metrics that only read the store; their spans are 'load.*' rather than 'compute.*'.
+LOAD_METRICS = {'panel', 'portfolio_returns'}
+# Shorter sidebar date ranges are ignored: most metrics need a few weeks of returns.
+MIN_WINDOW_DAYS = 30
+
+
+@st.cache_resource
+def price_store():
+    """One memory-mapped store per server process, rebuilt from CSVs if stale."""
+    with instrument.span('load.store'):
+        return store.open_store()
+
+
+@st.cache_resource
+def date_index():
+    """Binary-search date windows over price_store()."""
+    return dateindex.DateIndex(price_store())
+
+
+@st.cache_resource
+def metric_cache():
+    """Process-wide metric cache; DASHBOARD_CACHE_DIR enables disk persistence."""
+    return cache.MetricCache(
+        max_entries=int(os.environ.get('DASHBOARD_CACHE_ENTRIES', cache.DEFAULT_MAX_ENTRIES)),
+        max_bytes=int(os.environ.get('DASHBOARD_CACHE_BYTES', cache.DEFAULT_MAX_BYTES)),
+        disk_dir=os.environ.get('DASHBOARD_CACHE_DIR') or None,
+    )
+
+
+@st.cache_resource
+def chart_cache():
+    """Rendered PNGs shared by all sessions; bounded separately from metrics."""
+    return cache.MetricCache(
+        max_entries=int(os.environ.get('DASHBOARD_CHART_ENTRIES', 512)),
+        max_bytes=int(os.environ.get('DASHBOARD_CHART_BYTES', 64 * 1024 * 1024)),
+    )
+
+
+@st.cache_resource
+def snapshot_watcher():
+    """Follows the newest bundle in DASHBOARD_SNAPSHOT_DIR (default data/snapshots)."""
+    return snapshot.Watcher(os.environ.get('DASHBOARD_SNAPSHOT_DIR') or snapshot.SNAPSHOT_DIR)
+
+
+@st.cache_resource(max_entries=8)
+def snapshot_matches_store(bundle_version, store_version):
+    """Whether a bundle fits the price store, re-opening the store once if the bundle is newer."""
+    if price_store().version != store_version:
+        if store.PriceStore(price_store().root).version == store_version:
+            price_store.clear()
+            date_index.clear()
+    return price_store().version == store_version
+
+
+def current_snapshot():
+    """The newest published bundle, or None if there is none for the current data."""
+    bundle = snapshot_watcher().current()
+    if bundle is None or not snapshot_matches_store(bundle.version, bundle.store_version):
+        return None
+    return bundle
+
+
+def cached(metric, compute, tickers=None, start=None, end=None, **params):
+    """Look up metric in the published snapshot, then in the shared cache.
+
+    Whole-store views with the default parameters come precomputed from the
+    bundle; everything else is computed once per data version and cached.
+    Values are shared between sessions; treat them as read-only.
+    """
+    if tickers is None and start is None and end is None:
+        bundle = current_snapshot()
+        value = None if bundle is None else bundle.get(metric, **params)
+        if value is not None:
+            if instrument.enabled():
+                instrument.count('snapshot.hit', session=session_id())
+            return value
+
+    key = cache.make_key(metric, tickers, start, end, price_store().version, **params)
+    if not instrument.enabled():
+        return metric_cache().get_or_compute(key, compute)
+
+    session = session_id()
+    missed = []
+    def timed_compute():
+        missed.append(True)
+        with instrument.span(f"{'load' if metric in LOAD_METRICS else 'compute'}.{metric}", session):
+            return compute()
+    value = metric_cache().get_or_compute(key, timed_compute)
+    instrument.count('cache.miss' if missed else 'cache.hit', session=session)
+    return value
+
+
+def field_panel(field, start=None, end=None, tickers=None):
+    """(dates, tickers, values) of one price field, optionally for a window and ticker subset.
+
+    The whole-store panel is cached once; a date window is a view of it, so
+    only a ticker subset copies (and is not cached).
+    """
+    panel = cached('panel', lambda: price_store().panel(field), field=field)
+    if start is None and end is None and tickers is None:
+        return panel
+    return dateindex.panel_window(panel, start, end, tickers)
+
+
+def close_panel(start=None, end=None, tickers=None):
+    """(dates, tickers, closes), whole store by default."""
+    return field_panel('close', start, end, tickers)
+
+
+def panels(start=None, end=None, tickers=None):
+    """field -> field_panel(field, start, end, tickers), the `panel` argument of analytics.views."""
+    return lambda field: field_panel(field, start, end, tickers)
+
+
+def with_benchmark(tickers, benchmark='SPY'):
+    """Ticker subset in store order, always including the benchmark (None: all tickers)."""
+    if tickers is None:
+        return None
+    keep = set(tickers) | {benchmark}
+    return [ticker for ticker in price_store().tickers if ticker in keep]
+
+
+def metrics_table(benchmark='SPY', start=None, end=None, tickers=None):
+    """Performance and risk metrics per ticker over the window (benchmark always included)."""
+    tickers = with_benchmark(tickers, benchmark)
+    def compute():
+        return views.metrics_table(panels(start, end, tickers), benchmark)
+    return cached('metrics_table', compute, tickers, start, end, benchmark=benchmark)
+
+
+def overview(benchmark='SPY'):
+    """The landing page's headline figures (analytics.overview.summary) for the whole store."""
+    return cached('overview', lambda: views.overview_figures(panels(), benchmark), benchmark=benchmark)
+
+
+def technical_table(fast=50, slow=200, start=None, end=None, tickers=None):
+    """RSI/MACD/Bollinger/ATR readings and signals as of the window's last day."""
+    def compute():
+        return views.technical_table(panels(start, end, tickers), fast, slow)
+    return cached('technical_table', compute, tickers, start, end, fast=fast, slow=slow)
+
+
+def crossover_backtest(fasts=views.SWEEP_FASTS, slows=views.SWEEP_SLOWS,
+                       thresholds=views.SWEEP_THRESHOLDS, short=False, cost=0.0, start=None, end=None,
+                       tickers=None):
+    """backtest.sweep() over the close panel, one row per parameter set and ticker."""
+    def compute():
+        return views.crossover_backtest(panels(start, end, tickers), fasts, slows, thresholds, short, cost)
+    return cached('crossover_backtest', compute, tickers, start, end, fasts=tuple(fasts),
+                  slows=tuple(slows), thresholds=tuple(thresholds), short=short, cost=cost)
+
+
+def volume_zscores(window=volume.WINDOW, method='rolling', start=None, end=None, tickers=None):
+    """(dates, tickers, z, ratio) of every day's volume against its trailing baseline."""
+    def compute():
+        return views.volume_zscores(panels(start, end, tickers), window, method)
+    return cached('volume_zscores', compute, tickers, start, end, window=window, method=method)
+
+
+def volume_anomalies(window=volume.WINDOW, method='rolling', k=volume.TOP_K, start=None, end=None,
+                     tickers=None):
+    """Top-k volume anomalies across the tickers (high_volume_analysis layout)."""
+    def compute():
+        return views.volume_anomalies(panels(start, end, tickers), window, method, k)
+    return cached('volume_anomalies', compute, tickers, start, end, window=window, method=method,
+                  k=k)
+
+
+def seasonality_table(by='month', start=None, end=None, tickers=None):
+    """Return statistics by calendar month, quarter, weekday or turn of month."""
+    def compute():
+        return views.seasonality_table(panels(start, end, tickers), by)
+    return cached('seasonality_table', compute, tickers, start, end, by=by)
+
+
+def correlation_matrix(start=None, end=None, tickers=None, benchmark='SPY'):
+    """Correlation of daily returns between every pair of tickers, as a DataFrame."""
+    tickers = with_benchmark(tickers, benchmark)
+    def compute():
+        return views.correlation_matrix(panels(start, end, tickers))
+    return cached('correlation_matrix', compute, tickers, start, end)
+
+
+def rolling_correlation(window, benchmark='SPY', start=None, end=None, tickers=None):
+    """Trailing-window correlation of every ticker's returns with the benchmark's."""
+    tickers = with_benchmark(tickers, benchmark)
+    def compute():
+        return views.rolling_correlation(panels(start, end, tickers), window, benchmark)
+    return cached('rolling_correlation', compute, tickers, start, end, window=window,
+                  benchmark=benchmark)
+
+
+def portfolio_returns(benchmark='SPY', start=None, end=None, tickers=None):
+    """(tickers, daily returns on fully populated days, benchmark returns or None)."""
+    tickers = with_benchmark(tickers, benchmark)
+    def compute():
+        return views.portfolio_returns(panels(start, end, tickers), benchmark)
+    return cached('portfolio_returns', compute, tickers, start, end, benchmark=benchmark)
+
+
+def portfolio_risk(weights, benchmark='SPY', start=None, end=None, tickers=None):
+    """Risk of one or more weight vectors over the tickers of portfolio_returns()."""
+    weights = portfolio.normalize(weights)
+    def compute():
+        _, returns, bench = portfolio_returns(benchmark, start, end, tickers)
+        return portfolio.portfolio_risk(returns, weights, bench)
+    return cached('portfolio_risk', compute, tickers, start, end,
+                  weights=tuple(map(tuple, weights.round(6))), benchmark=benchmark)
+
+
+def portfolio_candidates(n=views.CANDIDATES, seed=0, benchmark='SPY', start=None, end=None,
+                         tickers=None):
+    """(weights, risk) for n random long-only portfolios."""
+    def compute():
+        return views.portfolio_candidates(portfolio_returns(benchmark, start, end, tickers), n, seed)
+    return cached('portfolio_candidates', compute, tickers, start, end, n=n, seed=seed,
+                  benchmark=benchmark)
+
+
+def portfolio_simulation(weights, n_paths=100_000, horizon=montecarlo.HORIZON,
+                         method='bootstrap', seed=0, bins=60, start=None, end=None, tickers=None):
+    """(summary, return histogram, drawdown histogram) of simulated paths.
+
+    Only the summary and (counts, edges) histograms are cached, not the
+    per-path arrays.
+    """
+    weights = portfolio.normalize(weights)[0]
+    def compute():
+        _, returns, _ = portfolio_returns(start=start, end=end, tickers=tickers)
+        result = montecarlo.simulate(returns, weights, n_paths, horizon, method, seed)
+        return (montecarlo.summarize(result),
+                np.histogram(result['horizon_return'], bins=bins),
+                np.histogram(result['max_drawdown'], bins=bins))
+    return cached('portfolio_simulation', compute, tickers, start, end,
+                  weights=tuple(weights.round(6)), n_paths=n_paths, horizon=horizon,
+                  method=method, seed=seed, bins=bins)
+
+
+def sidebar_filters():
+    """Date-range and ticker filters in the sidebar; returns (start, end, tickers).
+
+    Each is None when it does not narrow anything, so unfiltered views share
+    cache entries. The choices live in st.session_state and carry over
+    between pages.
+    """
+    index = date_index()
+    first, last = (day.astype(object) for day in index.span())
+    state = st.session_state
+    st.sidebar.header("Filters")
+    chosen = st.sidebar.date_input("Date range", value=state.get('filter_range', (first, last)),
+                                   min_value=first, max_value=last)
+    if len(chosen) == 2:
+        state['filter_range'] = tuple(chosen)
+    start, end = state.get('filter_range', (first, last))
+    picked = st.sidebar.multiselect("Securities", index.tickers,
+                                    default=state.get('filter_tickers', []),
+                                    help="Leave empty for all; SPY stays in as the benchmark.")
+    state['filter_tickers'] = picked
+
+    if (end - start).days < MIN_WINDOW_DAYS:
+        st.sidebar.warning(f"Choose at least {MIN_WINDOW_DAYS} days; showing the full history.")
+        start, end = first, last
+    tickers = picked if picked and len(picked) < len(index.tickers) else None
+    return (None if start <= first else start, None if end >= last else end,
+            None if tickers is None else [t for t in index.tickers if t in set(tickers)])
+
+
+def show_chart(name, draw, data, figsize, **params):
+    """Render draw(fig) once per distinct data/params and display the PNG."""
+    if not instrument.enabled():
+        st.image(charts.render(chart_cache(), name, draw, data, figsize, **params))
+        return
+
+    session = session_id()
+    drawn = []
+    def timed_draw(fig):
+        drawn.append(True)
+        draw(fig)
+    with instrument.span(f'render.{name}', session):
+        png = charts.render(chart_cache(), name, timed_draw, data, figsize, **params)
+    instrument.count('chart.miss' if drawn else 'chart.hit', session=session)
+    st.image(png)
+
+
+def session_id():
+    """Short id of the current browser session, used to tag its spans."""
+    return st.session_state.setdefault('diagnostics_session', uuid.uuid4().hex[:8])
+
+
+def cache_stats():
+    return metric_cache().stats()
+
+
+def chart_cache_stats():
+    return chart_cache().stats()
@@ -0,0 +1,155 @@
+"""Date-window lookups by binary search, returning views instead of copies.
+
+Each ticker's rows in the price store are one ascending segment of the
+concatenated columns, so the rows inside a [start, end] window are a
+contiguous range of that segment. DateIndex finds the range for every
+ticker at once with a segmented binary search (log2 of the longest segment
+vectorized steps over all tickers) and hands out slices of the
+memory-mapped columns.
+
+Panels from PriceStore.panel() share one trading calendar, and a date's
+position in that calendar is its row offset in every column of the value
+matrix. A window over a panel is therefore two searchsorted calls on the
+calendar and a basic row slice; only a ticker selection copies.
+
+Windows include both ends; None leaves that side open.
+
+    python -m analytics.dateindex --start 2022-01-01 --end 2023-06-30
+"""
+
+import numpy as np
+import pandas as pd
+
+from analytics import store
+
+
+def _day(value):
+    return None if value is None else np.datetime64(value, 'D')
+
+
+def calendar_window(calendar, start=None, end=None):
+    """slice of calendar positions with start <= date <= end."""
+    lo = 0 if start is None else int(np.searchsorted(calendar, _day(start), 'left'))
+    hi = len(calendar) if end is None else int(np.searchsorted(calendar, _day(end), 'right'))
+    return slice(lo, max(lo, hi))
+
+
+def segment_search(values, starts, stops, target, side='left'):
+    """np.searchsorted of target in every ascending segment values[starts[i]:stops[i]].
+
+    Returns absolute row numbers; only the probed rows of values are read.
+    """
+    lo = np.array(starts, dtype=np.int64)
+    hi = np.array(stops, dtype=np.int64)
+    active = np.flatnonzero(lo < hi)
+    while active.size:
+        mid = (lo[active] + hi[active]) // 2
+        probe = values[mid]
+        right = probe < target if side == 'left' else probe <= target
+        lo[active[right]] = mid[right] + 1
+        hi[active[~right]] = mid[~right]
+        active = active[lo[active] < hi[active]]
+    return lo
+
+
+def panel_window(panel, start=None, end=None, tickers=None):
+    """(dates, tickers, values) of a panel restricted to a window and a ticker subset.
+
+    Without tickers the returned arrays are views of the panel's.
+    """
+    dates, names, values = panel
+    rows = calendar_window(dates, start, end)
+    if tickers is None:
+        return dates[rows], names, values[rows]
+    position = {name: i for i, name in enumerate(names)}
+    missing = [t for t in tickers if t not in position]
+    if missing:
+        raise KeyError(f'Unknown tickers: {missing}')
+    tickers = list(tickers)
+    return dates[rows], tickers, values[rows][:, [position[t] for t in tickers]]
+
+
+class DateIndex:
+    """Per-ticker date windows over a PriceStore."""
+
+    def __init__(self, price_store):
+        self.store = price_store
+        self.tickers = list(price_store.tickers)
+        self.starts, self.stops = price_store.segments()
+        self.dates = price_store.field('date')
+        self._position = {ticker: i for i, ticker in enumerate(self.tickers)}
+
+    def _select(self, tickers):
+        if tickers is None:
+            return np.arange(len(self.tickers))
+        try:
+            return np.array([self._position[t] for t in tickers], dtype=np.int64)
+        except KeyError as exc:
+            raise KeyError(f'Unknown ticker: {exc.args[0]}') from None
+
+    def rows(self, start=None, end=None, tickers=None):
+        """(row starts, row stops) of each ticker's window, absolute in the store columns."""
+        idx = self._select(tickers)
+        starts, stops = self.starts[idx], self.stops[idx]
+        if start is not None:
+            starts = segment_search(self.dates, starts, stops, _day(start), 'left')
+        if end is not None:
+            stops = segment_search(self.dates, starts, stops, _day(end), 'right')
+        return starts, stops
+
+    def span(self, tickers=None):
+        """(first, last) date held for the tickers, as datetime64[D]."""
+        starts, stops = self.rows(tickers=tickers)
+        held = stops > starts
+        return self.dates[starts[held]].min(), self.dates[stops[held] - 1].max()
+
+    def column(self, ticker, field, start=None, end=None):
+        """Zero-copy view of one ticker's field inside the window."""
+        starts, stops = self.rows(start, end, [ticker])
+        return self.store.field(field)[starts[0]:stops[0]]
+
+    def panel(self, field='close', start=None, end=None, tickers=None):
+        """PriceStore.panel() built from the window's rows only.
+
+        Returns (dates, tickers, values) on the calendar of the dates inside
+        the window, so the cost follows the window, not the history.
+        """
+        tickers = list(self.tickers if tickers is None else tickers)
+        starts, stops = self.rows(start, end, tickers)
+        lengths = stops - starts
+        first = np.cumsum(lengths) - lengths
+        rows = np.arange(lengths.sum()) + np.repeat(starts - first, lengths)
+        window_dates = self.dates[rows]
+        calendar = np.unique(window_dates)
+        values = np.full((len(calendar), len(tickers)), np.nan)
+        values[np.searchsorted(calendar, window_dates),
+               np.repeat(np.arange(len(tickers)), lengths)] = self.store.field(field)[rows]
+        return calendar, tickers, values
+
+    def frame(self, ticker, start=None, end=None):
+        starts, stops = self.rows(start, end, [ticker])
+        rows = slice(starts[0], stops[0])
+        data = {'Date': self.dates[rows]}
+        for field in store.FIELDS:
+            data[field.capitalize()] = self.store.field(field)[rows]
+        return pd.DataFrame(data)
+
+
+if __name__ == '__main__':
+    import argparse
+    import time
+
+    parser = argparse.ArgumentParser(description='Rows per ticker inside a date window.')
+    parser.add_argument('--start')
+    parser.add_argument('--end')
+    parser.add_argument('--tickers', nargs='+')
+    args = parser.parse_args()
+
+    index = DateIndex(store.open_store())
+    started = time.perf_counter()
+    starts, stops = index.rows(args.start, args.end, args.tickers)
+    seconds = time.perf_counter() - started
+    for ticker, lo, hi in zip(args.tickers or index.tickers, starts, stops):
+        first, last = (index.dates[lo], index.dates[hi - 1]) if hi > lo else ('-', '-')
+        print(f'{ticker:<8} {hi - lo:>6} rows  {first} .. {last}')
+    print(f'window lookup: {seconds * 1e6:.0f} us')
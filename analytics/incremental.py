@@ -0,0 +1,289 @@
+"""Append-only metric state that advances one trading day at a time.
+
+A new daily bar updates every ticker in O(1): Welford mean/variance of daily
+returns and of volume, running 50/200-day sums over a ring buffer of closes,
+and a running peak for drawdown. Volume anomalies are scored as the bars
+arrive (analytics.volume.VolumeAnomalyStream, keeping a running top-K). The
+state is saved between runs so the end-of-day batch only feeds the new rows;
+verify() recomputes everything from the full history to check the
+accumulators.
+
+    python -m analytics.incremental            # apply new store rows to the saved state
+    python -m analytics.incremental --verify   # ...and compare with a full recompute
+"""
+
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from analytics import dateindex, metrics, store, volume
+
+MA_FAST = 50
+MA_SLOW = 200
+STATE_PATH = store.STORE_DIR / 'streaming_state.npz'
+ANOMALY_PREFIX = 'anomaly_'
+
+_STATE_ARRAYS = (
+    'last_close', 'bars', 'ret_count', 'ret_mean', 'ret_m2', 'ring', 'sum_fast', 'sum_slow',
+    'prev_diff', 'peak', 'max_drawdown', 'vol_count', 'vol_mean', 'vol_m2', 'last_volume',
+)
+
+
+class StreamingMetrics:
+    """Streaming accumulators for a fixed ticker universe.
+
+    All state is held in arrays with one slot per ticker, so update() costs a
+    handful of vector operations regardless of history length.
+    """
+
+    def __init__(self, tickers, fast=MA_FAST, slow=MA_SLOW):
+        if not 0 < fast < slow:
+            raise ValueError('fast window must be positive and shorter than slow window')
+        n = len(tickers)
+        self.tickers = list(tickers)
+        self.fast = fast
+        self.slow = slow
+        self.last_date = None
+        self.last_close = np.full(n, np.nan)
+        self.bars = np.zeros(n, dtype=np.int64)
+        self.ret_count = np.zeros(n, dtype=np.int64)
+        self.ret_mean = np.zeros(n)
+        self.ret_m2 = np.zeros(n)
+        self.ring = np.zeros((slow, n))
+        self.sum_fast = np.zeros(n)
+        self.sum_slow = np.zeros(n)
+        self.prev_diff = np.full(n, np.nan)
+        self.peak = np.full(n, np.nan)
+        self.max_drawdown = np.zeros(n)
+        self.vol_count = np.zeros(n, dtype=np.int64)
+        self.vol_mean = np.zeros(n)
+        self.vol_m2 = np.zeros(n)
+        self.last_volume = np.full(n, np.nan)
+        self.anomalies = volume.VolumeAnomalyStream(tickers)
+
+    @staticmethod
+    def _welford(mask, x, count, mean, m2):
+        count[mask] += 1
+        delta = x[mask] - mean[mask]
+        mean[mask] += delta / count[mask]
+        m2[mask] += delta * (x[mask] - mean[mask])
+
+    def update(self, close, volume=None, date=None):
+        """Apply one bar per ticker; NaN marks a ticker with no bar that day.
+
+        Returns the crossover state for this bar: +1 where the fast average
+        crossed above the slow one, -1 where it crossed below, 0 otherwise.
+        """
+        close = np.asarray(close, dtype=np.float64)
+        has_bar = ~np.isnan(close)
+        cols = np.flatnonzero(has_bar)
+        c = close[cols]
+
+        has_prev = has_bar & ~np.isnan(self.last_close)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            ret = close / self.last_close - 1.0
+        self._welford(has_prev, ret, self.ret_count, self.ret_mean, self.ret_m2)
+        self.last_close[cols] = c
+
+        bars = self.bars[cols]
+        slot = bars % self.slow
+        leaving_slow = np.where(bars >= self.slow, self.ring[slot, cols], 0.0)
+        leaving_fast = np.where(bars >= self.fast,
+                                self.ring[(bars - self.fast) % self.slow, cols], 0.0)
+        self.sum_slow[cols] += c - leaving_slow
+        self.sum_fast[cols] += c - leaving_fast
+        self.ring[slot, cols] = c
+        self.bars[cols] = bars + 1
+
+        peak = np.fmax(self.peak[cols], c)
+        self.peak[cols] = peak
+        self.max_drawdown[cols] = np.minimum(self.max_drawdown[cols], c / peak - 1.0)
+
+        if volume is not None:
+            volume = np.asarray(volume, dtype=np.float64)
+            has_volume = ~np.isnan(volume)
+            self._welford(has_volume, volume, self.vol_count, self.vol_mean, self.vol_m2)
+            self.last_volume[has_volume] = volume[has_volume]
+            self.anomalies.update(volume, close, date)
+
+        diff = self.ma_fast - self.ma_slow
+        crossed = np.zeros(len(self.tickers), dtype=np.int8)
+        with np.errstate(invalid='ignore'):
+            crossed[(diff > 0) & (self.prev_diff <= 0)] = 1
+            crossed[(diff < 0) & (self.prev_diff >= 0)] = -1
+        self.prev_diff[cols] = diff[cols]
+        if date is not None:
+            self.last_date = np.datetime64(date, 'D')
+        return crossed
+
+    def update_many(self, dates, closes, volumes=None):
+        """Replay several rows in date order (used to seed or catch up)."""
+        for i in range(len(dates)):
+            self.update(closes[i], None if volumes is None else volumes[i], dates[i])
+
+    @property
+    def ma_fast(self):
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return np.where(self.bars >= self.fast, self.sum_fast / self.fast, np.nan)
+
+    @property
+    def ma_slow(self):
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return np.where(self.bars >= self.slow, self.sum_slow / self.slow, np.nan)
+
+    @property
+    def ret_std(self):
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return np.sqrt(self.ret_m2 / (self.ret_count - 1))
+
+    @property
+    def vol_std(self):
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return np.sqrt(self.vol_m2 / (self.vol_count - 1))
+
+    def snapshot(self):
+        """Current metrics per ticker, in the units of the SQL outputs.
+
+        sharpe_ratio is the daily ratio of sharp_ratio_results (mean / std of
+        daily returns), not annualized.
+        """
+        std = self.ret_std
+        with np.errstate(invalid='ignore', divide='ignore'):
+            sharpe = self.ret_mean / std
+            volume_z = (self.last_volume - self.vol_mean) / self.vol_std
+        return pd.DataFrame({
+            'ticker': self.tickers,
+            'trading_days': self.ret_count,
+            'avg_daily_return_pct': self.ret_mean * 100,
+            'daily_volatility_pct': std * 100,
+            'annual_volatility_pct': std * np.sqrt(metrics.TRADING_DAYS) * 100,
+            'sharpe_ratio': sharpe,
+            'ma_50': self.ma_fast,
+            'ma_200': self.ma_slow,
+            'max_drawdown_pct': self.max_drawdown * 100,
+            'avg_volume': self.vol_mean,
+            'std_volume': self.vol_std,
+            'volume_z_score': volume_z,
+        })
+
+    def save(self, path=STATE_PATH):
+        path = Path(path)
+        tmp = path.with_name(path.name + '.tmp.npz')
+        np.savez(tmp, tickers=np.array(self.tickers), windows=np.array([self.fast, self.slow]),
+                 last_date=np.array(self.last_date, dtype='datetime64[D]'),
+                 **{name: getattr(self, name) for name in _STATE_ARRAYS},
+                 **{ANOMALY_PREFIX + name: value for name, value in self.anomalies.arrays().items()})
+        tmp.replace(path)
+
+    @classmethod
+    def load(cls, path=STATE_PATH):
+        with np.load(path) as data:
+            fast, slow = (int(w) for w in data['windows'])
+            state = cls(data['tickers'].tolist(), fast, slow)
+            for name in _STATE_ARRAYS:
+                setattr(state, name, data[name].copy())
+            last_date = data['last_date'][()]
+            state.last_date = None if np.isnat(last_date) else last_date
+            anomaly = {name[len(ANOMALY_PREFIX):]: data[name] for name in data.files
+                       if name.startswith(ANOMALY_PREFIX)}
+            # State saved before anomalies were tracked; catch_up() reseeds it.
+            state.anomalies = volume.VolumeAnomalyStream.from_arrays(anomaly) if anomaly else None
+        return state
+
+    def verify(self, closes, volumes=None):
+        """Largest absolute gap between the accumulators and a full recompute.
+
+        closes/volumes are the complete (dates x tickers) history that was fed
+        through update(). Returns a dict of metric name -> max abs difference.
+        """
+        closes = np.asarray(closes, dtype=np.float64)
+        valid = ~np.isnan(closes)
+        filled = metrics.forward_fill(closes)
+        returns = filled[1:] / filled[:-1] - 1.0
+        returns[~valid[1:]] = np.nan
+
+        # Mean of the last `window` observed closes per ticker.
+        from_end = np.cumsum(valid[::-1], axis=0)[::-1]
+        counts = valid.sum(axis=0)
+
+        def last_mean(window):
+            take = valid & (from_end <= window)
+            with np.errstate(invalid='ignore'):
+                return np.where(counts >= window,
+                                np.where(take, closes, 0.0).sum(axis=0) / window, np.nan)
+
+        expected = {
+            'ret_mean': np.nanmean(returns, axis=0),
+            'ret_std': np.nanstd(returns, axis=0, ddof=1),
+            'ma_fast': last_mean(self.fast),
+            'ma_slow': last_mean(self.slow),
+            'max_drawdown': metrics.max_drawdown(closes),
+        }
+        if volumes is not None:
+            volumes = np.asarray(volumes, dtype=np.float64)
+            expected['vol_mean'] = np.nanmean(volumes, axis=0)
+            expected['vol_std'] = np.nanstd(volumes, axis=0, ddof=1)
+
+        report = {}
+        for name, reference in expected.items():
+            actual = getattr(self, name)
+            # Compare relative to scale so price- and volume-sized values are comparable.
+            scale = np.maximum(np.abs(reference), 1.0)
+            report[name] = float(np.nanmax(np.abs(actual - reference) / scale, initial=0.0))
+
+        if volumes is not None:
+            stream = self.anomalies
+            z, _ = volume.zscores(volumes, stream.window, stream.method)
+            rows, cols = volume.top_anomalies(z, stream.top.k, stream.sigma)
+            table = stream.table()
+            reference = z[rows, cols]
+            if table['ticker'].tolist() == [self.tickers[col] for col in cols.tolist()]:
+                actual = table['volume_z_score'].to_numpy(dtype=np.float64)
+                scale = np.maximum(np.abs(reference), 1.0)
+                report['volume_top_z'] = float(np.max(np.abs(actual - reference) / scale, initial=0.0))
+            else:
+                report['volume_top_z'] = float('inf')
+        return report
+
+
+def catch_up(price_store, state=None):
+    """Feed store rows newer than the state's last date; seed from scratch if needed.
+
+    Only those rows are read: analytics.dateindex binary-searches each
+    ticker's segment for the day after last_date. Returns (state, days applied).
+    """
+    tickers = list(price_store.tickers)
+    if state is None or state.tickers != tickers or state.anomalies is None:
+        state = StreamingMetrics(tickers)
+    index = dateindex.DateIndex(price_store)
+    start = None if state.last_date is None else state.last_date + np.timedelta64(1, 'D')
+    dates, _, closes = index.panel('close', start)
+    _, _, volumes = index.panel('volume', start)
+    state.update_many(dates, closes, volumes)
+    return state, len(dates)
+
+
+if __name__ == '__main__':
+    import argparse
+    import time
+
+    parser = argparse.ArgumentParser(description='Advance streaming metrics to the latest store rows.')
+    parser.add_argument('--state', default=STATE_PATH)
+    parser.add_argument('--verify', action='store_true', help='check against a full recompute')
+    args = parser.parse_args()
+
+    prices = store.open_store()
+    state = StreamingMetrics.load(args.state) if Path(args.state).exists() else None
+    started = time.perf_counter()
+    state, applied = catch_up(prices, state)
+    elapsed = time.perf_counter() - started
+    state.save(args.state)
+    print(f'applied {applied} day(s) to {len(state.tickers)} tickers in {elapsed * 1000:.1f} ms')
+    print(state.snapshot().round(3).to_string(index=False))
+    print(f'\ntop {state.anomalies.top.k} volume anomalies ({state.anomalies.window}-day {state.anomalies.method} baseline):')
+    print(state.anomalies.table().to_string(index=False, float_format='{:.3f}'.format))
+    if args.verify:
+        closes, volumes = prices.panel('close')[2], prices.panel('volume')[2]
+        for name, gap in state.verify(closes, volumes).items():
+            print(f'{name:>12}: max relative error {gap:.2e}')
@@ -0,0 +1,297 @@
+"""Chunked, bounded-memory ingestion of raw price CSVs.
+
+Files in the Ticker,Date,Close/Last,Volume,Open,High,Low export format are
+read `chunk_rows` lines at a time through a chain of generators:
+
+    read_chunks()   typed column arrays per chunk (explicit dtypes, no inference)
+    validate()      missing values, non-positive prices, High < Low, negative volume
+    consumers       spool_csv() -> memory-mapped columns for the price store
+                    accumulate() -> per-ticker summary statistics
+
+Nothing holds more than one chunk of parsed rows, so peak memory is set by
+chunk_rows (or by a memory budget, see chunk_rows_for()) rather than by the
+file size. Every stage counts rows, and report() turns the counters into
+rows/sec and peak RSS.
+
+    python -m analytics.ingest --chunk-rows 50000
+    python -m analytics.ingest --memory-mb 64 --spool /tmp/spool path/to/big.csv
+"""
+
+import resource
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from analytics import store
+
+DEFAULT_CHUNK_ROWS = 100_000
+# Parsed bytes per row while a chunk is in flight: six typed columns, the
+# date strings and pandas' parse buffers. Used to turn a memory budget into
+# a chunk size.
+ROW_BYTES = 400
+PRICE_FIELDS = ('close', 'open', 'high', 'low')
+
+_CSV_DTYPES = {'Ticker': str, 'Date': str, 'Close/Last': 'float64', 'Volume': 'float64',
+               'Open': 'float64', 'High': 'float64', 'Low': 'float64'}
+_FIELD_COLUMNS = {'close': 'Close/Last', 'volume': 'Volume', 'open': 'Open',
+                  'high': 'High', 'low': 'Low'}
+
+
+def chunk_rows_for(memory_mb):
+    """Chunk size that keeps in-flight parsed rows within memory_mb."""
+    return max(1_000, int(memory_mb * 1024 * 1024 / ROW_BYTES))
+
+
+def new_stats():
+    return {'files': 0, 'chunks': 0, 'rows': 0, 'dropped': 0, 'bytes': 0,
+            'started': time.perf_counter()}
+
+
+def read_chunks(path, chunk_rows=DEFAULT_CHUNK_ROWS, date_format=store.DATE_FORMAT,
+                date_unit='D', stats=None):
+    """Yield dicts of typed column arrays (store field names) per chunk.
+
+    Columns are taken by position with explicit dtypes, so a BOM or a broken
+    header cell does not matter. Volume is read as float so that a missing
+    value reaches validate() instead of failing the parser. Each chunk also
+    carries 'line', the 1-based CSV line of its first row.
+    """
+    path = Path(path)
+    line = 2
+    reader = pd.read_csv(path, header=0, names=store.CSV_COLUMNS, usecols=store.CSV_COLUMNS[1:],
+                         dtype=_CSV_DTYPES, encoding='utf-8-sig', chunksize=chunk_rows)
+    with reader:
+        for frame in reader:
+            try:
+                dates = pd.to_datetime(frame['Date'], format=date_format)
+            except ValueError as exc:
+                raise ValueError(f'{path.name}: bad date near line {line}: {exc}') from None
+            chunk = {'date': dates.to_numpy(f'datetime64[{date_unit}]')}
+            for field, column in _FIELD_COLUMNS.items():
+                chunk[field] = frame[column].to_numpy(dtype=np.float64)
+            chunk['line'] = line
+            line += len(frame)
+            if stats is not None:
+                stats['chunks'] += 1
+                stats['rows'] += len(frame)
+            yield chunk
+    if stats is not None:
+        stats['files'] += 1
+        stats['bytes'] += path.stat().st_size
+
+
+def invalid_rows(chunk):
+    """Boolean mask of rows that fail validation, and a reason per check."""
+    checks = {'missing value': np.zeros(len(chunk['date']), dtype=bool)}
+    checks['missing value'] |= np.isnat(chunk['date'])
+    for field in store.FIELDS:
+        checks['missing value'] |= np.isnan(chunk[field])
+    with np.errstate(invalid='ignore'):
+        checks['non-positive price'] = np.logical_or.reduce([chunk[f] <= 0 for f in PRICE_FIELDS])
+        checks['high below low'] = chunk['high'] < chunk['low']
+        checks['negative volume'] = chunk['volume'] < 0
+    return np.logical_or.reduce(list(checks.values())), checks
+
+
+def validate(chunks, on_error='raise', path=None, stats=None):
+    """Pass chunks through, raising on (or dropping) rows that fail the checks.
+
+    Valid chunks have volume converted to int64 to match the store.
+    """
+    if on_error not in ('raise', 'drop'):
+        raise ValueError("on_error must be 'raise' or 'drop'")
+    for chunk in chunks:
+        bad, checks = invalid_rows(chunk)
+        if bad.any():
+            if on_error == 'raise':
+                row = int(np.flatnonzero(bad)[0])
+                reason = next(name for name, mask in checks.items() if mask[row])
+                where = f'{Path(path).name}: ' if path else ''
+                raise ValueError(f'{where}line {chunk["line"] + row}: {reason}')
+            keep = ~bad
+            chunk = {name: (values[keep] if name != 'line' else values) for name, values in chunk.items()}
+            if stats is not None:
+                stats['dropped'] += int(bad.sum())
+        chunk['volume'] = chunk['volume'].astype(np.int64)
+        yield chunk
+
+
+def stream(sources, chunk_rows=DEFAULT_CHUNK_ROWS, on_error='raise', stats=None, **read_options):
+    """Yield (ticker, chunk) for every chunk of every source, validated.
+
+    sources is a {ticker: path} mapping such as store.discover_sources().
+    """
+    for ticker, path in sources.items():
+        chunks = read_chunks(path, chunk_rows, stats=stats, **read_options)
+        for chunk in validate(chunks, on_error, path, stats):
+            yield ticker, chunk
+
+
+def _count_lines(path, block=1 << 20):
+    count = 0
+    with open(path, 'rb') as fh:
+        for data in iter(lambda: fh.read(block), b''):
+            count += data.count(b'\n')
+    return count
+
+
+def spool_csv(path, work_dir, chunk_rows=DEFAULT_CHUNK_ROWS, on_error='raise', stats=None):
+    """Stream one CSV into memory-mapped, date-ascending column files.
+
+    Returns {field: array} like store.parse_csv(), backed by .npy files in
+    work_dir, plus the same 'order_breaks' count. Newest-first files (the
+    usual export order) are written back to front; only a file in no
+    consistent order needs a full argsort.
+    """
+    work_dir = Path(work_dir)
+    work_dir.mkdir(parents=True, exist_ok=True)
+    capacity = _count_lines(path)
+    columns = {
+        name: np.lib.format.open_memmap(work_dir / f'{name}.npy', mode='w+',
+                                        dtype=dtype, shape=(capacity,))
+        for name, dtype in store.FIELD_DTYPES.items()
+    }
+    # Rows are written from the back, so newest-first input lands ascending.
+    end = capacity
+    ascending = descending = True
+    rises = falls = 0
+    previous = None
+    for chunk in validate(read_chunks(path, chunk_rows, stats=stats), on_error, path, stats):
+        dates = chunk['date']
+        if len(dates) == 0:
+            continue
+        steps = np.diff(dates if previous is None else np.r_[previous, dates]).astype(np.int64)
+        ascending = ascending and bool((steps > 0).all())
+        descending = descending and bool((steps < 0).all())
+        rises += int((steps > 0).sum())
+        falls += int((steps < 0).sum())
+        previous = dates[-1]
+        start = end - len(dates)
+        for name in store.FIELD_DTYPES:
+            columns[name][start:end] = chunk[name][::-1]
+        end = start
+
+    result = {name: column[end:] for name, column in columns.items()}
+    if ascending and not descending:
+        for column in result.values():
+            _reverse_in_place(column, chunk_rows)
+    elif not descending:
+        # No consistent order: the only step that needs every row at once.
+        order = np.argsort(result['date'], kind='stable')
+        for column in result.values():
+            column[:] = column[order]
+    for column in columns.values():
+        column.flush()
+    result['order_breaks'] = min(rises, falls)
+    return result
+
+
+def _reverse_in_place(column, block):
+    """Reverse a (memory-mapped) array touching at most 2 x block rows at a time."""
+    n = len(column)
+    for lo in range(0, n // 2, block):
+        size = min(block, n // 2 - lo)
+        head = column[lo:lo + size].copy()
+        column[lo:lo + size] = column[n - lo - size:n - lo][::-1]
+        column[n - lo - size:n - lo] = head[::-1]
+
+
+def accumulate(chunks, tickers=None):
+    """Fold a (ticker, chunk) stream into per-ticker summary statistics.
+
+    Daily returns are taken between adjacent rows, with the last close of the
+    previous chunk carried over, and merged into running mean/variance with
+    Chan's pairwise update, so only one chunk is ever held.
+    """
+    state = {}
+    for ticker, chunk in chunks:
+        close = chunk['close']
+        if len(close) == 0:
+            continue
+        s = state.setdefault(ticker, {'rows': 0, 'last_close': None, 'last_date': None,
+                                      'n': 0, 'mean': 0.0, 'm2': 0.0, 'volume': 0,
+                                      'start': chunk['date'].min(), 'end': chunk['date'].max()})
+        dates = chunk['date']
+        if s['last_close'] is not None:
+            close, dates = np.r_[s['last_close'], close], np.r_[s['last_date'], dates]
+        # Exports run newest-first; take each adjacent pair in date order.
+        forward = dates[1:] > dates[:-1]
+        returns = np.where(forward, close[1:] / close[:-1], close[:-1] / close[1:]) - 1.0
+        if len(returns):
+            n_b, mean_b = len(returns), returns.mean()
+            m2_b = ((returns - mean_b) ** 2).sum()
+            n = s['n'] + n_b
+            delta = mean_b - s['mean']
+            s['mean'] += delta * n_b / n
+            s['m2'] += m2_b + delta * delta * s['n'] * n_b / n
+            s['n'] = n
+        s['rows'] += len(chunk['close'])
+        s['volume'] += int(chunk['volume'].sum())
+        s['start'] = min(s['start'], chunk['date'].min())
+        s['end'] = max(s['end'], chunk['date'].max())
+        s['last_close'], s['last_date'] = close[-1], dates[-1]
+
+    names = sorted(state) if tickers is None else [t for t in tickers if t in state]
+    return pd.DataFrame({
+        'ticker': names,
+        'rows': [state[t]['rows'] for t in names],
+        'start': [state[t]['start'] for t in names],
+        'end': [state[t]['end'] for t in names],
+        'mean_return_pct': [state[t]['mean'] * 100 for t in names],
+        'volatility_pct': [np.sqrt(state[t]['m2'] / (state[t]['n'] - 1)) * 100
+                           if state[t]['n'] > 1 else np.nan for t in names],
+        'avg_volume': [state[t]['volume'] / state[t]['rows'] for t in names],
+    })
+
+
+def peak_rss_mb():
+    """Peak resident set size of this process, in MiB."""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KiB, macOS bytes.
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+
+def report(stats):
+    seconds = time.perf_counter() - stats['started']
+    return {
+        'files': stats['files'],
+        'chunks': stats['chunks'],
+        'rows': stats['rows'],
+        'dropped': stats['dropped'],
+        'seconds': seconds,
+        'rows_per_sec': stats['rows'] / seconds if seconds else 0.0,
+        'mb_per_sec': stats['bytes'] / 1e6 / seconds if seconds else 0.0,
+        'peak_rss_mb': peak_rss_mb(),
+    }
+
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Stream raw price CSVs in bounded memory.')
+    parser.add_argument('paths', nargs='*', help='CSV files (default: every file in data/raw_data)')
+    parser.add_argument('--chunk-rows', type=int, default=DEFAULT_CHUNK_ROWS)
+    parser.add_argument('--memory-mb', type=float, help='size chunks to this parse budget instead')
+    parser.add_argument('--on-error', choices=('raise', 'drop'), default='raise')
+    parser.add_argument('--spool', help='also write date-ascending .npy columns under this directory')
+    args = parser.parse_args()
+
+    chunk_rows = chunk_rows_for(args.memory_mb) if args.memory_mb else args.chunk_rows
+    if args.paths:
+        sources = {Path(p).name.split('_')[0].upper(): Path(p) for p in args.paths}
+    else:
+        sources = store.discover_sources()
+    stats = new_stats()
+    if args.spool:
+        for ticker, path in sources.items():
+            spool_csv(path, Path(args.spool) / ticker, chunk_rows, args.on_error, stats)
+    else:
+        print(accumulate(stream(sources, chunk_rows, args.on_error, stats)).to_string(index=False))
+    summary = report(stats)
+    print(f"{summary['rows']:,} rows in {summary['chunks']} chunk(s) of <= {chunk_rows:,} from "
+          f"{summary['files']} file(s): {summary['rows_per_sec']:,.0f} rows/s "
+          f"({summary['mb_per_sec']:.1f} MB/s), {summary['dropped']} dropped, "
+          f"peak RSS {summary['peak_rss_mb']:.0f} MiB")
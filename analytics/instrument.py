@@ -0,0 +1,186 @@
+"""Timing spans and counters for the dashboard's hot paths.
+
+Disabled by default; set ANALYTICS_INSTRUMENT=1 (or call enable()) to
+record. While disabled span() hands back one shared no-op context manager
+and count() returns at once, so instrumented code pays a flag check per call.
+
+Spans are named '<stage>.<what>' (load.panel, compute.metrics_table,
+render.risk_return, ...) and recorded with an optional session id into a
+bounded in-memory buffer; summary() turns them into latency percentiles per
+name. With ANALYTICS_TRACE_FILE set every span is also appended to that
+file as one JSON object per line, and prometheus() renders the current
+state in the Prometheus text exposition format.
+"""
+
+import json
+import os
+import threading
+import time
+from collections import deque
+from functools import wraps
+
+import numpy as np
+
+MAX_RECORDS = 10_000
+QUANTILES = (0.5, 0.9, 0.99)
+
+
+class _NullSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+NULL_SPAN = _NullSpan()
+
+
+class _Span:
+    __slots__ = ('recorder', 'name', 'session', 'started')
+
+    def __init__(self, recorder, name, session):
+        self.recorder, self.name, self.session = recorder, name, session
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.recorder.record(self.name, time.perf_counter() - self.started, self.session)
+        return False
+
+
+class Recorder:
+    """Thread-safe buffer of span durations plus named counters."""
+
+    def __init__(self, max_records=MAX_RECORDS, trace_file=None):
+        self.enabled = False
+        self.trace_file = trace_file
+        self._records = deque(maxlen=max_records)
+        self._counters = {}
+        self._lock = threading.Lock()
+
+    def record(self, name, seconds, session=None):
+        with self._lock:
+            self._records.append((name, seconds, session))
+            if self.trace_file:
+                with open(self.trace_file, 'a') as fh:
+                    fh.write(json.dumps({'ts': time.time(), 'span': name, 'seconds': seconds,
+                                         'session': session}) + '\n')
+
+    def count(self, name, n=1, session=None):
+        with self._lock:
+            key = (name, session)
+            self._counters[key] = self._counters.get(key, 0) + n
+
+    def reset(self):
+        with self._lock:
+            self._records.clear()
+            self._counters.clear()
+
+    def counters(self, session=None):
+        """{name: total}, for one session or (session=None) for all of them."""
+        totals = {}
+        with self._lock:
+            for (name, owner), value in self._counters.items():
+                if session is None or owner == session:
+                    totals[name] = totals.get(name, 0) + value
+        return totals
+
+    def summary(self, session=None):
+        """{name: {'count', 'total', 'mean', 'p50', 'p90', 'p99', 'max'}} in seconds."""
+        with self._lock:
+            records = [(name, seconds) for name, seconds, owner in self._records
+                       if session is None or owner == session]
+        by_name = {}
+        for name, seconds in records:
+            by_name.setdefault(name, []).append(seconds)
+        result = {}
+        for name, values in sorted(by_name.items()):
+            values = np.asarray(values)
+            row = {'count': len(values), 'total': values.sum(), 'mean': values.mean()}
+            for q, value in zip(QUANTILES, np.quantile(values, QUANTILES)):
+                row[f'p{round(q * 100)}'] = value
+            row['max'] = values.max()
+            result[name] = row
+        return result
+
+
+_recorder = Recorder(trace_file=os.environ.get('ANALYTICS_TRACE_FILE') or None)
+_recorder.enabled = os.environ.get('ANALYTICS_INSTRUMENT', '').lower() in ('1', 'true', 'yes')
+
+
+def recorder():
+    return _recorder
+
+
+def enabled():
+    return _recorder.enabled
+
+
+def enable(flag=True, trace_file=None):
+    _recorder.enabled = flag
+    if trace_file is not None:
+        _recorder.trace_file = trace_file or None
+
+
+def span(name, session=None):
+    """Context manager timing the enclosed block under `name`."""
+    if not _recorder.enabled:
+        return NULL_SPAN
+    return _Span(_recorder, name, session)
+
+
+def count(name, n=1, session=None):
+    if _recorder.enabled:
+        _recorder.count(name, n, session)
+
+
+def timed(name=None):
+    """Decorator form of span(); the name defaults to compute.<function name>."""
+    def decorate(func):
+        label = name or f'compute.{func.__name__}'
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            if not _recorder.enabled:
+                return func(*args, **kwargs)
+            with _Span(_recorder, label, None):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorate
+
+
+def memory_mb():
+    """Current resident set size of this process in MB (0 where unavailable)."""
+    try:
+        with open('/proc/self/statm') as fh:
+            return int(fh.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') / 2**20
+    except (OSError, ValueError, IndexError):
+        return 0.0
+
+
+def _label(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def prometheus(session=None, extra=None):
+    """Spans, counters and `extra` gauges ({name: value}) in Prometheus text format."""
+    lines = ['# TYPE analytics_span_seconds summary']
+    for name, row in _recorder.summary(session).items():
+        for q in QUANTILES:
+            lines.append(f'analytics_span_seconds{{span="{_label(name)}",quantile="{q}"}} '
+                         f'{row[f"p{round(q * 100)}"]:.6g}')
+        lines.append(f'analytics_span_seconds_sum{{span="{_label(name)}"}} {row["total"]:.6g}')
+        lines.append(f'analytics_span_seconds_count{{span="{_label(name)}"}} {row["count"]}')
+    lines.append('# TYPE analytics_events_total counter')
+    for name, value in sorted(_recorder.counters(session).items()):
+        lines.append(f'analytics_events_total{{event="{_label(name)}"}} {value}')
+    gauges = {'memory_rss_mb': memory_mb(), **(extra or {})}
+    for name, value in gauges.items():
+        lines.append(f'# TYPE analytics_{name} gauge')
+        lines.append(f'analytics_{name} {value:.6g}')
+    return '\n'.join(lines) + '\n'
@@ -0,0 +1,158 @@
+"""Vectorized performance and risk metrics over a (dates x tickers) price matrix.
+
+Every function works column-wise on the whole matrix at once; missing days are
+NaN and are skipped per ticker. The definitions here are the ones described on
+the Methodology page (see METRIC_DEFINITIONS).
+"""
+
+import numpy as np
+import pandas as pd
+
+TRADING_DAYS = 252
+VAR_LEVEL = 0.95
+
+METRIC_DEFINITIONS = [
+    ('Total Return', '(Last Close - First Close) / First Close',
+     'Overall performance measurement'),
+    ('Annualized Return', '(Last Close / First Close)^(365.25 / Calendar Days) - 1 (CAGR)',
+     'Standardized annual performance'),
+    ('Volatility', 'Sample standard deviation of daily returns x sqrt(252)',
+     'Risk and variability assessment'),
+    ('Outperformance', 'Total return compared against the SPY total return',
+     'Relative performance analysis'),
+    ('Beta', 'Cov(daily return, SPY daily return) / Var(SPY daily return)',
+     'Sensitivity to market moves'),
+    ('Maximum Drawdown', 'Largest decline of the close from its running peak',
+     'Risk management indicator'),
+    ('Sharpe Ratio', '(Mean daily return x 252 - risk-free rate) / Volatility',
+     'Risk-adjusted return'),
+    ('Value at Risk (95%)', '5th percentile of daily returns (historical)',
+     'One-day loss threshold exceeded 5% of the time'),
+]
+
+
+def forward_fill(prices):
+    """Carry the last valid price forward; leading NaNs stay NaN."""
+    rows = np.arange(prices.shape[0])[:, None]
+    index = np.where(np.isnan(prices), 0, rows)
+    np.maximum.accumulate(index, axis=0, out=index)
+    return np.take_along_axis(prices, index, axis=0)
+
+
+def daily_returns(prices):
+    """Simple returns between consecutive rows; NaN if either price is missing."""
+    return prices[1:] / prices[:-1] - 1.0
+
+
+def valid_bounds(prices):
+    """Row index of the first and last valid price in every column."""
+    valid = ~np.isnan(prices)
+    first = valid.argmax(axis=0)
+    last = prices.shape[0] - 1 - valid[::-1].argmax(axis=0)
+    return first, last
+
+
+def total_return(prices):
+    first, last = valid_bounds(prices)
+    cols = np.arange(prices.shape[1])
+    return prices[last, cols] / prices[first, cols] - 1.0
+
+
+def cagr(prices, dates=None):
+    """Compound annual growth rate, using calendar time when dates are given."""
+    first, last = valid_bounds(prices)
+    if dates is None:
+        years = (last - first) / TRADING_DAYS
+    else:
+        days = (dates[last] - dates[first]).astype('timedelta64[D]').astype(np.float64)
+        years = days / 365.25
+    growth = total_return(prices) + 1.0
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.where(years > 0, growth ** (1.0 / years) - 1.0, np.nan)
+
+
+def volatility(returns, periods=TRADING_DAYS):
+    return np.nanstd(returns, axis=0, ddof=1) * np.sqrt(periods)
+
+
+def sharpe_ratio(returns, risk_free=0.0, periods=TRADING_DAYS):
+    annual_mean = np.nanmean(returns, axis=0) * periods
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return (annual_mean - risk_free) / volatility(returns, periods)
+
+
+def beta(returns, benchmark_returns):
+    """Beta of every column against one benchmark return series.
+
+    Uses only the days where both the ticker and the benchmark have a return.
+    """
+    mask = ~np.isnan(returns) & ~np.isnan(benchmark_returns)[:, None]
+    r = np.where(mask, returns, 0.0)
+    b = np.where(mask, benchmark_returns[:, None], 0.0)
+    n = mask.sum(axis=0)
+    sum_r, sum_b = r.sum(axis=0), b.sum(axis=0)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        cov = (np.einsum('ij,ij->j', r, b) - sum_r * sum_b / n) / (n - 1)
+        var = (np.einsum('ij,ij->j', b, b) - sum_b * sum_b / n) / (n - 1)
+        return cov / var
+
+
+def max_drawdown(prices):
+    filled = forward_fill(prices)
+    peaks = np.fmax.accumulate(filled, axis=0)
+    with np.errstate(invalid='ignore'):
+        return np.nanmin(filled / peaks - 1.0, axis=0)
+
+
+def value_at_risk(returns, level=VAR_LEVEL):
+    """Historical one-day VaR: the (1 - level) quantile of daily returns."""
+    if np.isnan(returns).any():
+        return np.nanquantile(returns, 1.0 - level, axis=0)
+    return np.quantile(returns, 1.0 - level, axis=0)
+
+
+def compute_metrics(prices, dates=None, benchmark=None, risk_free=0.0, var_level=VAR_LEVEL):
+    """All per-ticker metrics in one batched pass, as fractions (not percent).
+
+    prices is a float (dates x tickers) matrix with NaN for missing days;
+    benchmark is the column index of the market series used for beta.
+    """
+    prices = np.asarray(prices, dtype=np.float64)
+    returns = daily_returns(prices)
+    result = {
+        'total_return': total_return(prices),
+        'cagr': cagr(prices, dates),
+        'volatility': volatility(returns),
+        'sharpe': sharpe_ratio(returns, risk_free),
+        'max_drawdown': max_drawdown(prices),
+        'var': value_at_risk(returns, var_level),
+    }
+    if benchmark is not None:
+        result['beta'] = beta(returns, returns[:, benchmark])
+    return result
+
+
+def metrics_table(dates, tickers, prices, benchmark='SPY', risk_free=0.0):
+    """Per-ticker metrics as a DataFrame in percent, sorted by total return."""
+    tickers = list(tickers)
+    bench = tickers.index(benchmark) if benchmark in tickers else None
+    m = compute_metrics(prices, dates, bench, risk_free)
+
+    if bench is None:
+        outperformance = np.full(len(tickers), '', dtype=object)
+    else:
+        outperformance = np.where(m['total_return'] > m['total_return'][bench], 'Yes', 'No').astype(object)
+        outperformance[bench] = 'Benchmark'
+
+    table = pd.DataFrame({
+        'Ticker': tickers,
+        'Total Return %': m['total_return'] * 100,
+        'Annualized Return %': m['cagr'] * 100,
+        'Volatility %': m['volatility'] * 100,
+        'Beta': m.get('beta', np.full(len(tickers), np.nan)),
+        'Max Drawdown %': m['max_drawdown'] * 100,
+        'Sharpe Ratio': m['sharpe'],
+        'VaR 95% %': m['var'] * 100,
+        'Outperformance': outperformance,
+    })
+    return table.sort_values('Total Return %', ascending=False, ignore_index=True)
@@ -0,0 +1,143 @@
+"""Monte Carlo projection of a portfolio's return over the next H trading days.
+
+Two ways to draw daily returns from the price history:
+
+    bootstrap   whole historical days resampled with replacement, so the
+                cross-ticker correlation and fat tails of the data are kept
+    normal      multivariate normal with the historical mean and covariance,
+                mean + L z with L the Cholesky factor; for a fixed weight
+                vector w'L z is itself normal with scale |L'w|, so each
+                simulated day needs one draw rather than one per ticker
+
+Paths are generated in chunks of at most CHUNK_VALUES random draws, each
+chunk from its own seed spawned from one SeedSequence, so memory stays
+bounded whatever the path count and results do not depend on how chunks are
+split across worker processes. Each path is reduced to its horizon return
+and maximum drawdown as soon as it is made.
+
+    python -m analytics.montecarlo --paths 1000000 --horizon 21 --workers 4
+"""
+
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from analytics import metrics, portfolio
+
+METHODS = ('bootstrap', 'normal')
+HORIZON = 21
+CHUNK_VALUES = 2_000_000
+QUANTILES = (0.01, 0.05, 0.25, 0.5, 0.75, 0.95, 0.99)
+
+
+def _simulate_chunk(method, model, horizon, n_paths, seed):
+    """(horizon returns, max drawdowns) for one chunk of paths."""
+    rng = np.random.default_rng(seed)
+    if method == 'bootstrap':
+        # Resampling whole days of the portfolio's own return series is the
+        # same as resampling asset returns and then weighting them.
+        series = model['series']
+        daily = series[rng.integers(0, len(series), size=(n_paths, horizon))]
+    else:
+        daily = rng.standard_normal((n_paths, horizon))
+        daily *= model['scale']
+        daily += model['drift']
+    wealth = np.cumprod(np.add(daily, 1.0, out=daily), axis=1, out=daily)
+    peaks = np.maximum(np.maximum.accumulate(wealth, axis=1), 1.0)
+    drawdown = np.minimum((wealth / peaks).min(axis=1) - 1.0, 0.0)
+    return wealth[:, -1] - 1.0, drawdown
+
+
+def _run_chunk(args):
+    return _simulate_chunk(*args)
+
+
+def build_model(returns, weights, method='bootstrap'):
+    """What the chunk workers need: the portfolio series, or drift and scale."""
+    returns = portfolio.complete_rows(returns)
+    weights = portfolio.normalize(weights)[0]
+    if method == 'bootstrap':
+        return {'series': returns @ weights}
+    if method == 'normal':
+        mean, cov, _, _ = portfolio.moments(returns)
+        # Tiny ridge so a singular covariance (e.g. duplicated tickers) still factors.
+        chol = np.linalg.cholesky(cov + np.eye(len(cov)) * 1e-12 * np.trace(cov))
+        return {'drift': float(weights @ mean), 'scale': float(np.linalg.norm(chol.T @ weights))}
+    raise ValueError(f'method must be one of {METHODS}')
+
+
+def chunk_paths(horizon, max_values=CHUNK_VALUES):
+    """Paths per chunk so that one chunk draws at most max_values numbers."""
+    return max(1, max_values // horizon)
+
+
+def simulate(returns, weights, n_paths=100_000, horizon=HORIZON, method='bootstrap',
+             seed=0, chunk=None, workers=1):
+    """Simulate n_paths paths of `horizon` days for one weight vector.
+
+    returns is the (days x tickers) daily-return history. Returns
+    {'horizon_return': array, 'max_drawdown': array}, one value per path.
+    chunk (paths per chunk) defaults to chunk_paths().
+    """
+    model = build_model(returns, weights, method)
+    chunk = chunk or chunk_paths(horizon)
+    sizes = [min(chunk, n_paths - start) for start in range(0, n_paths, chunk)]
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+    jobs = [(method, model, horizon, size, child) for size, child in zip(sizes, seeds)]
+    if workers == 1:
+        parts = [_run_chunk(job) for job in jobs]
+    else:
+        with ProcessPoolExecutor(workers) as pool:
+            parts = list(pool.map(_run_chunk, jobs))
+    return {
+        'horizon_return': np.concatenate([part[0] for part in parts]),
+        'max_drawdown': np.concatenate([part[1] for part in parts]),
+    }
+
+
+def summarize(result, level=metrics.VAR_LEVEL):
+    """VaR/CVaR of the horizon return and quantiles of both distributions."""
+    outcome = result['horizon_return']
+    var = np.quantile(outcome, 1.0 - level)
+    return {
+        'paths': len(outcome),
+        'var': var,
+        'cvar': outcome[outcome <= var].mean(),
+        'expected_return': outcome.mean(),
+        'probability_of_loss': (outcome < 0).mean(),
+        'return_quantiles': dict(zip(QUANTILES, np.quantile(outcome, QUANTILES))),
+        'drawdown_quantiles': dict(zip(QUANTILES, np.quantile(result['max_drawdown'], QUANTILES))),
+    }
+
+
+if __name__ == '__main__':
+    import argparse
+
+    from analytics import store
+
+    parser = argparse.ArgumentParser(description='Monte Carlo VaR/CVaR and drawdowns of a portfolio.')
+    parser.add_argument('--paths', type=int, default=1_000_000)
+    parser.add_argument('--horizon', type=int, default=HORIZON, help='trading days')
+    parser.add_argument('--method', choices=METHODS, default='bootstrap')
+    parser.add_argument('--weights', nargs='*', type=float, help='one per ticker (default: equal)')
+    parser.add_argument('--chunk', type=int, help='paths per chunk (default: chunk_paths())')
+    parser.add_argument('--workers', type=int, default=1)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    _, tickers, close = store.open_store().panel('close')
+    weights = args.weights or [1.0] * len(tickers)
+    if len(weights) != len(tickers):
+        parser.error(f'expected {len(tickers)} weights for {", ".join(tickers)}')
+    started = time.perf_counter()
+    outcome = simulate(metrics.daily_returns(close), weights, args.paths, args.horizon,
+                       args.method, args.seed, args.chunk, args.workers)
+    seconds = time.perf_counter() - started
+    summary = summarize(outcome)
+    print(f"{summary['paths']:,} paths x {args.horizon} days ({args.method}) in {seconds:.2f} s")
+    print(f"VaR 95%  {summary['var'] * 100:7.2f}%   CVaR 95% {summary['cvar'] * 100:7.2f}%   "
+          f"P(loss) {summary['probability_of_loss'] * 100:.1f}%")
+    for q in QUANTILES:
+        print(f"  q{q:<5} return {summary['return_quantiles'][q] * 100:7.2f}%   "
+              f"drawdown {summary['drawdown_quantiles'][q] * 100:7.2f}%")
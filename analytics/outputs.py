@@ -0,0 +1,56 @@
+"""Writers for the CSV tables in data_outputs/.
+
+The files keep the layout of the original pgAdmin exports: every field
+quoted, numeric columns with a fixed number of decimals, ISO dates.
+"""
+
+import csv
+import os
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from analytics.store import PROJECT_DIR
+
+OUTPUT_DIR = PROJECT_DIR / 'data_outputs'
+
+# Decimal places of the numeric columns in each output, as in the SQL ROUND() calls.
+DECIMALS = {
+    'market_performance': {'total_return_percentage': 2},
+    'volatility_results': {'avg_daily_return': 3, 'daily_volatility': 3,
+                           'worst_day_pct': 2, 'best_day_pct': 2},
+    'sharp_ratio_results': {'avg_daily_return_pct': 3, 'daily_volatility_pct': 3,
+                            'sharpe_ratio': 3},
+    'extreme_performace_days': {'close_price': 2, 'daily_change_pct': 2},
+    'technical_signals': {'price': 2, 'moving_avg_50': 2, 'moving_avg_200': 2},
+    'high_volume_analysis': {'close_price': 2, 'volume_ratio': 2, 'volume_z_score': 2},
+    'stock_correlationscsv': {'correlation': 3},
+    'quarterly_returns': {'start_price': 2, 'end_price': 2, 'quarterly_return_pct': 2},
+    'monthly_performance': {'avg_return_pct': 2},
+}
+
+
+def format_table(frame, decimals=None):
+    """Render numeric columns as fixed-decimal strings and dates as ISO."""
+    frame = frame.copy()
+    for column, places in (decimals or {}).items():
+        if column not in frame:
+            continue
+        values = frame[column].to_numpy(dtype=np.float64)
+        frame[column] = [('' if np.isnan(v) else f'{v:.{places}f}') for v in values]
+    for column in frame.columns:
+        if pd.api.types.is_datetime64_any_dtype(frame[column]):
+            frame[column] = frame[column].dt.strftime('%Y-%m-%d')
+    return frame
+
+
+def write_table(frame, name, decimals=None, output_dir=OUTPUT_DIR):
+    """Atomically write one output table; returns the path written."""
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    path = output_dir / name
+    tmp = path.with_name(path.name + '.tmp')
+    format_table(frame, decimals).to_csv(tmp, index=False, quoting=csv.QUOTE_ALL)
+    os.replace(tmp, path)
+    return path
@@ -0,0 +1,70 @@
+"""Headline figures of the landing page, readable without pandas or NumPy.
+
+analytics.views.overview() computes them from the metrics table and the
+snapshot bundle publishes them with the other default views, as plain JSON
+values in its manifest. published() reads them from there with nothing but
+the json module, so app.py can show them without loading the analytics
+stack; it returns None when there is no bundle for the current price store,
+and the page then computes them through analytics.dashboard.overview().
+"""
+
+import hashlib
+import json
+import os
+from pathlib import Path
+
+PROJECT_DIR = Path(__file__).resolve().parent.parent
+# Same defaults as analytics.snapshot.SNAPSHOT_DIR and analytics.store.STORE_DIR.
+SNAPSHOT_DIR = PROJECT_DIR / 'data' / 'snapshots'
+STORE_DIR = PROJECT_DIR / 'data' / 'store'
+
+
+def summary(dates, table, benchmark='SPY'):
+    """Plain-value figures from a metrics table (analytics.metrics.metrics_table) over dates."""
+    first, last = dates[0].astype('datetime64[D]'), dates[-1].astype('datetime64[D]')
+    stocks = table[table['Ticker'] != benchmark]
+    best = stocks.loc[stocks['Total Return %'].idxmax()]
+    market = table.loc[table['Ticker'] == benchmark, 'Total Return %']
+    return {
+        'stocks': len(stocks),
+        'start': str(first),
+        'end': str(last),
+        'years': float((last - first).astype(int)) / 365.25,
+        'best': str(best['Ticker']),
+        'best_return': float(best['Total Return %']),
+        'benchmark': benchmark,
+        'benchmark_return': float(market.iloc[0]) if len(market) else None,
+    }
+
+
+def _store_version(store_root):
+    """analytics.store.PriceStore(store_root).version, from the manifest alone."""
+    store_root = Path(store_root)
+    try:
+        version = (store_root / 'CURRENT').read_text().strip()
+    except FileNotFoundError:
+        version = ''
+    try:
+        with open(store_root / version / 'manifest.json') as fh:
+            entries = json.load(fh)['tickers']
+    except FileNotFoundError:
+        return None
+    return hashlib.sha1(''.join(entries[t]['sha256'] for t in sorted(entries)).encode()).hexdigest()[:16]
+
+
+def published(benchmark='SPY', root=None, store_root=STORE_DIR):
+    """The figures of the newest bundle (DASHBOARD_SNAPSHOT_DIR), or None if it is missing or stale."""
+    root = Path(root or os.environ.get('DASHBOARD_SNAPSHOT_DIR') or SNAPSHOT_DIR)
+    try:
+        version = (root / 'LATEST').read_text().strip()
+        with open(root / version / 'manifest.json') as fh:
+            manifest = json.load(fh)
+    except FileNotFoundError:
+        return None
+    if manifest['store_version'] != _store_version(store_root):
+        return None
+    for key, spec in manifest['entries'].items():
+        metric, _, _, _, _, params = json.loads(key)
+        if metric == 'overview' and dict(params).get('benchmark') == benchmark:
+            return {name: item['value'] for name, item in spec['items'].items()}
+    return None
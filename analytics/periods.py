@@ -0,0 +1,93 @@
+"""Calendar-period rollups (month, quarter, year) of a (dates x tickers) panel.
+
+Period boundaries are found once on the shared calendar, and the first and
+last valid close of every (period, ticker) cell come from two reduceat calls
+over the whole matrix, so each ticker is scanned once for any frequency.
+Returns follow the SQL definitions: last close of the period over its first
+close.
+"""
+
+import calendar
+
+import numpy as np
+import pandas as pd
+
+FREQUENCIES = ('month', 'quarter', 'year')
+MONTH_NAMES = list(calendar.month_name)
+
+
+def period_codes(dates, freq):
+    """Integer code per date that is equal within one calendar period."""
+    months = np.asarray(dates).astype('datetime64[M]').astype(np.int64)
+    if freq == 'month':
+        return months
+    if freq == 'quarter':
+        return months // 3
+    if freq == 'year':
+        return months // 12
+    raise ValueError(f'freq must be one of {FREQUENCIES}')
+
+
+def period_bounds(dates, prices, freq):
+    """(code, first, last, days) for every calendar period in the panel.
+
+    code has one entry per period; first/last are the (periods x tickers)
+    row indices of the first and last valid price in each period and days
+    the number of valid prices (0 where a ticker has none).
+    """
+    codes = period_codes(dates, freq)
+    starts = np.flatnonzero(np.r_[True, codes[1:] != codes[:-1]])
+    valid = ~np.isnan(prices)
+    rows = np.arange(prices.shape[0])[:, None]
+    first = np.minimum.reduceat(np.where(valid, rows, prices.shape[0]), starts, axis=0)
+    last = np.maximum.reduceat(np.where(valid, rows, -1), starts, axis=0)
+    return codes[starts], first, last, np.add.reduceat(valid, starts, axis=0)
+
+
+def period_returns(dates, tickers, prices, freq='quarter'):
+    """One row per ticker and period with start/end close and return.
+
+    Columns: ticker, year, <freq> (month or quarter number, omitted for
+    years), start_price, end_price, return_pct, trading_days.
+    """
+    prices = np.asarray(prices, dtype=np.float64)
+    code, first, last, days = period_bounds(dates, prices, freq)
+
+    period_idx, ticker_idx = np.nonzero(days > 0)
+    start_price = prices[first[period_idx, ticker_idx], ticker_idx]
+    end_price = prices[last[period_idx, ticker_idx], ticker_idx]
+    code = code[period_idx]
+
+    table = pd.DataFrame({'ticker': np.asarray(tickers)[ticker_idx]})
+    if freq == 'month':
+        table['year'] = 1970 + code // 12
+        table['month'] = code % 12 + 1
+    elif freq == 'quarter':
+        table['year'] = 1970 + code // 4
+        table['quarter'] = code % 4 + 1
+    else:
+        table['year'] = 1970 + code
+    table['start_price'] = start_price
+    table['end_price'] = end_price
+    table['return_pct'] = (end_price - start_price) / start_price * 100
+    table['trading_days'] = days[period_idx, ticker_idx]
+    return table.sort_values(list(table.columns[:table.columns.get_loc('start_price')]),
+                             ignore_index=True)
+
+
+def quarterly_returns(dates, tickers, prices):
+    """data_outputs/quarterly_returns.csv: one row per ticker and quarter."""
+    table = period_returns(dates, tickers, prices, 'quarter')
+    return table.rename(columns={'return_pct': 'quarterly_return_pct'}).drop(columns='trading_days')
+
+
+def monthly_performance(dates, tickers, prices):
+    """data_outputs/monthly_performance.csv: average return by calendar month."""
+    monthly = period_returns(dates, tickers, prices, 'month')
+    summary = monthly.groupby(['ticker', 'month'], sort=True).agg(
+        avg_return_pct=('return_pct', 'mean'),
+        months_analyzed=('return_pct', 'size'),
+    ).reset_index()
+    # TO_CHAR(..., 'Month') pads names to nine characters; keep the file layout.
+    summary.insert(1, 'month_name', [MONTH_NAMES[m].ljust(9) for m in summary['month']])
+    return summary.drop(columns='month')
@@ -0,0 +1,317 @@
+"""Nightly batch: run every per-ticker analysis across a process pool.
+
+The ticker universe is split into column shards. Each worker attaches to the
+close/volume matrices through shared memory (nothing but shard bounds is
+pickled on the way in) and runs the metric, signal, volume-anomaly and period-rollup
+stages on its shard. The quality stage needs the store's rows rather than the aligned
+panels (duplicates and OHLC fields do not survive alignment), so its row columns are
+shared too and each shard checks the contiguous rows of its tickers (analytics.quality);
+the parent merges the shard reports. Correlation and the comparison against SPY need
+every ticker at once, so they run in the parent after the shards return. Tables are written to
+data_outputs/ in the layout of the original SQL exports; from the command line they
+are also published, with the dashboard's default views, as a snapshot bundle that
+the running dashboard picks up (analytics.snapshot).
+
+    python -m analytics.pipeline --workers 8
+    python -m analytics.pipeline --workers 1 2 4 8 --no-snapshot --output-dir /tmp/sweep
+"""
+
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+import pandas as pd
+
+from analytics import (correlation, metrics, outputs, periods, quality, ranking, rolling, snapshot,
+                       store)
+from analytics import volume as volume_anomalies
+
+STAGES = ('metrics', 'signals', 'volume', 'quality', 'rollups')
+VOLUME_SIGMA = volume_anomalies.SIGMA
+VOLUME_TOP = volume_anomalies.TOP_K
+VOLUME_WINDOW = volume_anomalies.WINDOW
+# LIMIT of analysis_queries/moving_average_signals.sql.
+SIGNALS_LIMIT = 20
+
+_shared = {}
+
+
+def sharpe_grade(value):
+    if value > 0.2:
+        return 'EXCELLENT'
+    if value > 0.1:
+        return 'GOOD'
+    if value > 0:
+        return 'FAIR'
+    return 'POOR'
+
+
+def stage_metrics(dates, tickers, close, volume):
+    _, best, worst = ranking.extreme_days(close)
+    # As the SQL computes them: against the ticker's previous row, rounded to
+    # 2 decimals before they are aggregated.
+    previous = np.full(close.shape, np.nan)
+    previous[1:] = metrics.forward_fill(close)[:-1]
+    with np.errstate(invalid='ignore', divide='ignore'):
+        returns = np.round((close - previous) / previous * 100, 2)[1:]
+    mean = np.nanmean(returns, axis=0)
+    std = np.nanstd(returns, axis=0, ddof=1)
+    cols = np.arange(len(tickers))
+    with np.errstate(invalid='ignore', divide='ignore'):
+        sharpe = mean / std
+
+    extremes = ranking.extremes_table(dates, tickers, close)
+    return {
+        # analysis_queries/market_outperformance.sql: (MAX - MIN) / MIN of the closes.
+        'market_performance': pd.DataFrame({
+            'ticker': tickers,
+            'total_return_percentage': (np.nanmax(close, axis=0) - np.nanmin(close, axis=0))
+            / np.nanmin(close, axis=0) * 100,
+        }),
+        'volatility_results': pd.DataFrame({
+            'ticker': tickers,
+            'avg_daily_return': mean,
+            'daily_volatility': std,
+            'worst_day_pct': returns[worst[0], cols],
+            'best_day_pct': returns[best[0], cols],
+            'trading_days': (~np.isnan(returns)).sum(axis=0),
+        }),
+        'sharp_ratio_results': pd.DataFrame({
+            'ticker': tickers,
+            'avg_daily_return_pct': mean,
+            'daily_volatility_pct': std,
+            'sharpe_ratio': sharpe,
+            'risk_adjusted_grade': [sharpe_grade(v) for v in sharpe.tolist()],
+        }),
+        'extreme_performace_days': extremes,
+    }
+
+
+def stage_signals(dates, tickers, close, volume):
+    return {'technical_signals': rolling.signals_table(dates, tickers, close, partial=True)}
+
+
+def stage_volume(dates, tickers, close, volume):
+    # Each shard keeps its own top VOLUME_TOP; finalize() merges them.
+    return {'high_volume_analysis': volume_anomalies.anomalies_table(
+        dates, tickers, close, volume, VOLUME_WINDOW, k=VOLUME_TOP, sigma=VOLUME_SIGMA)}
+
+
+def stage_rollups(dates, tickers, close, volume):
+    return {
+        'quarterly_returns': periods.quarterly_returns(dates, tickers, close),
+        'monthly_performance': periods.monthly_performance(dates, tickers, close),
+    }
+
+
+def stage_quality(start, stop):
+    """check_columns() report of tickers [start, stop) from the shared store rows."""
+    order_breaks = _shared.get('order_breaks')
+    return quality.check_columns(
+        _shared['tickers'][start:stop], _shared['starts'][start:stop], _shared['stops'][start:stop],
+        {name: _shared['row_' + name] for name in store.FIELD_DTYPES}, _shared['calendar'],
+        None if order_breaks is None else order_breaks[start:stop])
+
+
+STAGE_FUNCS = {
+    'metrics': stage_metrics,
+    'signals': stage_signals,
+    'volume': stage_volume,
+    'rollups': stage_rollups,
+}
+
+
+def _share(array):
+    block = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+    view = np.ndarray(array.shape, dtype=array.dtype, buffer=block.buf)
+    view[...] = array
+    return block, (block.name, array.shape, array.dtype.str)
+
+
+def _attach(specs, tickers):
+    _shared.clear()
+    _shared['tickers'] = tickers
+    for key, (name, shape, dtype) in specs.items():
+        block = shared_memory.SharedMemory(name=name)
+        _shared[key + '_block'] = block
+        _shared[key] = np.ndarray(shape, dtype=np.dtype(dtype), buffer=block.buf)
+
+
+def run_shard(start, stop, stages=tuple(STAGE_FUNCS)):
+    """Run the requested stages on columns [start, stop) of the shared panel.
+
+    The quality stage's report is returned under quality.REPORT_NAME.
+    """
+    dates = _shared['dates']
+    tickers = _shared['tickers'][start:stop]
+    close = _shared['close'][:, start:stop]
+    volume = _shared['volume'][:, start:stop]
+    tables, timings = {}, {}
+    for stage in stages:
+        started = time.perf_counter()
+        if stage == 'quality':
+            tables[quality.REPORT_NAME] = stage_quality(start, stop)
+        else:
+            tables.update(STAGE_FUNCS[stage](dates, tickers, close, volume))
+        timings[stage] = time.perf_counter() - started
+    return tables, timings
+
+
+def shard_bounds(n_tickers, n_shards):
+    edges = np.linspace(0, n_tickers, n_shards + 1).round().astype(int)
+    return [(int(a), int(b)) for a, b in zip(edges[:-1], edges[1:]) if b > a]
+
+
+SORT_ORDER = {
+    'market_performance': (['total_return_percentage'], [False]),
+    'volatility_results': (['daily_volatility'], [False]),
+    'sharp_ratio_results': (['sharpe_ratio', 'daily_volatility_pct'], [False, True]),
+    'extreme_performace_days': (['ticker', 'performance_type'], [True, False]),
+    'technical_signals': (['ticker', 'date'], [True, False]),
+    'quarterly_returns': (['ticker', 'year', 'quarter'], [True, True, True]),
+    'monthly_performance': (['ticker'], [True]),
+}
+# Queries that ORDER BY their rounded output columns; sorted on the same rounded values.
+SORT_ROUNDED = ('volatility_results', 'sharp_ratio_results')
+
+
+def finalize(tables, tickers, close, stages=STAGES, benchmark='SPY'):
+    """Cross-sectional steps and final ordering of the merged shard tables."""
+    performance = tables.get('market_performance')
+    if performance is not None and benchmark in tickers:
+        is_benchmark = performance['ticker'] == benchmark
+        bench_return = performance.loc[is_benchmark, 'total_return_percentage'].iloc[0]
+        performance['vs_market'] = np.where(
+            performance['total_return_percentage'] > bench_return, 'OUTPERFORMED', 'UNDERPERFORMED')
+        performance.loc[is_benchmark, 'vs_market'] = 'BENCHMARK'
+    if 'high_volume_analysis' in tables:
+        tables['high_volume_analysis'] = tables['high_volume_analysis'].nlargest(
+            VOLUME_TOP, 'volume_z_score').reset_index(drop=True)
+    for name, (columns, ascending) in SORT_ORDER.items():
+        if name in tables:
+            keys = tables[name][columns]
+            if name in SORT_ROUNDED:
+                keys = keys.round(outputs.DECIMALS[name])
+            order = keys.sort_values(columns, ascending=ascending, kind='stable').index
+            tables[name] = tables[name].loc[order].reset_index(drop=True)
+    if 'technical_signals' in tables:
+        tables['technical_signals'] = tables['technical_signals'].head(SIGNALS_LIMIT)
+
+    if 'metrics' in stages:
+        corr, counts = correlation.correlation_matrix(metrics.daily_returns(close))
+        tables['stock_correlationscsv'] = correlation.pairs_table(tickers, corr, counts)
+    return tables
+
+
+def run(price_store=None, workers=None, shards=None, stages=STAGES, output_dir=outputs.OUTPUT_DIR,
+        snapshot_dir=None):
+    """Run the batch and write its tables. Returns {step: seconds}.
+
+    With snapshot_dir, the tables and the default dashboard views are also
+    published there as a new snapshot bundle.
+    """
+    timings = {}
+    started = time.perf_counter()
+    price_store = price_store or store.open_store()
+    dates, tickers, close = price_store.panel('close')
+    _, _, volume = price_store.panel('volume')
+    shared = {'dates': dates, 'close': close, 'volume': volume}
+    if 'quality' in stages:
+        shared['starts'], shared['stops'] = price_store.segments()
+        shared['calendar'] = quality.trading_calendar(dates[0], dates[-1]) if len(dates) else dates
+        shared.update({'row_' + name: price_store.field(name) for name in store.FIELD_DTYPES})
+        order_breaks = price_store.order_breaks()
+        if order_breaks is not None:
+            shared['order_breaks'] = order_breaks
+    timings['load'] = time.perf_counter() - started
+    shard_stages = [stage for stage in stages if stage in STAGE_FUNCS or stage == 'quality']
+
+    workers = workers or os.cpu_count() or 1
+    bounds = shard_bounds(len(tickers), shards or workers)
+    stage_seconds = dict.fromkeys(shard_stages, 0.0)
+    parts = []
+
+    started = time.perf_counter()
+    if workers == 1:
+        _shared.update(shared, tickers=tickers)
+        results = [run_shard(a, b, shard_stages) for a, b in bounds]
+        _shared.clear()
+    else:
+        blocks, specs = [], {}
+        try:
+            for key, array in shared.items():
+                block, specs[key] = _share(np.ascontiguousarray(array))
+                blocks.append(block)
+            with ProcessPoolExecutor(workers, initializer=_attach, initargs=(specs, tickers)) as pool:
+                futures = [pool.submit(run_shard, a, b, shard_stages) for a, b in bounds]
+                results = [future.result() for future in futures]
+        finally:
+            for block in blocks:
+                block.close()
+                block.unlink()
+    for tables, seconds in results:
+        parts.append(tables)
+        for stage, value in seconds.items():
+            stage_seconds[stage] += value
+    timings['shards'] = time.perf_counter() - started
+    timings.update({f'  {stage} (cpu)': value for stage, value in stage_seconds.items()})
+
+    started = time.perf_counter()
+    reports = [part.pop(quality.REPORT_NAME) for part in parts if quality.REPORT_NAME in part]
+    merged = {name: pd.concat([part[name] for part in parts], ignore_index=True)
+              for name in parts[0]} if parts else {}
+    merged = finalize(merged, tickers, close, stages)
+    timings['cross-sectional'] = time.perf_counter() - started
+
+    started = time.perf_counter()
+    for name, table in merged.items():
+        outputs.write_table(table, name + '.csv', outputs.DECIMALS.get(name), output_dir)
+    if reports:
+        report = quality.merge_reports(reports)
+        report['version'] = price_store.version
+        quality.write_report(report, output_dir)
+    timings['write'] = time.perf_counter() - started
+
+    if snapshot_dir is not None:
+        started = time.perf_counter()
+        snapshot.publish(snapshot.build_entries(price_store, merged), price_store.version, snapshot_dir)
+        timings['snapshot'] = time.perf_counter() - started
+    return timings
+
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Run the per-ticker analyses across a process pool.')
+    parser.add_argument('--workers', type=int, nargs='+', default=[None],
+                        help='processes (default: all cores); several values run a scaling sweep')
+    parser.add_argument('--shards', type=int, default=None, help='shards (default: one per worker)')
+    parser.add_argument('--stages', nargs='+', choices=STAGES, default=list(STAGES))
+    parser.add_argument('--store-dir', help='an already built store (default: data/store, refreshed)')
+    parser.add_argument('--output-dir', default=outputs.OUTPUT_DIR)
+    parser.add_argument('--snapshot-dir', default=snapshot.SNAPSHOT_DIR)
+    parser.add_argument('--no-snapshot', action='store_true', help='only write data_outputs/')
+    args = parser.parse_args()
+
+    snapshot_dir = None if args.no_snapshot else args.snapshot_dir
+    price_store = store.PriceStore(args.store_dir) if args.store_dir else None
+    if len(args.workers) == 1:
+        total = time.perf_counter()
+        report = run(price_store, args.workers[0], args.shards, args.stages, args.output_dir,
+                     snapshot_dir)
+        for step, seconds in report.items():
+            print(f'{step:<20} {seconds * 1000:9.1f} ms')
+        print(f"{'total':<20} {(time.perf_counter() - total) * 1000:9.1f} ms")
+    else:
+        price_store = price_store or store.open_store()
+        print(f'{len(price_store.tickers)} tickers, {os.cpu_count()} cores')
+        print(f"{'workers':>7} {'shards':>10} {'speedup':>8} {'total':>10}")
+        baseline = None
+        for workers in args.workers:
+            report = run(price_store, workers, args.shards, args.stages, args.output_dir, snapshot_dir)
+            total = sum(seconds for step, seconds in report.items() if not step.startswith(' '))
+            baseline = baseline or report['shards']
+            print(f"{workers or os.cpu_count():>7} {report['shards'] * 1000:8.1f} ms "
+                  f"{baseline / report['shards']:7.2f}x {total * 1000:7.1f} ms")
@@ -0,0 +1,122 @@
+"""Risk of many candidate portfolios at once.
+
+Portfolios are the rows of a (portfolios x tickers) weight matrix, held at
+constant weights (rebalanced daily). Volatility, beta and the parametric
+(normal) VaR/CVaR only need the mean vector and one shared covariance
+matrix, so they are batched quadratic forms; historical VaR/CVaR and the
+maximum drawdown need each portfolio's daily return series, which comes from
+one matrix product per chunk of portfolios so memory stays bounded.
+
+Sign conventions follow analytics.metrics: VaR and CVaR are daily returns
+(negative numbers are losses) and drawdowns are negative fractions.
+"""
+
+from statistics import NormalDist
+
+import numpy as np
+import pandas as pd
+
+from analytics.metrics import TRADING_DAYS, VAR_LEVEL
+
+CHUNK = 4096
+
+
+def complete_rows(returns):
+    """Keep the days on which every ticker has a return."""
+    returns = np.asarray(returns, dtype=np.float64)
+    return returns[~np.isnan(returns).any(axis=1)]
+
+
+def moments(returns, benchmark=None):
+    """(mean, covariance, benchmark covariance vector, benchmark variance)."""
+    mean = returns.mean(axis=0)
+    centered = returns - mean
+    cov = centered.T @ centered / (len(returns) - 1)
+    if benchmark is None:
+        return mean, cov, None, None
+    bench_centered = benchmark - benchmark.mean()
+    bench_cov = centered.T @ bench_centered / (len(returns) - 1)
+    return mean, cov, bench_cov, bench_centered @ bench_centered / (len(returns) - 1)
+
+
+def normalize(weights):
+    """Weight matrix as float64 rows summing to 1 (a 1-D vector becomes one row)."""
+    weights = np.atleast_2d(np.asarray(weights, dtype=np.float64))
+    return weights / weights.sum(axis=1, keepdims=True)
+
+
+def random_weights(n_portfolios, n_assets, seed=0, concentration=1.0):
+    """Long-only candidates drawn uniformly from the simplex (Dirichlet)."""
+    rng = np.random.default_rng(seed)
+    return rng.dirichlet(np.full(n_assets, concentration), size=n_portfolios)
+
+
+def _historical(returns, weights, level):
+    """Historical VaR, CVaR and max drawdown for one chunk of portfolios."""
+    # portfolios x days, so every per-portfolio reduction runs along contiguous rows
+    series = weights @ returns.T
+    days = series.shape[1]
+    position = (1.0 - level) * (days - 1)
+    lo = int(np.floor(position))
+    hi = min(lo + 1, days - 1)
+    part = np.partition(series, [lo, hi], axis=1)
+    var = part[:, lo] + (position - lo) * (part[:, hi] - part[:, lo])
+    cvar = part[:, :lo + 1].mean(axis=1)
+
+    # Growth of 1 and its running peak, reusing the series buffer.
+    wealth = np.cumprod(np.add(series, 1.0, out=series), axis=1, out=series)
+    peaks = np.maximum.accumulate(wealth, axis=1)
+    np.maximum(peaks, 1.0, out=peaks)
+    drawdown = np.minimum(np.divide(wealth, peaks, out=wealth).min(axis=1) - 1.0, 0.0)
+    return var, cvar, drawdown
+
+
+def portfolio_risk(returns, weights, benchmark=None, level=VAR_LEVEL, chunk=CHUNK):
+    """Risk measures for every row of `weights`, as a dict of arrays (fractions).
+
+    returns is a (days x tickers) matrix of daily returns without gaps (see
+    complete_rows()); benchmark, if given, is the matching daily return
+    series used for beta.
+    """
+    returns = np.asarray(returns, dtype=np.float64)
+    weights = normalize(weights)
+    mean, cov, bench_cov, bench_var = moments(returns, benchmark)
+
+    daily_mean = weights @ mean
+    daily_std = np.sqrt(np.maximum(np.einsum('ij,jk,ik->i', weights, cov, weights), 0.0))
+    z = NormalDist().inv_cdf(1.0 - level)
+    result = {
+        'annual_return': daily_mean * TRADING_DAYS,
+        'volatility': daily_std * np.sqrt(TRADING_DAYS),
+        'sharpe': daily_mean / daily_std * np.sqrt(TRADING_DAYS),
+        'parametric_var': daily_mean + z * daily_std,
+        'parametric_cvar': daily_mean - daily_std * NormalDist().pdf(z) / (1.0 - level),
+        'beta': (weights @ bench_cov / bench_var if benchmark is not None
+                 else np.full(len(weights), np.nan)),
+        'historical_var': np.empty(len(weights)),
+        'historical_cvar': np.empty(len(weights)),
+        'max_drawdown': np.empty(len(weights)),
+    }
+    for start in range(0, len(weights), chunk):
+        stop = start + chunk
+        var, cvar, drawdown = _historical(returns, weights[start:stop], level)
+        result['historical_var'][start:stop] = var
+        result['historical_cvar'][start:stop] = cvar
+        result['max_drawdown'][start:stop] = drawdown
+    return result
+
+
+def risk_table(tickers, weights, risk):
+    """One row per portfolio: weights in percent, then the risk measures in percent."""
+    weights = normalize(weights)
+    table = pd.DataFrame(weights * 100, columns=[f'{t} %' for t in tickers])
+    table['Annual Return %'] = risk['annual_return'] * 100
+    table['Volatility %'] = risk['volatility'] * 100
+    table['Sharpe Ratio'] = risk['sharpe']
+    table['Beta'] = risk['beta']
+    table['VaR 95% %'] = risk['historical_var'] * 100
+    table['CVaR 95% %'] = risk['historical_cvar'] * 100
+    table['Parametric VaR %'] = risk['parametric_var'] * 100
+    table['Parametric CVaR %'] = risk['parametric_cvar'] * 100
+    table['Max Drawdown %'] = risk['max_drawdown'] * 100
+    return table
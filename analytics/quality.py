@@ -0,0 +1,325 @@
+"""Data-quality checks over the columnar price data.
+
+Replaces sql_scripts/01_data_validation.sql (duplicate (ticker, date) pairs
+and per-ticker date ranges) and adds row-level checks. Every check is one
+vectorized pass over the concatenated columns of all tickers, with per-ticker
+counts from bincount/reduceat, so thousands of tickers validate in seconds.
+
+Errors fail the report (and the ingest gate); warnings are reported only:
+
+    duplicate_dates       error    same (ticker, date) more than once
+    non_monotonic         error    a row out of date order in its source file
+    missing_values        error    NaN/NaT in any field
+    nonpositive_price     error    a price <= 0
+    high_below_low        error    High < Low
+    close_outside_range   error    Close outside [Low, High]
+    nonpositive_volume    error    Volume <= 0
+    calendar_gaps         warning  trading-calendar days missing between a ticker's first and last date
+    off_calendar          warning  dates that are not on the trading calendar
+
+The trading calendar is every weekday that is not an NYSE holiday
+(market_holidays()), so a session missing for every ticker still shows up
+as a gap; calendar='union' uses the dates present in the data instead.
+    split_like_jumps      warning  close-to-close move of SPLIT_RATIO or more either way
+
+    python -m analytics.quality                     # exit status 1 if any error check fails
+    python -m analytics.quality --calendar union    # gaps against the dates in the store
+"""
+
+import json
+import os
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from analytics import outputs, store
+
+ERROR_CHECKS = ('duplicate_dates', 'non_monotonic', 'missing_values', 'nonpositive_price',
+                'high_below_low', 'close_outside_range', 'nonpositive_volume')
+WARNING_CHECKS = ('calendar_gaps', 'off_calendar', 'split_like_jumps')
+CHECKS = ERROR_CHECKS + WARNING_CHECKS
+# A 2:1 split shows up as a ~50% drop; genuine daily moves of 80%+ are rare
+# enough that flagging them for review is cheap.
+SPLIT_RATIO = 1.8
+MAX_EXAMPLES = 20
+REPORT_NAME = 'data_quality_report.json'
+# Full-day market closures that no holiday rule produces.
+SPECIAL_CLOSURES = ('2001-09-11', '2001-09-12', '2001-09-13', '2001-09-14', '2004-06-11',
+                    '2007-01-02', '2012-10-29', '2012-10-30', '2018-12-05', '2025-01-09')
+
+
+def _easter(year):
+    """Easter Sunday (Gregorian computus)."""
+    a, b, c = year % 19, year // 100, year % 100
+    d, e = divmod(b, 4)
+    g = (8 * b + 13) // 25
+    h = (19 * a + b - d - g + 15) % 30
+    i, k = divmod(c, 4)
+    l = (32 + 2 * e + 2 * i - h - k) % 7
+    m = (a + 11 * h + 19 * l) // 433
+    month = (h + l - 7 * m + 90) // 25
+    return np.datetime64(f'{year}-{month:02d}-{(h + l - 7 * m + 33 * month + 19) % 32:02d}')
+
+
+def _observed(day):
+    """A fixed-date holiday on a Saturday is observed on Friday, on a Sunday on Monday."""
+    weekday = int(np.busday_count(np.datetime64('1970-01-05'), day, weekmask='1111111')) % 7
+    return day - 1 if weekday == 5 else day + 1 if weekday == 6 else day
+
+
+def _weekday_of(month, n, weekmask):
+    """The n-th (n < 0: counted from the end) day on weekmask in a 'YYYY-MM' month."""
+    first = np.datetime64(month, 'D')
+    if n > 0:
+        return np.busday_offset(first, n - 1, roll='forward', weekmask=weekmask)
+    return np.busday_offset(np.datetime64(month, 'M') + 1, n, roll='forward', weekmask=weekmask)
+
+
+def market_holidays(first_year, last_year):
+    """NYSE full-day holidays from first_year through last_year, as sorted datetime64[D]."""
+    days = [np.datetime64(day) for day in SPECIAL_CLOSURES]
+    for year in range(first_year, last_year + 1):
+        new_year = np.datetime64(f'{year}-01-01')
+        if _observed(new_year) >= new_year:
+            # On a Saturday it is not made up on the Friday before.
+            days.append(_observed(new_year))
+        if year >= 1998:
+            days.append(_weekday_of(f'{year}-01', 3, 'Mon'))
+        days += [_weekday_of(f'{year}-02', 3, 'Mon'), _easter(year) - 2,
+                 _weekday_of(f'{year}-05', -1, 'Mon')]
+        if year >= 2022:
+            days.append(_observed(np.datetime64(f'{year}-06-19')))
+        days += [_observed(np.datetime64(f'{year}-07-04')), _weekday_of(f'{year}-09', 1, 'Mon'),
+                 _weekday_of(f'{year}-11', 4, 'Thu'), _observed(np.datetime64(f'{year}-12-25'))]
+    days = np.array(days, dtype='datetime64[D]')
+    years = days.astype('datetime64[Y]').astype(int) + 1970
+    return np.unique(days[(years >= first_year) & (years <= last_year)])
+
+
+def trading_calendar(start, end, holidays=None):
+    """Trading days from start through end: weekdays less holidays (default market_holidays())."""
+    start, end = np.datetime64(start, 'D'), np.datetime64(end, 'D')
+    if holidays is None:
+        holidays = market_holidays(int(str(start)[:4]), int(str(end)[:4]))
+    days = np.arange(start, end + 1)
+    return days[np.is_busday(days, busdaycal=np.busdaycalendar(holidays=holidays))]
+
+
+def _examples(check, rows, owner, dates, detail=None, limit=MAX_EXAMPLES):
+    """Up to `limit` flagged rows per ticker as (ticker index, issue dict)."""
+    if len(rows) == 0:
+        return []
+    owners = owner[rows]
+    # rows are in ticker order; rank each row within its ticker's run
+    run_start = np.r_[0, np.flatnonzero(owners[1:] != owners[:-1]) + 1]
+    rank = np.arange(len(rows)) - np.repeat(run_start, np.diff(np.r_[run_start, len(rows)]))
+    keep = np.flatnonzero(rank < limit)
+    found = []
+    for i in keep.tolist():
+        issue = {'check': check, 'date': str(dates[rows[i]])}
+        if detail is not None:
+            issue['detail'] = detail[i]
+        found.append((int(owners[i]), issue))
+    return found
+
+
+def check_columns(tickers, starts, stops, columns, calendar=None, order_breaks=None):
+    """Run every check on concatenated per-ticker columns.
+
+    columns maps 'date' and the store FIELDS to arrays that hold each
+    ticker's rows at [starts[i], stops[i]), in the order they were stored.
+    calendar is the trading calendar: None for trading_calendar() over the
+    data's date range, 'union' for the dates present in the data, or the
+    dates themselves.
+    The store's columns are sorted when they are built, so their order says
+    nothing about the source files; order_breaks gives the per-ticker counts
+    of store.order_breaks() taken from the files instead. Without it, rows
+    dated before the previous row are counted (equal dates are duplicates).
+    Returns the report as a JSON-ready dict.
+    """
+    tickers = list(tickers)
+    n = len(tickers)
+    starts = np.asarray(starts, dtype=np.int64)
+    stops = np.asarray(stops, dtype=np.int64)
+    lengths = stops - starts
+    rows = np.arange(lengths.sum()) + np.repeat(starts - (np.cumsum(lengths) - lengths), lengths)
+    owner = np.repeat(np.arange(n), lengths)
+
+    dates = np.asarray(columns['date'])[rows].astype('datetime64[D]')
+    close = np.asarray(columns['close'], dtype=np.float64)[rows]
+    high = np.asarray(columns['high'], dtype=np.float64)[rows]
+    low = np.asarray(columns['low'], dtype=np.float64)[rows]
+    opens = np.asarray(columns['open'], dtype=np.float64)[rows]
+    volume = np.asarray(columns['volume'], dtype=np.float64)[rows]
+
+    def per_ticker(mask):
+        return np.bincount(owner[mask], minlength=n)
+
+    counts, issues = {}, []
+    day = dates.astype(np.int64)
+    same = owner[1:] == owner[:-1]
+
+    # Duplicates via unique (ticker, day) keys, so they count in any row order.
+    keys = owner * (1 << 32) + (day - day.min() if len(day) else day)
+    _, first_index = np.unique(keys, return_index=True)
+    duplicate = np.ones(len(keys), dtype=bool)
+    duplicate[first_index] = False
+    counts['duplicate_dates'] = per_ticker(duplicate)
+    issues += _examples('duplicate_dates', np.flatnonzero(duplicate), owner, dates)
+
+    if order_breaks is None:
+        backwards = np.r_[False, same & (day[1:] < day[:-1])]
+        counts['non_monotonic'] = per_ticker(backwards)
+        issues += _examples('non_monotonic', np.flatnonzero(backwards), owner, dates)
+    else:
+        counts['non_monotonic'] = np.asarray(order_breaks, dtype=np.int64)
+
+    with np.errstate(invalid='ignore'):
+        missing = np.isnat(dates) | np.isnan(close) | np.isnan(high) | np.isnan(low) \
+            | np.isnan(opens) | np.isnan(volume)
+        nonpositive = (close <= 0) | (high <= 0) | (low <= 0) | (opens <= 0)
+        inverted = high < low
+        outside = (close < low) | (close > high)
+        no_volume = volume <= 0
+    for check, mask in (('missing_values', missing), ('nonpositive_price', nonpositive),
+                        ('high_below_low', inverted), ('close_outside_range', outside),
+                        ('nonpositive_volume', no_volume)):
+        counts[check] = per_ticker(mask)
+        issues += _examples(check, np.flatnonzero(mask), owner, dates)
+
+    # Trading-calendar coverage between each ticker's first and last date.
+    if isinstance(calendar, str):
+        if calendar != 'union':
+            raise ValueError(f"calendar must be None, 'union' or an array of dates, not {calendar!r}")
+        calendar = np.unique(dates)
+    elif calendar is None:
+        calendar = trading_calendar(dates.min(), dates.max()) if len(dates) else dates[:0]
+    else:
+        calendar = np.unique(np.asarray(calendar, 'datetime64[D]'))
+    on_calendar = np.isin(dates, calendar)
+    counts['off_calendar'] = per_ticker(~on_calendar)
+    issues += _examples('off_calendar', np.flatnonzero(~on_calendar), owner, dates)
+    present = per_ticker(on_calendar & ~duplicate)
+    has_rows = lengths > 0
+    first = np.full(n, np.datetime64('NaT'), dtype='datetime64[D]')
+    last = first.copy()
+    if has_rows.any():
+        offsets = np.r_[0, np.cumsum(lengths)[:-1]][has_rows]
+        first[has_rows] = np.minimum.reduceat(dates, offsets)
+        last[has_rows] = np.maximum.reduceat(dates, offsets)
+    expected = np.where(has_rows, np.searchsorted(calendar, last, 'right')
+                        - np.searchsorted(calendar, first, 'left'), 0)
+    counts['calendar_gaps'] = np.maximum(expected - present, 0)
+
+    # Split-like jumps, in either row order: compare the larger over the smaller close.
+    with np.errstate(invalid='ignore', divide='ignore'):
+        ratio = close[1:] / close[:-1]
+        jump = np.r_[False, same & (np.fmax(ratio, 1.0 / ratio) >= SPLIT_RATIO)]
+    jump_rows = np.flatnonzero(jump)
+    counts['split_like_jumps'] = per_ticker(jump)
+    issues += _examples('split_like_jumps', jump_rows, owner, dates,
+                        [f'close {close[r - 1]:.2f} -> {close[r]:.2f}' for r in jump_rows.tolist()])
+
+    per_ticker_report = {}
+    by_ticker = {}
+    for index, issue in issues:
+        by_ticker.setdefault(index, []).append(issue)
+    for i, ticker in enumerate(tickers):
+        entry = {
+            'total_records': int(lengths[i]),
+            'start_date': None if np.isnat(first[i]) else str(first[i]),
+            'end_date': None if np.isnat(last[i]) else str(last[i]),
+        }
+        entry.update({check: int(counts[check][i]) for check in CHECKS})
+        entry['passed'] = not any(entry[check] for check in ERROR_CHECKS)
+        entry['issues'] = by_ticker.get(i, [])
+        per_ticker_report[ticker] = entry
+
+    totals = {check: int(counts[check].sum()) for check in CHECKS}
+    return {
+        'passed': not any(totals[check] for check in ERROR_CHECKS),
+        'tickers': n,
+        'rows': int(lengths.sum()),
+        'calendar_days': int(len(calendar)),
+        'errors': {check: totals[check] for check in ERROR_CHECKS},
+        'warnings': {check: totals[check] for check in WARNING_CHECKS},
+        'failed_tickers': [t for t in tickers if not per_ticker_report[t]['passed']],
+        'per_ticker': per_ticker_report,
+    }
+
+
+def check_store(price_store, calendar=None):
+    """Validate every ticker in a PriceStore; report also carries its version."""
+    starts, stops = price_store.segments()
+    columns = {name: price_store.field(name) for name in store.FIELD_DTYPES}
+    report = check_columns(price_store.tickers, starts, stops, columns, calendar,
+                           price_store.order_breaks())
+    report['version'] = price_store.version
+    return report
+
+
+def merge_reports(reports):
+    """One report from check_columns() reports over disjoint ticker sets, in order."""
+    per_ticker = {}
+    for report in reports:
+        per_ticker.update(report['per_ticker'])
+    return {
+        'passed': all(report['passed'] for report in reports),
+        'tickers': sum(report['tickers'] for report in reports),
+        'rows': sum(report['rows'] for report in reports),
+        'calendar_days': max((report['calendar_days'] for report in reports), default=0),
+        'errors': {check: sum(report['errors'][check] for report in reports) for check in ERROR_CHECKS},
+        'warnings': {check: sum(report['warnings'][check] for report in reports)
+                     for check in WARNING_CHECKS},
+        'failed_tickers': [t for report in reports for t in report['failed_tickers']],
+        'per_ticker': per_ticker,
+    }
+
+
+def summary_table(report):
+    """data_outputs/data_quality.csv: the record counts and date ranges of the SQL script."""
+    rows = report['per_ticker']
+    return pd.DataFrame({
+        'ticker': list(rows),
+        'total_records': [entry['total_records'] for entry in rows.values()],
+        'start_date': [entry['start_date'] for entry in rows.values()],
+        'end_date': [entry['end_date'] for entry in rows.values()],
+    })
+
+
+def write_report(report, output_dir=outputs.OUTPUT_DIR):
+    """Write the JSON report and the CSV summary; returns the JSON path."""
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    path = output_dir / REPORT_NAME
+    tmp = path.with_name(path.name + '.tmp')
+    with open(tmp, 'w') as fh:
+        json.dump(report, fh, indent=1)
+    os.replace(tmp, path)
+    outputs.write_table(summary_table(report), 'data_quality.csv', output_dir=output_dir)
+    return path
+
+
+if __name__ == '__main__':
+    import argparse
+    import sys
+    import time
+
+    parser = argparse.ArgumentParser(description='Validate the price store.')
+    parser.add_argument('--output-dir', default=outputs.OUTPUT_DIR)
+    parser.add_argument('--no-write', action='store_true', help='only print the summary')
+    parser.add_argument('--calendar', choices=('trading', 'union'), default='trading',
+                        help='weekdays less market holidays, or the dates present in the store')
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    result = check_store(store.open_store(), None if args.calendar == 'trading' else args.calendar)
+    seconds = time.perf_counter() - started
+    if not args.no_write:
+        print(f'wrote {write_report(result, args.output_dir)}')
+    print(f"{result['tickers']} tickers, {result['rows']:,} rows checked in {seconds * 1000:.0f} ms")
+    for kind in ('errors', 'warnings'):
+        flagged = {check: count for check, count in result[kind].items() if count}
+        print(f'{kind}: {flagged or "none"}')
+    sys.exit(0 if result['passed'] else 1)
@@ -0,0 +1,86 @@
+"""Best and worst days per ticker by partial selection.
+
+analysis_queries/best_worst_days.sql ranks every daily return of a ticker
+twice (RANK() descending and ascending) to keep rank 1 of each. Here daily
+returns are computed once for the whole (dates x tickers) panel and
+np.argpartition picks the n largest and n smallest per column in linear
+time; only those 2n rows per ticker are then sorted.
+"""
+
+import numpy as np
+import pandas as pd
+
+from analytics import metrics
+
+BEST = 'BEST DAY'
+WORST = 'WORST DAY'
+
+
+def date_rows(dates, start=None, end=None):
+    """Return rows (row i = move into dates[i + 1]) that fall in [start, end]."""
+    dates = np.asarray(dates)
+    lo = 0 if start is None else max(np.searchsorted(dates, np.datetime64(start, 'D')) - 1, 0)
+    hi = len(dates) - 1 if end is None else np.searchsorted(dates, np.datetime64(end, 'D'), 'right') - 1
+    return slice(lo, max(hi, lo))
+
+
+def top_n(values, n, largest=True):
+    """Row indices of the n largest (or smallest) values per column, best first.
+
+    NaNs are never selected; where a column has fewer than n values the
+    remaining slots are -1. Returns an (n x columns) int array.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    n = min(n, values.shape[0])
+    if n == 0:
+        return np.empty((0, values.shape[1]), dtype=np.int64)
+    keyed = np.where(np.isnan(values), -np.inf, values if largest else -values)
+    if n < values.shape[0]:
+        part = np.argpartition(-keyed, n - 1, axis=0)[:n]
+    else:
+        part = np.broadcast_to(np.arange(n)[:, None], values.shape).copy()
+    picked = np.take_along_axis(keyed, part, axis=0)
+    order = np.argsort(-picked, axis=0, kind='stable')
+    rows = np.take_along_axis(part, order, axis=0)
+    rows[np.take_along_axis(picked, order, axis=0) == -np.inf] = -1
+    return rows
+
+
+def extreme_days(close, n=1, rows=slice(None)):
+    """(returns, best, worst) with best/worst as (n x tickers) return-row indices.
+
+    rows restricts the selection to a range of return rows (see date_rows()).
+    """
+    returns = metrics.daily_returns(np.asarray(close, dtype=np.float64))
+    window = returns[rows]
+    offset = rows.start or 0
+    best, worst = top_n(window, n, largest=True), top_n(window, n, largest=False)
+    best[best >= 0] += offset
+    worst[worst >= 0] += offset
+    return returns, best, worst
+
+
+def extremes_table(dates, tickers, close, n=1, start=None, end=None):
+    """Top/bottom n days per ticker in the extreme_performace_days.csv layout.
+
+    With n > 1 a rank column (1 = most extreme) is added.
+    """
+    dates = np.asarray(dates)
+    close = np.asarray(close, dtype=np.float64)
+    returns, best, worst = extreme_days(close, n, date_rows(dates, start, end))
+    parts = []
+    for label, picked in ((WORST, worst), (BEST, best)):
+        rank, cols = np.nonzero(picked >= 0)
+        rows = picked[rank, cols]
+        parts.append(pd.DataFrame({
+            'ticker': np.asarray(tickers, dtype=object)[cols],
+            'date': dates[rows + 1],
+            'close_price': close[rows + 1, cols],
+            'daily_change_pct': returns[rows, cols] * 100,
+            'performance_type': label,
+            'rank': rank + 1,
+        }))
+    table = pd.concat(parts, ignore_index=True)
+    table = table.sort_values(['ticker', 'performance_type', 'rank'], ascending=[True, False, True],
+                              kind='stable', ignore_index=True)
+    return table if n > 1 else table.drop(columns='rank')
@@ -0,0 +1,266 @@
+"""Bring data/raw_data up to date from the Yahoo Finance chart API.
+
+For every ticker only the missing range is requested: from the day after
+the newest row of its CSV (read from the first data line; the exports are
+newest first) up to the last completed session, so a run during trading
+hours never stores a partial intraday bar. Downloads run on a bounded thread pool sharing
+one pooled HTTP session, every request first takes a token from a global
+rate limiter, and 429/5xx responses and connection errors are retried with
+exponential backoff (honouring Retry-After). New rows are written in front
+of the existing ones in a temporary file that replaces the CSV with
+os.replace, so readers see either the old file or the complete new one;
+the price store is then rebuilt incrementally for the changed files.
+
+The endpoint is the one yfinance uses, called directly so it can be pointed
+at a stand-in server (MARKET_DATA_URL or --base-url; see
+benchmarks/market_data_server.py).
+
+    python -m analytics.refresh --workers 16 --rate 20
+    python -m analytics.refresh --tickers NVDA --since 2020-11-23   # add a ticker
+"""
+
+import datetime as dt
+import os
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from zoneinfo import ZoneInfo
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from analytics import store
+
+BASE_URL = os.environ.get('MARKET_DATA_URL', 'https://query1.finance.yahoo.com')
+CHART_PATH = '/v8/finance/chart/{ticker}'
+USER_AGENT = 'Mozilla/5.0 (financial_analysis refresh)'
+WORKERS = 8
+RATE = 10.0
+RETRIES = 4
+BACKOFF = 0.5
+TIMEOUT = 10.0
+RETRY_STATUS = {429, 500, 502, 503, 504}
+HISTORY_YEARS = 5
+MARKET_TZ = ZoneInfo('America/New_York')
+MARKET_CLOSE = dt.time(16, 0)
+
+
+class FetchError(Exception):
+    """A ticker could not be fetched (after retries, or a non-retryable response)."""
+
+
+class RateLimiter:
+    """Token bucket shared by all worker threads: `rate` requests/s, bursts up to `burst`."""
+
+    def __init__(self, rate=RATE, burst=None):
+        self.rate = rate
+        self.capacity = burst or max(1.0, rate)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        if not self.rate:
+            return
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1.0:
+                    self.tokens -= 1.0
+                    return
+                wait = (1.0 - self.tokens) / self.rate
+            time.sleep(wait)
+
+
+def make_session(pool_size=WORKERS):
+    """One keep-alive session whose connection pool fits every worker."""
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    session.headers['User-Agent'] = USER_AGENT
+    return session
+
+
+def latest_date(path):
+    """Newest date in a raw export (its first data line), or None if it has no rows."""
+    with open(path, encoding='utf-8-sig') as fh:
+        fh.readline()
+        line = fh.readline().strip()
+    if not line:
+        return None
+    return dt.datetime.strptime(line.split(',')[1], store.DATE_FORMAT).date()
+
+
+def last_completed_session(now=None):
+    """Newest weekday whose regular session has closed (New York time).
+
+    Exchange holidays are not known here; the API simply has no bar for them.
+    """
+    now = (now or dt.datetime.now(dt.timezone.utc)).astimezone(MARKET_TZ)
+    day = now.date()
+    if now.time() < MARKET_CLOSE:
+        day -= dt.timedelta(days=1)
+    while day.weekday() >= 5:
+        day -= dt.timedelta(days=1)
+    return day
+
+
+def _epoch(day):
+    return int(dt.datetime.combine(day, dt.time(), dt.timezone.utc).timestamp())
+
+
+def _retry_delay(attempt, response=None, backoff=BACKOFF):
+    retry_after = response.headers.get('Retry-After') if response is not None else None
+    if retry_after and retry_after.isdigit():
+        return float(retry_after)
+    return backoff * 2 ** attempt * (0.5 + random.random())
+
+
+def fetch_history(session, ticker, start, end, limiter=None, base_url=BASE_URL,
+                  retries=RETRIES, backoff=BACKOFF, timeout=TIMEOUT):
+    """Daily bars for ticker with start <= date <= end, oldest first.
+
+    Returns a list of (date, close, volume, open, high, low); days with
+    missing fields (halts, partial data) are left out.
+    """
+    url = base_url.rstrip('/') + CHART_PATH.format(ticker=ticker)
+    params = {'period1': _epoch(start), 'period2': _epoch(end + dt.timedelta(days=1)),
+              'interval': '1d', 'events': 'history'}
+    for attempt in range(retries + 1):
+        if limiter is not None:
+            limiter.acquire()
+        try:
+            response = session.get(url, params=params, timeout=timeout)
+        except (requests.ConnectionError, requests.Timeout) as exc:
+            if attempt == retries:
+                raise FetchError(f'{ticker}: {exc}') from exc
+            time.sleep(_retry_delay(attempt, backoff=backoff))
+            continue
+        if response.status_code in RETRY_STATUS and attempt < retries:
+            time.sleep(_retry_delay(attempt, response, backoff))
+            continue
+        if response.status_code == 404:
+            return []
+        if response.status_code != 200:
+            raise FetchError(f'{ticker}: HTTP {response.status_code}')
+        return _parse_chart(response.json(), start, end)
+
+
+def _parse_chart(payload, start, end):
+    chart = payload.get('chart') or {}
+    if chart.get('error'):
+        raise FetchError(str(chart['error']))
+    result = (chart.get('result') or [None])[0]
+    if not result or not result.get('timestamp'):
+        return []
+    offset = result.get('meta', {}).get('gmtoffset', 0)
+    quote = result['indicators']['quote'][0]
+    columns = [quote.get(name) or [] for name in ('close', 'volume', 'open', 'high', 'low')]
+    rows = []
+    for stamp, *fields in zip(result['timestamp'], *columns):
+        if any(value is None for value in fields):
+            continue
+        day = dt.datetime.fromtimestamp(stamp + offset, dt.timezone.utc).date()
+        if start <= day <= end:
+            rows.append((day, *fields))
+    return rows
+
+
+def _format_price(value):
+    return repr(round(float(value), 4))
+
+
+def prepend_rows(path, ticker, rows):
+    """Atomically add rows (oldest first, all newer than the file) to a raw export."""
+    path = Path(path)
+    lines = [f'{ticker},{day.strftime(store.DATE_FORMAT)},{_format_price(close)},{int(volume)},'
+             f'{_format_price(open_)},{_format_price(high)},{_format_price(low)}'
+             for day, close, volume, open_, high, low in reversed(rows)]
+    tmp = path.with_name(path.name + '.tmp')
+    if path.exists():
+        with open(path, encoding='utf-8-sig') as src:
+            header = src.readline()
+            body = src.read()
+    else:
+        header, body = ','.join(store.CSV_COLUMNS) + '\n', ''
+    with open(tmp, 'w', encoding='utf-8') as out:
+        out.write(header if header.endswith('\n') else header + '\n')
+        out.write('\n'.join(lines))
+        if body:
+            out.write('\n' + body)
+    os.replace(tmp, path)
+
+
+def refresh_ticker(session, limiter, ticker, raw_dir, until, since, **fetch_options):
+    """Fetch and write one ticker's missing days; returns a report dict."""
+    path = Path(raw_dir) / f'{ticker}{store.CSV_SUFFIX}'
+    last = latest_date(path) if path.exists() else None
+    start = last + dt.timedelta(days=1) if last else since
+    report = {'ticker': ticker, 'from': start, 'rows': 0, 'status': 'up to date', 'error': ''}
+    if start > until:
+        return report
+    try:
+        rows = fetch_history(session, ticker, start, until, limiter, **fetch_options)
+    except (FetchError, requests.RequestException, ValueError) as exc:
+        report.update(status='failed', error=str(exc))
+        return report
+    if rows:
+        prepend_rows(path, ticker, rows)
+        report.update(status='updated', rows=len(rows))
+    return report
+
+
+def refresh(tickers=None, raw_dir=store.RAW_DIR, until=None, since=None, workers=WORKERS,
+            rate=RATE, update_store=True, store_root=None, **fetch_options):
+    """Refresh tickers (default: every CSV in raw_dir) and return one report per ticker.
+
+    The store rebuilt afterwards is store_root, by default the 'store'
+    directory next to raw_dir (data/store for data/raw_data).
+    """
+    raw_dir = Path(raw_dir)
+    tickers = [t.upper() for t in tickers] if tickers else sorted(store.discover_sources(raw_dir))
+    until = until or last_completed_session()
+    since = since or until - dt.timedelta(days=365 * HISTORY_YEARS)
+    limiter = RateLimiter(rate)
+    with make_session(workers) as session, ThreadPoolExecutor(workers) as pool:
+        futures = [pool.submit(refresh_ticker, session, limiter, ticker, raw_dir, until, since,
+                               **fetch_options) for ticker in tickers]
+        reports = [future.result() for future in futures]
+    if update_store and any(report['status'] == 'updated' for report in reports):
+        store.build_store(raw_dir, store_root or raw_dir.parent / 'store')
+    return reports
+
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Fetch missing daily bars into data/raw_data.')
+    parser.add_argument('--tickers', nargs='+', help='default: every CSV in the raw directory')
+    parser.add_argument('--raw-dir', default=store.RAW_DIR)
+    parser.add_argument('--until', type=dt.date.fromisoformat, help='last date (default: the last completed session)')
+    parser.add_argument('--since', type=dt.date.fromisoformat,
+                        help=f'first date for tickers without a CSV (default: {HISTORY_YEARS} years back)')
+    parser.add_argument('--workers', type=int, default=WORKERS)
+    parser.add_argument('--rate', type=float, default=RATE, help='requests per second, all workers (0: no limit)')
+    parser.add_argument('--retries', type=int, default=RETRIES)
+    parser.add_argument('--base-url', default=BASE_URL)
+    parser.add_argument('--no-store', action='store_true', help='only update the CSVs')
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    reports = refresh(args.tickers, args.raw_dir, args.until, args.since, args.workers, args.rate,
+                      not args.no_store, base_url=args.base_url, retries=args.retries)
+    seconds = time.perf_counter() - started
+    for report in reports:
+        if report['status'] != 'up to date':
+            print(f"{report['ticker']:<8} {report['status']:<10} {report['rows']:>5} rows  {report['error']}")
+    statuses = [report['status'] for report in reports]
+    print(f'{len(reports)} tickers in {seconds:.1f} s: {statuses.count("updated")} updated, '
+          f'{statuses.count("up to date")} up to date, {statuses.count("failed")} failed')
+    if 'failed' in statuses:
+        raise SystemExit(1)
@@ -0,0 +1,179 @@
+"""Rolling-window statistics over (dates x tickers) arrays.
+
+Windowed sums come from one cumulative sum per array, so an n-day average
+costs O(T) per ticker regardless of n, and every function handles all tickers
+in the same pass. A window that contains a missing (NaN) day yields NaN.
+
+This replaces analysis_queries/moving_average_signals.sql, which re-averages
+each ROWS BETWEEN window and repeats LAG() for the crossover test.
+"""
+
+import numpy as np
+import pandas as pd
+
+BUY = 1
+SELL = -1
+SIGNAL_LABELS = {BUY: 'BUY SIGNAL', SELL: 'SELL SIGNAL'}
+
+
+def _as_2d(values):
+    values = np.asarray(values, dtype=np.float64)
+    return values[:, None] if values.ndim == 1 else values
+
+
+def _window_sums(values, windows, power=1):
+    """Rolling sums for several windows from a single cumulative sum.
+
+    Returns {window: sums} where sums has the input's shape and NaN wherever
+    the window is incomplete or contains a missing value.
+    """
+    values = _as_2d(values)
+    valid = ~np.isnan(values)
+    complete = valid.all()
+    filled = values if complete else np.where(valid, values, 0.0)
+    if power != 1:
+        filled = filled ** power
+    csum = np.zeros((values.shape[0] + 1, values.shape[1]))
+    np.cumsum(filled, axis=0, out=csum[1:])
+    if not complete:
+        ccount = np.zeros(csum.shape, dtype=np.int64)
+        np.cumsum(valid, axis=0, out=ccount[1:])
+
+    result = {}
+    for window in windows:
+        if window < 1:
+            raise ValueError('window must be at least 1')
+        sums = np.full(values.shape, np.nan)
+        if window <= values.shape[0]:
+            np.subtract(csum[window:], csum[:-window], out=sums[window - 1:])
+            if not complete:
+                sums[window - 1:][(ccount[window:] - ccount[:-window]) < window] = np.nan
+        result[window] = sums
+    return result
+
+
+def sma(values, window):
+    """Simple moving average over the trailing `window` rows."""
+    return _window_sums(values, [window])[window] / window
+
+
+def rolling_std(values, window, ddof=1):
+    """Rolling sample standard deviation from cumulative sums of x and x^2.
+
+    Each column is shifted by its mean first to keep the x^2 sums well
+    conditioned on price-sized inputs.
+    """
+    values = _as_2d(values)
+    with np.errstate(invalid='ignore'):
+        centered = values - np.nanmean(values, axis=0)
+    s1 = _window_sums(centered, [window])[window]
+    s2 = _window_sums(centered, [window], power=2)[window]
+    var = (s2 - s1 * s1 / window) / (window - ddof)
+    return np.sqrt(np.maximum(var, 0.0))
+
+
+def ema(values, span=None, alpha=None):
+    """Exponential moving average (adjust=False), seeded with the first value.
+
+    The recursion is sequential in time, so this loops over rows but updates
+    every ticker at once. Missing values carry the previous average forward.
+    """
+    if alpha is None:
+        if span is None:
+            raise ValueError('pass span or alpha')
+        alpha = 2.0 / (span + 1.0)
+    values = _as_2d(values)
+    out = np.empty_like(values)
+    current = values[0].copy()
+    out[0] = current
+    for i in range(1, values.shape[0]):
+        row = values[i]
+        update = ~np.isnan(row)
+        seed = update & np.isnan(current)
+        current[seed] = row[seed]
+        step = update & ~seed
+        current[step] += alpha * (row[step] - current[step])
+        out[i] = current
+    return out
+
+
+def crossovers(fast_line, slow_line):
+    """Rows where the fast line crosses the slow one.
+
+    Returns (rows, cols, direction) with direction BUY where fast moves above
+    slow (after being at or below it) and SELL for the opposite move, the
+    same rule as the SQL query.
+    """
+    diff = _as_2d(fast_line) - _as_2d(slow_line)
+    now, before = diff[1:], diff[:-1]
+    with np.errstate(invalid='ignore'):
+        buy = (now > 0) & (before <= 0)
+        sell = (now < 0) & (before >= 0)
+    rows, cols = np.nonzero(buy | sell)
+    direction = np.where(buy[rows, cols], BUY, SELL).astype(np.int8)
+    return rows + 1, cols, direction
+
+
+def trailing_mean(values, window):
+    """Mean of the last `window` rows, or of every row so far while there are fewer.
+
+    values must not have gaps above a column's last observation (NaN rows
+    only at the bottom, as partial_crossover_signals() arranges).
+    """
+    values = _as_2d(values)
+    csum = np.zeros((values.shape[0] + 1, values.shape[1]))
+    np.cumsum(values, axis=0, out=csum[1:])
+    end = np.arange(1, values.shape[0] + 1)
+    start = np.maximum(end - window, 0)
+    return (csum[end] - csum[start]) / (end - start)[:, None]
+
+
+def crossover_signals(prices, fast=50, slow=200):
+    """Moving averages and crossover events from one cumulative-sum pass.
+
+    Returns (ma_fast, ma_slow, (rows, cols, direction)).
+    """
+    sums = _window_sums(prices, [fast, slow])
+    ma_fast, ma_slow = sums[fast] / fast, sums[slow] / slow
+    return ma_fast, ma_slow, crossovers(ma_fast, ma_slow)
+
+
+def partial_crossover_signals(prices, fast=50, slow=200):
+    """crossover_signals() with the windows of analysis_queries/moving_average_signals.sql.
+
+    AVG() OVER (ROWS BETWEEN n PRECEDING AND CURRENT ROW) averages whatever
+    rows the frame holds, so the averages start at a ticker's first row
+    instead of waiting for a full window, and the frame (like LAG) counts a
+    ticker's own rows, skipping dates it has no price for. Each column's
+    observed rows are moved to the top, averaged there and moved back.
+    """
+    prices = _as_2d(prices)
+    order = np.argsort(np.isnan(prices), axis=0, kind='stable')
+    compact = np.take_along_axis(prices, order, axis=0)
+    lines = []
+    for window in (fast, slow):
+        line = np.full(prices.shape, np.nan)
+        np.put_along_axis(line, order, trailing_mean(compact, window), axis=0)
+        lines.append(line)
+    rows, cols, direction = crossovers(*(np.take_along_axis(line, order, axis=0) for line in lines))
+    return lines[0], lines[1], (order[rows, cols], cols, direction)
+
+
+def signals_table(dates, tickers, prices, fast=50, slow=200, partial=False):
+    """Crossover events in the layout of data_outputs/technical_signals.csv.
+
+    partial uses the SQL query's windows (partial_crossover_signals()).
+    """
+    prices = _as_2d(prices)
+    signals = partial_crossover_signals if partial else crossover_signals
+    ma_fast, ma_slow, (rows, cols, direction) = signals(prices, fast, slow)
+    table = pd.DataFrame({
+        'ticker': np.asarray(tickers)[cols],
+        'date': np.asarray(dates)[rows],
+        'price': prices[rows, cols].round(2),
+        f'moving_avg_{fast}': ma_fast[rows, cols].round(2),
+        f'moving_avg_{slow}': ma_slow[rows, cols].round(2),
+        'signal': [SIGNAL_LABELS[d] for d in direction.tolist()],
+        'action': 'TRADE',
+    })
+    return table.sort_values(['ticker', 'date'], ascending=[True, False], ignore_index=True)
@@ -0,0 +1,185 @@
+"""Calendar seasonality of returns: month of year, quarter, weekday, turn of month.
+
+Every observation gets a small integer group code (month 0-11, weekday
+0-4, ...). Rows are put in group order with one stable argsort of the codes,
+shared by all tickers, so count, sum, sum of squares and positive-return
+counts for every (group, ticker) cell come from np.add.reduceat over the
+whole (observations x tickers) matrix in one pass. Medians are taken per
+group segment of the same sorted matrix.
+
+Month and quarter observations are calendar-period returns as defined in
+analytics.periods (last close of the period over its first close), so the
+month means match data_outputs/monthly_performance.csv. Weekday and
+turn-of-month use daily close-to-close returns; the turn of month is the
+last trading day of a month and the first three of the next.
+
+Each cell carries a one-sample t-statistic of the mean against zero and its
+two-sided p-value (Student's t for up to MAX_T_DF degrees of freedom, the
+normal approximation above that).
+"""
+
+import calendar
+import math
+from statistics import NormalDist
+
+import numpy as np
+import pandas as pd
+
+from analytics import metrics, periods
+
+GROUPINGS = {
+    'month': list(calendar.month_abbr[1:]),
+    'quarter': ['Q1', 'Q2', 'Q3', 'Q4'],
+    'weekday': list(calendar.day_abbr[:5]),
+    'turn_of_month': ['Turn of month', 'Rest of month'],
+}
+TURN_DAYS_BEFORE = 1
+TURN_DAYS_AFTER = 3
+MAX_T_DF = 30
+ALL = 'ALL'
+
+
+def _t_two_sided(t, df):
+    """P(|T| >= |t|) for Student's t with an integer df (closed-form series)."""
+    theta = math.atan(abs(t) / math.sqrt(df))
+    cos2 = math.cos(theta) ** 2
+    if df % 2:
+        term, total = math.cos(theta), 0.0
+        for k in range(1, (df - 1) // 2 + 1):
+            total += term
+            term *= cos2 * (2 * k) / (2 * k + 1)
+        inside = 2 / math.pi * (theta + (math.sin(theta) * total if df > 1 else 0.0))
+    else:
+        term, total = 1.0, 0.0
+        for k in range(1, df // 2 + 1):
+            total += term
+            term *= cos2 * (2 * k - 1) / (2 * k)
+        inside = math.sin(theta) * total
+    return min(max(1.0 - inside, 0.0), 1.0)
+
+
+def p_values(t, n):
+    """Two-sided p-values for t-statistics from samples of size n (NaN where n < 2)."""
+    t, n = np.broadcast_arrays(np.asarray(t, dtype=np.float64), np.asarray(n))
+    p = np.full(t.shape, np.nan)
+    ok = ~np.isnan(t) & (n >= 2)
+    large = ok & (n - 1 > MAX_T_DF)
+    p[large] = 2.0 * (1.0 - np.vectorize(NormalDist().cdf, otypes=[float])(np.abs(t[large])))
+    for i in zip(*np.nonzero(ok & ~large)):
+        p[i] = _t_two_sided(t[i], int(n[i]) - 1)
+    return p
+
+
+def turn_of_month(dates):
+    """True on the last TURN_DAYS_BEFORE and first TURN_DAYS_AFTER trading days of each month."""
+    months = np.asarray(dates).astype('datetime64[M]')
+    starts = np.flatnonzero(np.r_[True, months[1:] != months[:-1]])
+    ends = np.r_[starts[1:], len(months)]
+    position = np.arange(len(months)) - np.repeat(starts, ends - starts)
+    remaining = np.repeat(ends, ends - starts) - np.arange(len(months))
+    return (position < TURN_DAYS_AFTER) | (remaining <= TURN_DAYS_BEFORE)
+
+
+def observations(dates, close, by):
+    """(group codes, observations x tickers returns) for one grouping."""
+    dates = np.asarray(dates).astype('datetime64[D]')
+    close = np.asarray(close, dtype=np.float64)
+    if by in ('month', 'quarter'):
+        code, first, last, days = periods.period_bounds(dates, close, by)
+        cols = np.arange(close.shape[1])
+        with np.errstate(invalid='ignore'):
+            values = close[np.minimum(last, len(close) - 1), cols] / close[np.minimum(first, len(close) - 1), cols] - 1.0
+        values[days == 0] = np.nan
+        groups = code % 12 if by == 'month' else code % 4
+        return groups, values
+    returns = metrics.daily_returns(close)
+    moved = dates[1:]
+    if by == 'weekday':
+        # 1970-01-01 was a Thursday.
+        groups = (moved.astype(np.int64) + 3) % 7
+    elif by == 'turn_of_month':
+        groups = np.where(turn_of_month(dates)[1:], 0, 1)
+    else:
+        raise ValueError(f'by must be one of {tuple(GROUPINGS)}')
+    return groups, returns
+
+
+def grouped_stats(groups, values, n_groups):
+    """{stat: (groups x columns) array} for count, mean, median, std, hit_rate, t_stat, p_value."""
+    order = np.argsort(groups, kind='stable')
+    groups, values = groups[order], values[order]
+    present = np.flatnonzero(np.r_[True, groups[1:] != groups[:-1]])
+    valid = ~np.isnan(values)
+    filled = np.where(valid, values, 0.0)
+
+    shape = (n_groups, values.shape[1])
+    count, total, squares, hits, median = (np.zeros(shape) for _ in range(5))
+    median[:] = np.nan
+    codes = groups[present]
+    count[codes] = np.add.reduceat(valid, present, axis=0)
+    total[codes] = np.add.reduceat(filled, present, axis=0)
+    squares[codes] = np.add.reduceat(filled * filled, present, axis=0)
+    hits[codes] = np.add.reduceat(filled > 0, present, axis=0)
+    bounds = np.r_[present, len(groups)]
+    for code, lo, hi in zip(codes, bounds[:-1], bounds[1:]):
+        segment = values[lo:hi]
+        median[code] = np.nanmedian(segment, axis=0) if valid[lo:hi].any() else np.nan
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        mean = total / count
+        std = np.sqrt(np.maximum(squares - count * mean * mean, 0.0) / (count - 1))
+        t_stat = mean / (std / np.sqrt(count))
+        hit_rate = hits / count
+    return {'count': count, 'mean': mean, 'median': median, 'std': std,
+            'hit_rate': hit_rate, 't_stat': t_stat, 'p_value': p_values(t_stat, count)}
+
+
+def seasonality_table(dates, tickers, close, by='month'):
+    """One row per ticker and group, plus ALL rows pooling every ticker's observations.
+
+    Returns are in percent.
+    """
+    labels = GROUPINGS[by]
+    groups, values = observations(dates, close, by)
+    # The pooled column stacks every ticker's observations under the same codes.
+    pooled_groups = np.tile(groups, values.shape[1])
+    pooled = grouped_stats(pooled_groups, values.T.reshape(-1, 1), len(labels))
+    stats = grouped_stats(groups, values, len(labels))
+    stats = {name: np.hstack([stats[name], pooled[name]]) for name in stats}
+
+    names = list(tickers) + [ALL]
+    group_idx, ticker_idx = np.indices(stats['count'].shape)
+    table = pd.DataFrame({
+        'Ticker': np.asarray(names, dtype=object)[ticker_idx.ravel()],
+        'Period': np.asarray(labels, dtype=object)[group_idx.ravel()],
+        'order': group_idx.ravel(),
+        'Observations': stats['count'].ravel().astype(np.int64),
+        'Mean %': stats['mean'].ravel() * 100,
+        'Median %': stats['median'].ravel() * 100,
+        'Std %': stats['std'].ravel() * 100,
+        'Hit Rate %': stats['hit_rate'].ravel() * 100,
+        't-stat': stats['t_stat'].ravel(),
+        'p-value': stats['p_value'].ravel(),
+    })
+    table = table[table['Observations'] > 0]
+    table['ticker_order'] = table['Ticker'].map({name: i for i, name in enumerate(names)})
+    table = table.sort_values(['ticker_order', 'order'], ignore_index=True)
+    return table.drop(columns=['order', 'ticker_order'])
+
+
+if __name__ == '__main__':
+    import argparse
+    import time
+
+    from analytics import store
+
+    parser = argparse.ArgumentParser(description='Return seasonality by calendar grouping.')
+    parser.add_argument('--by', choices=GROUPINGS, default='month')
+    parser.add_argument('--ticker', default=ALL)
+    args = parser.parse_args()
+
+    dates, tickers, close = store.open_store().panel('close')
+    started = time.perf_counter()
+    table = seasonality_table(dates, tickers, close, args.by)
+    print(f'{len(table)} rows in {(time.perf_counter() - started) * 1000:.1f} ms')
+    print(table[table['Ticker'] == args.ticker].round(3).to_string(index=False))
@@ -0,0 +1,280 @@
+"""Versioned, memory-mappable bundles of precomputed dashboard data.
+
+A bundle is one directory under data/snapshots/ holding everything the
+pages show by default (analytics.views.defaults(): metric tables,
+correlation matrix and rolling correlations, signals, volume anomalies,
+seasonality, portfolio candidates, the landing page's headline figures)
+plus the batch pipeline's output tables:
+
+    data/snapshots/
+        LATEST                          name of the newest complete bundle
+        20251121T220501-3f2a9c1e/
+            manifest.json               entry key -> how to rebuild the value
+            0000.npy, 0001.npy, ...     one array per table column / ndarray
+
+Arrays are plain .npy files opened with mmap_mode='r', so opening a bundle
+reads only its manifest and maps the files; table columns of strings are
+fixed-width unicode arrays. A bundle is written in full into a hidden
+temporary directory, renamed into place and only then named in LATEST (both
+with os.replace), so a reader that follows LATEST never sees a partial
+bundle. Older bundles beyond KEEP are removed; readers that still map them
+keep working, because every file of a bundle is opened when it is loaded.
+
+Entries are keyed like analytics.cache keys without the data version, and a
+bundle records the price store version it was computed from; the dashboard
+(Watcher) only serves entries while that still matches its store.
+
+    python -m analytics.snapshot --publish
+    python -m analytics.snapshot --list
+"""
+
+import datetime as dt
+import json
+import os
+import shutil
+import threading
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from analytics import cache, store, views
+
+SNAPSHOT_DIR = store.PROJECT_DIR / 'data' / 'snapshots'
+LATEST = 'LATEST'
+MANIFEST = 'manifest.json'
+BUNDLE_FORMAT = 1
+KEEP = 3
+CHECK_INTERVAL = 2.0
+
+
+def entry_key(metric, tickers=None, start=None, end=None, **params):
+    """Manifest key of a value; the same arguments as analytics.dashboard.cached()."""
+    return json.dumps(cache.make_key(metric, tickers, start, end, '', **params), default=str)
+
+
+def _plain(value):
+    return value is None or isinstance(value, (str, bool, int, float))
+
+
+class _Writer:
+    """Turns values into manifest specs, saving their arrays as numbered .npy files."""
+
+    def __init__(self, root):
+        self.root = Path(root)
+        self.files = 0
+
+    def save(self, array):
+        name = f'{self.files:04d}.npy'
+        self.files += 1
+        np.save(self.root / name, np.ascontiguousarray(array), allow_pickle=False)
+        return {'type': 'array', 'file': name}
+
+    def column(self, values):
+        values = np.asarray(values)
+        if values.dtype != object:
+            return self.save(values)
+        if all(isinstance(v, str) for v in values):
+            return self.save(values.astype(str))
+        return {'type': 'values', 'value': [None if pd.isna(v) else v for v in values.tolist()]}
+
+    def encode(self, value):
+        if isinstance(value, pd.DataFrame):
+            return {'type': 'frame', 'columns': [str(c) for c in value.columns],
+                    'data': [self.column(value[c].to_numpy()) for c in value.columns],
+                    'index': None if isinstance(value.index, pd.RangeIndex)
+                    else self.column(value.index.to_numpy())}
+        if isinstance(value, np.ndarray):
+            return self.column(value)
+        if isinstance(value, dict):
+            return {'type': 'dict', 'items': {str(k): self.encode(v) for k, v in value.items()}}
+        if isinstance(value, (list, tuple)) and all(_plain(v) for v in value):
+            return {'type': 'values', 'value': list(value), 'tuple': isinstance(value, tuple)}
+        if isinstance(value, (list, tuple)):
+            return {'type': 'sequence', 'items': [self.encode(v) for v in value],
+                    'tuple': isinstance(value, tuple)}
+        if _plain(value) or isinstance(value, np.generic):
+            return {'type': 'value', 'value': value.item() if isinstance(value, np.generic) else value}
+        raise TypeError(f'Cannot store {type(value).__name__} in a snapshot')
+
+
+def _decode(root, spec):
+    kind = spec['type']
+    if kind == 'array':
+        return np.load(root / spec['file'], mmap_mode='r')
+    if kind == 'values':
+        return tuple(spec['value']) if spec.get('tuple') else spec['value']
+    if kind == 'value':
+        return spec['value']
+    if kind == 'dict':
+        return {k: _decode(root, v) for k, v in spec['items'].items()}
+    if kind == 'sequence':
+        items = [_decode(root, item) for item in spec['items']]
+        return tuple(items) if spec['tuple'] else items
+    if kind == 'frame':
+        data = {name: _decode(root, column) for name, column in zip(spec['columns'], spec['data'])}
+        index = None if spec['index'] is None else _decode(root, spec['index'])
+        return pd.DataFrame(data, index=index, columns=spec['columns'])
+    raise ValueError(f'Unknown snapshot entry type: {kind}')
+
+
+class Snapshot:
+    """A loaded bundle: every entry decoded once, arrays memory-mapped."""
+
+    def __init__(self, path):
+        self.path = Path(path)
+        with open(self.path / MANIFEST) as fh:
+            manifest = json.load(fh)
+        if manifest.get('format') != BUNDLE_FORMAT:
+            raise ValueError(f'Unsupported snapshot format in {self.path}')
+        self.version = manifest['version']
+        self.store_version = manifest['store_version']
+        self.created = manifest['created']
+        self._values = {key: _decode(self.path, spec) for key, spec in manifest['entries'].items()}
+
+    def __contains__(self, key):
+        return key in self._values
+
+    def __len__(self):
+        return len(self._values)
+
+    def keys(self):
+        return list(self._values)
+
+    def get(self, metric, tickers=None, start=None, end=None, **params):
+        """The stored value for these cached() arguments, or None."""
+        return self._values.get(entry_key(metric, tickers, start, end, **params))
+
+    def output(self, name):
+        """One of the batch pipeline's tables (data_outputs layout), or None."""
+        return self.get('output', name=name)
+
+
+def versions(root=SNAPSHOT_DIR):
+    """Complete bundles under root, oldest first."""
+    root = Path(root)
+    if not root.exists():
+        return []
+    return sorted(path.name for path in root.iterdir()
+                  if path.is_dir() and not path.name.startswith('.') and (path / MANIFEST).exists())
+
+
+def latest_version(root=SNAPSHOT_DIR):
+    try:
+        return (Path(root) / LATEST).read_text().strip() or None
+    except FileNotFoundError:
+        return None
+
+
+def open_latest(root=SNAPSHOT_DIR):
+    """The bundle LATEST points to, or None if nothing was published."""
+    version = latest_version(root)
+    return Snapshot(Path(root) / version) if version else None
+
+
+def build_entries(price_store, tables=None, benchmark='SPY'):
+    """{entry key: value} of the default dashboard views, plus pipeline tables if given."""
+    panels = {}
+    def panel(field):
+        if field not in panels:
+            panels[field] = price_store.panel(field)
+        return panels[field]
+
+    entries = {entry_key(metric, **params): compute(panel)
+               for metric, params, compute in views.defaults(benchmark)}
+    for name, table in (tables or {}).items():
+        entries[entry_key('output', name=name)] = table
+    return entries
+
+
+def publish(entries, store_version, root=SNAPSHOT_DIR, keep=KEEP):
+    """Write entries as a new bundle, point LATEST at it and prune old ones. Returns its path."""
+    root = Path(root)
+    root.mkdir(parents=True, exist_ok=True)
+    created = dt.datetime.now(dt.timezone.utc)
+    version = f'{created:%Y%m%dT%H%M%S%f}-{store_version[:8]}'
+    tmp = root / f'.{version}.tmp'
+    shutil.rmtree(tmp, ignore_errors=True)
+    tmp.mkdir()
+
+    writer = _Writer(tmp)
+    specs = {key: writer.encode(value) for key, value in entries.items()}
+    with open(tmp / MANIFEST, 'w') as fh:
+        json.dump({'format': BUNDLE_FORMAT, 'version': version, 'store_version': store_version,
+                   'created': created.isoformat(timespec='seconds'), 'entries': specs}, fh)
+    os.replace(tmp, root / version)
+
+    pointer = root / (LATEST + '.tmp')
+    pointer.write_text(version + '\n')
+    os.replace(pointer, root / LATEST)
+    prune(root, keep)
+    return root / version
+
+
+def prune(root=SNAPSHOT_DIR, keep=KEEP):
+    """Remove all but the newest `keep` bundles (never the one LATEST names)."""
+    current = latest_version(root)
+    for version in versions(root)[:-keep or None]:
+        if version != current:
+            shutil.rmtree(Path(root) / version, ignore_errors=True)
+
+
+class Watcher:
+    """The newest published bundle, re-checked at most every `interval` seconds.
+
+    current() is cheap enough for every request: between checks it returns
+    the loaded bundle, and a check reads only the LATEST pointer. A new
+    bundle is loaded completely before it replaces the old one.
+    """
+
+    def __init__(self, root=SNAPSHOT_DIR, interval=CHECK_INTERVAL):
+        self.root = Path(root)
+        self.interval = interval
+        self._bundle = None
+        self._checked = float('-inf')
+        self._lock = threading.Lock()
+
+    def current(self):
+        if time.monotonic() - self._checked >= self.interval:
+            with self._lock:
+                if time.monotonic() - self._checked >= self.interval:
+                    self._reload()
+                    self._checked = time.monotonic()
+        return self._bundle
+
+    def _reload(self):
+        version = latest_version(self.root)
+        if version is None:
+            self._bundle = None
+        elif self._bundle is None or self._bundle.version != version:
+            try:
+                self._bundle = Snapshot(self.root / version)
+            except FileNotFoundError:
+                # Pruned between reading LATEST and opening it; a newer one is already named.
+                pass
+
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Publish or list dashboard snapshot bundles.')
+    parser.add_argument('--root', default=SNAPSHOT_DIR)
+    parser.add_argument('--publish', action='store_true',
+                        help='compute the default views from the store and publish a bundle')
+    parser.add_argument('--keep', type=int, default=KEEP)
+    parser.add_argument('--list', action='store_true')
+    args = parser.parse_args()
+
+    if args.publish:
+        started = time.perf_counter()
+        price_store = store.open_store()
+        path = publish(build_entries(price_store), price_store.version, args.root, args.keep)
+        size = sum(f.stat().st_size for f in path.iterdir())
+        print(f'published {path.name}: {size / 1e6:.1f} MB in {time.perf_counter() - started:.1f} s')
+    if args.list or not args.publish:
+        current = latest_version(args.root)
+        for version in versions(args.root):
+            bundle = Snapshot(Path(args.root) / version)
+            marker = '*' if version == current else ' '
+            print(f'{marker} {version}  {len(bundle)} entries  store {bundle.store_version}')
@@ -0,0 +1,179 @@
+"""Run the SQL analyses in an embedded DuckDB database.
+
+The queries in analysis_queries/ and sql_scripts/ were written for a
+PostgreSQL stock_prices table. This loads that table in-process from the
+price store with one bulk insert, sorted and indexed on (ticker, date), runs
+every query unchanged and writes the results to data_outputs/, so the
+outputs can be regenerated without a database server:
+
+    pip install duckdb
+    python -m analytics.sql_engine
+
+With --start/--end/--tickers only the rows inside that window are loaded
+(found by binary search in analytics.dateindex), so every query runs on the
+slice instead of the full history:
+
+    python -m analytics.sql_engine --start 2022-01-01 --end 2023-06-30 --output-dir /tmp/window
+"""
+
+import time
+from pathlib import Path
+
+import pandas as pd
+
+from analytics import dateindex, outputs, store
+
+QUERY_DIRS = (store.PROJECT_DIR / 'analysis_queries', store.PROJECT_DIR / 'sql_scripts')
+
+# Query file -> output table. Scripts with several statements map the index
+# of the statement whose result is exported; the others are only reported.
+QUERY_OUTPUTS = {
+    'best_worst_days.sql': 'extreme_performace_days',
+    'correlation_analysis.sql': 'stock_correlationscsv',
+    'market_outperformance.sql': 'market_performance',
+    'monthly_trends.sql': 'monthly_performance',
+    'moving_average_signals.sql': 'technical_signals',
+    'quarterly_performance.sql': 'quarterly_returns',
+    'risk_adjusted_returns.sql': 'sharp_ratio_results',
+    'volatility_analysis.sql': 'volatility_results',
+    'volume_analysis.sql': 'high_volume_analysis',
+    '01_data_validation.sql': {1: 'data_quality'},
+}
+
+SCHEMA = """
+CREATE TABLE stock_prices (
+    ticker VARCHAR NOT NULL,
+    date DATE NOT NULL,
+    close_price DOUBLE,
+    volume BIGINT,
+    open_price DOUBLE,
+    high_price DOUBLE,
+    low_price DOUBLE
+)
+"""
+
+# PostgreSQL TO_CHAR patterns used by the queries, as strftime formats.
+# 'Month' is blank-padded to nine characters in PostgreSQL.
+_TO_CHAR_PATTERNS = {
+    'Month': lambda d: d.strftime('%B').ljust(9),
+    'Mon': lambda d: d.strftime('%b'),
+    'YYYY-MM': lambda d: d.strftime('%Y-%m'),
+    'YYYY-MM-DD': lambda d: d.strftime('%Y-%m-%d'),
+}
+
+
+def _to_char(value, pattern):
+    if value is None:
+        return None
+    try:
+        return _TO_CHAR_PATTERNS[pattern](value)
+    except KeyError:
+        raise ValueError(f'TO_CHAR pattern not supported: {pattern!r}') from None
+
+
+def _import_duckdb():
+    try:
+        import duckdb
+    except ImportError:
+        raise ImportError('The embedded SQL engine needs DuckDB: pip install -r requirements-sql.txt') from None
+    return duckdb
+
+
+def load_frame(price_store, start=None, end=None, tickers=None):
+    """stock_prices rows inside the window, sorted by (ticker, date)."""
+    index = dateindex.DateIndex(price_store)
+    frames = []
+    for ticker in tickers or price_store.tickers:
+        frame = index.frame(ticker, start, end)
+        frames.append(pd.DataFrame({
+            'ticker': ticker,
+            'date': frame['Date'],
+            'close_price': frame['Close'],
+            'volume': frame['Volume'],
+            'open_price': frame['Open'],
+            'high_price': frame['High'],
+            'low_price': frame['Low'],
+        }))
+    return pd.concat(frames, ignore_index=True)
+
+
+def connect(price_store=None, database=':memory:', start=None, end=None, tickers=None):
+    """Open DuckDB with stock_prices bulk-loaded and indexed (optionally one window)."""
+    duckdb = _import_duckdb()
+    price_store = price_store or store.open_store()
+    con = duckdb.connect(database)
+    con.create_function('to_char', _to_char, ['TIMESTAMP', 'VARCHAR'], 'VARCHAR')
+    con.execute('DROP TABLE IF EXISTS stock_prices')
+    con.execute(SCHEMA)
+    rows = load_frame(price_store, start, end, tickers)
+    con.register('stock_rows', rows)
+    # One set-based insert (COPY-style) in (ticker, date) order; the unique
+    # index also rejects duplicate bars, which the old hand loads let through.
+    con.execute('INSERT INTO stock_prices SELECT * FROM stock_rows ORDER BY ticker, date')
+    con.unregister('stock_rows')
+    con.execute('CREATE UNIQUE INDEX stock_prices_ticker_date ON stock_prices (ticker, date)')
+    return con
+
+
+def run_file(con, path):
+    """Execute every statement in a SQL file; returns one DataFrame per statement.
+
+    DuckDB aggregates in parallel, so results of statements without an
+    ORDER BY are sorted here to keep the exported files reproducible.
+    """
+    results = []
+    for statement in con.extract_statements(Path(path).read_text()):
+        result = con.execute(statement.query).df()
+        if 'order by' not in statement.query.lower():
+            result = result.sort_values(list(result.columns), ignore_index=True)
+        results.append(result)
+    return results
+
+
+def query_files():
+    return sorted(path for directory in QUERY_DIRS for path in directory.glob('*.sql'))
+
+
+def run_all(price_store=None, output_dir=outputs.OUTPUT_DIR, database=':memory:',
+            start=None, end=None, tickers=None):
+    """Run every query file and write the mapped outputs. Returns {step: seconds}."""
+    timings = {}
+    started = time.perf_counter()
+    con = connect(price_store, database, start, end, tickers)
+    timings['load'] = time.perf_counter() - started
+    try:
+        for path in query_files():
+            started = time.perf_counter()
+            results = run_file(con, path)
+            target = QUERY_OUTPUTS.get(path.name)
+            if isinstance(target, str):
+                target = {len(results) - 1: target}
+            for index, result in enumerate(results):
+                name = (target or {}).get(index)
+                if name is not None:
+                    outputs.write_table(result, name + '.csv', outputs.DECIMALS.get(name), output_dir)
+                elif len(result):
+                    print(f'{path.name} statement {index + 1}: {len(result)} row(s) returned')
+            timings[path.name] = time.perf_counter() - started
+    finally:
+        con.close()
+    return timings
+
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Run the SQL analyses in embedded DuckDB.')
+    parser.add_argument('--output-dir', default=outputs.OUTPUT_DIR)
+    parser.add_argument('--database', default=':memory:', help='DuckDB file to keep the loaded table')
+    parser.add_argument('--start', help='first date loaded (YYYY-MM-DD)')
+    parser.add_argument('--end', help='last date loaded (YYYY-MM-DD)')
+    parser.add_argument('--tickers', nargs='+', help='default: every ticker in the store')
+    args = parser.parse_args()
+
+    total = time.perf_counter()
+    timings = run_all(output_dir=args.output_dir, database=args.database,
+                      start=args.start, end=args.end, tickers=args.tickers)
+    for step, seconds in timings.items():
+        print(f'{step:<30} {seconds * 1000:9.1f} ms')
+    print(f"{'total':<30} {(time.perf_counter() - total) * 1000:9.1f} ms")
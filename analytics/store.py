@@ -0,0 +1,388 @@
+"""Columnar price store built from data/raw_data/<TICKER>_stock_data.csv.
+
+The raw exports use a "Close/Last" header, MM/DD/YY dates and newest-first
+order, and some of them carry a BOM or a broken Ticker column. They are parsed
+once into date-sorted NumPy columns under data/store/ and every consumer opens
+memory-mapped views of those columns instead of re-parsing text.
+
+Layout of the store directory:
+
+    CURRENT             name of the version directory readers should open
+    <version>/
+        manifest.json   ticker -> row range [start, stop) plus source fingerprint
+        date.npy        datetime64[D], all tickers concatenated, ascending per ticker
+        close.npy, open.npy, high.npy, low.npy   float64
+        volume.npy      int64
+
+Only CSVs whose mtime/size and then SHA-256 changed are parsed again; the
+segments of unchanged tickers are copied over from the previous version.
+Every rebuild writes a new version directory and then switches CURRENT with
+os.replace, so the files of a version never change once it is published. A
+PriceStore maps all of its columns when it is opened, so it keeps reading one
+consistent version even after later rebuilds prune it. (A store written in
+the older flat layout, with the files directly in the store directory, is
+still read and is migrated by the next rebuild.)
+"""
+
+import datetime as dt
+import hashlib
+import json
+import os
+import shutil
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+PROJECT_DIR = Path(__file__).resolve().parent.parent
+RAW_DIR = PROJECT_DIR / 'data' / 'raw_data'
+STORE_DIR = PROJECT_DIR / 'data' / 'store'
+
+CSV_SUFFIX = '_stock_data.csv'
+CSV_COLUMNS = ['Ticker', 'Date', 'Close/Last', 'Volume', 'Open', 'High', 'Low']
+DATE_FORMAT = '%m/%d/%y'
+
+FIELDS = ('close', 'volume', 'open', 'high', 'low')
+FIELD_DTYPES = {
+    'date': 'datetime64[D]',
+    'close': 'float64',
+    'volume': 'int64',
+    'open': 'float64',
+    'high': 'float64',
+    'low': 'float64',
+}
+MANIFEST = 'manifest.json'
+CURRENT = 'CURRENT'
+STORE_FORMAT = 1
+KEEP_VERSIONS = 2
+
+
+def discover_sources(raw_dir=RAW_DIR):
+    """Map ticker -> CSV path. The ticker comes from the file name, not the file."""
+    raw_dir = Path(raw_dir)
+    return {
+        path.name[:-len(CSV_SUFFIX)].upper(): path
+        for path in sorted(raw_dir.glob('*' + CSV_SUFFIX))
+    }
+
+
+def file_digest(path, chunk_size=1 << 20):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as fh:
+        for chunk in iter(lambda: fh.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def order_breaks(dates):
+    """Rows that step against a file's date order, counted before sorting.
+
+    Exports run newest first, but a file in ascending order is accepted too:
+    whichever direction most steps take is the file's order, and every step
+    the other way is one break. Equal dates are not breaks; the quality
+    checks count them as duplicates.
+    """
+    steps = np.diff(np.asarray(dates).astype(np.int64))
+    return int(min((steps > 0).sum(), (steps < 0).sum()))
+
+
+def parse_csv(path):
+    """Parse one raw export into ascending, typed column arrays.
+
+    The result also carries 'order_breaks' (see order_breaks()) for the rows
+    as they appear in the file.
+    """
+    df = pd.read_csv(
+        path,
+        header=0,
+        names=CSV_COLUMNS,
+        usecols=CSV_COLUMNS[1:],
+        dtype={'Date': str, 'Close/Last': 'float64', 'Volume': 'int64',
+               'Open': 'float64', 'High': 'float64', 'Low': 'float64'},
+        encoding='utf-8-sig',
+    )
+    dates = pd.to_datetime(df['Date'], format=DATE_FORMAT).to_numpy('datetime64[D]')
+    order = np.argsort(dates, kind='stable')
+    return {
+        'date': dates[order],
+        'close': df['Close/Last'].to_numpy()[order],
+        'volume': df['Volume'].to_numpy()[order],
+        'open': df['Open'].to_numpy()[order],
+        'high': df['High'].to_numpy()[order],
+        'low': df['Low'].to_numpy()[order],
+        'order_breaks': order_breaks(dates),
+    }
+
+
+def current_dir(root=STORE_DIR):
+    """Directory holding the store version readers should open."""
+    root = Path(root)
+    try:
+        version = (root / CURRENT).read_text().strip()
+    except FileNotFoundError:
+        return root
+    return root / version if version else root
+
+
+def _read_manifest(path):
+    path = Path(path) / MANIFEST
+    if not path.exists():
+        return None
+    with open(path) as fh:
+        manifest = json.load(fh)
+    if manifest.get('format') != STORE_FORMAT:
+        return None
+    return manifest
+
+
+def _write_manifest(path, manifest):
+    tmp = Path(path) / (MANIFEST + '.tmp')
+    with open(tmp, 'w') as fh:
+        json.dump(manifest, fh, indent=1, sort_keys=True)
+    os.replace(tmp, Path(path) / MANIFEST)
+
+
+def _publish(root, version):
+    """Point CURRENT at version, then drop all but the newest KEEP_VERSIONS versions."""
+    pointer = root / (CURRENT + '.tmp')
+    pointer.write_text(version + '\n')
+    os.replace(pointer, root / CURRENT)
+    for name in [MANIFEST] + [f'{field}.npy' for field in FIELD_DTYPES]:
+        # Files of the older flat layout.
+        (root / name).unlink(missing_ok=True)
+    versions = sorted(path.name for path in root.iterdir()
+                      if path.is_dir() and (path / MANIFEST).exists())
+    for old in versions[:-KEEP_VERSIONS]:
+        if old != version:
+            shutil.rmtree(root / old, ignore_errors=True)
+
+
+def build_store(raw_dir=RAW_DIR, root=STORE_DIR, force=False, chunk_rows=None, check=False):
+    """Bring the store in line with the raw CSVs and return a build summary.
+
+    A CSV is re-parsed only when its fingerprint changed: mtime and size are
+    checked first, and the SHA-256 is computed only if one of those moved.
+    With chunk_rows set, changed CSVs are streamed through analytics.ingest
+    into memory-mapped scratch columns instead of being read whole, so peak
+    memory no longer grows with file size.
+
+    With check, a new version is run through analytics.quality before it is
+    published; if an error check fails it is deleted, CURRENT keeps naming
+    the previous version, and the summary has 'rejected' set. The report is
+    returned as summary['quality'].
+    """
+    root = Path(root)
+    root.mkdir(parents=True, exist_ok=True)
+    sources = discover_sources(raw_dir)
+    old_dir = current_dir(root)
+    old = None if force else _read_manifest(old_dir)
+    old_tickers = old['tickers'] if old else {}
+
+    entries = {}
+    parsed = {}
+    for ticker, path in sources.items():
+        stat = path.stat()
+        entry = {'source': path.name, 'mtime_ns': stat.st_mtime_ns, 'size': stat.st_size}
+        previous = old_tickers.get(ticker)
+        if (previous and previous['mtime_ns'] == stat.st_mtime_ns
+                and previous['size'] == stat.st_size):
+            entry['sha256'] = previous['sha256']
+        else:
+            entry['sha256'] = file_digest(path)
+        # Manifests from before order_breaks was recorded need the file read once more.
+        if not previous or previous['sha256'] != entry['sha256'] or 'order_breaks' not in previous:
+            if chunk_rows:
+                from analytics import ingest
+                parsed[ticker] = ingest.spool_csv(path, root / 'spool' / ticker, chunk_rows)
+            else:
+                parsed[ticker] = parse_csv(path)
+            entry['order_breaks'] = parsed[ticker]['order_breaks']
+        else:
+            entry['order_breaks'] = previous['order_breaks']
+        entries[ticker] = entry
+
+    summary = {'parsed': sorted(parsed), 'reused': sorted(set(entries) - set(parsed)),
+               'removed': sorted(set(old_tickers) - set(entries))}
+    unchanged = not parsed and not summary['removed']
+    if unchanged and old is not None:
+        if any(entries[t]['mtime_ns'] != old_tickers[t]['mtime_ns'] for t in entries):
+            for ticker, entry in entries.items():
+                old_tickers[ticker].update(entry)
+            # Only fingerprints change; rows and offsets stay as readers mapped them.
+            _write_manifest(old_dir, old)
+        summary['rows'] = old['rows']
+        return summary
+
+    previous_columns = {}
+    if old is not None:
+        previous_columns = {name: np.load(old_dir / f'{name}.npy', mmap_mode='r')
+                            for name in FIELD_DTYPES}
+    version = dt.datetime.now(dt.timezone.utc).strftime('%Y%m%dT%H%M%S%f')
+    new_dir = root / f'.{version}.tmp'
+    shutil.rmtree(new_dir, ignore_errors=True)
+    new_dir.mkdir()
+
+    tickers = sorted(entries)
+    lengths = []
+    for ticker in tickers:
+        if ticker in parsed:
+            lengths.append(len(parsed[ticker]['date']))
+        else:
+            lengths.append(old_tickers[ticker]['stop'] - old_tickers[ticker]['start'])
+    offsets = np.concatenate([[0], np.cumsum(lengths, dtype=np.int64)])
+
+    for name, dtype in FIELD_DTYPES.items():
+        # Filled on disk one ticker segment at a time.
+        column = np.lib.format.open_memmap(new_dir / f'{name}.npy', mode='w+', dtype=dtype,
+                                           shape=(int(offsets[-1]),))
+        for i, ticker in enumerate(tickers):
+            if ticker in parsed:
+                segment = parsed[ticker][name]
+            else:
+                segment = previous_columns[name][old_tickers[ticker]['start']:old_tickers[ticker]['stop']]
+            column[offsets[i]:offsets[i + 1]] = segment
+        column.flush()
+        del column
+    previous_columns.clear()
+    parsed.clear()
+    shutil.rmtree(root / 'spool', ignore_errors=True)
+
+    for i, ticker in enumerate(tickers):
+        entries[ticker]['start'] = int(offsets[i])
+        entries[ticker]['stop'] = int(offsets[i + 1])
+    _write_manifest(new_dir, {'format': STORE_FORMAT, 'rows': int(offsets[-1]), 'tickers': entries})
+    summary['rows'] = int(offsets[-1])
+    if check:
+        from analytics import quality
+        columns = {name: np.load(new_dir / f'{name}.npy', mmap_mode='r') for name in FIELD_DTYPES}
+        summary['quality'] = quality.check_columns(
+            tickers, offsets[:-1], offsets[1:], columns,
+            order_breaks=[entries[ticker]['order_breaks'] for ticker in tickers])
+        columns.clear()
+        if not summary['quality']['passed']:
+            shutil.rmtree(new_dir, ignore_errors=True)
+            summary['rejected'] = True
+            return summary
+    os.replace(new_dir, root / version)
+    _publish(root, version)
+    return summary
+
+
+class PriceStore:
+    """Read-only, memory-mapped view over one version of a built store.
+
+    Every column is mapped here, so the object keeps seeing the version it
+    opened however often the store is rebuilt afterwards.
+    """
+
+    def __init__(self, root=STORE_DIR):
+        self.root = Path(root)
+        self.path = current_dir(self.root)
+        manifest = _read_manifest(self.path)
+        if manifest is None:
+            raise FileNotFoundError(f'No price store at {self.root}; run build_store() first')
+        self._entries = manifest['tickers']
+        self.tickers = sorted(self._entries)
+        self.rows = manifest['rows']
+        self.version = hashlib.sha1(
+            ''.join(self._entries[t]['sha256'] for t in self.tickers).encode()
+        ).hexdigest()[:16]
+        self._columns = {name: np.load(self.path / f'{name}.npy', mmap_mode='r')
+                         for name in FIELD_DTYPES}
+
+    def __contains__(self, ticker):
+        return ticker in self._entries
+
+    def _column(self, name):
+        return self._columns[name]
+
+    def _bounds(self, ticker):
+        try:
+            entry = self._entries[ticker]
+        except KeyError:
+            raise KeyError(f'Unknown ticker: {ticker}') from None
+        return entry['start'], entry['stop']
+
+    def segments(self):
+        """(starts, stops) row ranges of every ticker, in self.tickers order."""
+        bounds = np.array([self._bounds(t) for t in self.tickers], dtype=np.int64).reshape(-1, 2)
+        return bounds[:, 0], bounds[:, 1]
+
+    def order_breaks(self):
+        """Rows out of date order in each ticker's source file (self.tickers order), or None
+        if the manifest predates the count."""
+        if any('order_breaks' not in self._entries[t] for t in self.tickers):
+            return None
+        return np.array([self._entries[t]['order_breaks'] for t in self.tickers], dtype=np.int64)
+
+    def field(self, name):
+        """Memory-mapped column of one field for all tickers, concatenated."""
+        return self._column(name)
+
+    def column(self, ticker, field):
+        """Zero-copy view of one field for one ticker, ascending by date."""
+        start, stop = self._bounds(ticker)
+        return self._column(field)[start:stop]
+
+    def dates(self, ticker):
+        return self.column(ticker, 'date')
+
+    def frame(self, ticker):
+        start, stop = self._bounds(ticker)
+        data = {'Date': self._column('date')[start:stop]}
+        for field in FIELDS:
+            data[field.capitalize()] = self._column(field)[start:stop]
+        return pd.DataFrame(data)
+
+    def panel(self, field='close', tickers=None):
+        """Align tickers on a shared calendar.
+
+        Returns (dates, tickers, values) where values is a float64
+        (dates x tickers) matrix with NaN where a ticker has no row.
+        """
+        tickers = list(self.tickers if tickers is None else tickers)
+        bounds = np.array([self._bounds(t) for t in tickers], dtype=np.int64).reshape(-1, 2)
+        lengths = bounds[:, 1] - bounds[:, 0]
+        first = np.cumsum(lengths) - lengths
+        rows = np.arange(lengths.sum()) + np.repeat(bounds[:, 0] - first, lengths)
+        all_dates = self._column('date')[rows]
+        calendar = np.unique(all_dates)
+        values = np.full((len(calendar), len(tickers)), np.nan)
+        values[np.searchsorted(calendar, all_dates),
+               np.repeat(np.arange(len(tickers)), lengths)] = self._column(field)[rows]
+        return calendar, tickers, values
+
+
+def open_store(raw_dir=RAW_DIR, root=STORE_DIR):
+    """Refresh the store from the raw CSVs if needed and open it."""
+    build_store(raw_dir, root)
+    return PriceStore(root)
+
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Build the columnar price store from raw CSVs.')
+    parser.add_argument('--raw-dir', default=RAW_DIR)
+    parser.add_argument('--store-dir', default=STORE_DIR)
+    parser.add_argument('--force', action='store_true', help='re-parse every CSV')
+    parser.add_argument('--chunk-rows', type=int, help='stream CSVs in chunks of this many rows')
+    parser.add_argument('--check', action='store_true',
+                        help='run the data-quality checks, publish only if they pass (exit 1 if not)')
+    args = parser.parse_args()
+
+    result = build_store(args.raw_dir, args.store_dir, force=args.force, chunk_rows=args.chunk_rows,
+                         check=args.check)
+    print(f"rows={result['rows']} parsed={len(result['parsed'])} "
+          f"reused={len(result['reused'])} removed={len(result['removed'])}")
+    if args.check:
+        import sys
+        from analytics import quality
+
+        # Nothing was rebuilt: check the version that is already published.
+        report = result.get('quality') or quality.check_store(PriceStore(args.store_dir))
+        failed = {check: count for check, count in report['errors'].items() if count}
+        print(f"quality: {'passed' if report['passed'] else f'FAILED {failed}'}")
+        if result.get('rejected'):
+            print(f'not published; {CURRENT} still names {current_dir(args.store_dir).name}')
+        sys.exit(0 if report['passed'] else 1)
@@ -0,0 +1,155 @@
+"""Technical indicators over (dates x tickers) arrays.
+
+RSI, MACD, Bollinger bands, ATR and the 50/200-day moving-average state are
+computed for the whole ticker universe at once: recursive indicators loop
+over dates only, updating every ticker per step, and windowed ones reuse the
+cumulative-sum kernels in analytics.rolling. signal_table() reduces the
+latest values to the table shown on the Technical Analysis page.
+"""
+
+import numpy as np
+import pandas as pd
+
+from analytics import rolling
+from analytics.metrics import forward_fill
+
+RSI_PERIOD = 14
+OVERBOUGHT = 70
+OVERSOLD = 30
+
+
+def wilder_smooth(values, period):
+    """Wilder's running average: seeded with the mean of the first `period`
+    valid values, then avg += (x - avg) / period.
+
+    Rows before a ticker's seed are NaN; missing values keep the previous
+    average.
+    """
+    values = rolling._as_2d(values)
+    out = np.full(values.shape, np.nan)
+    seen = np.zeros(values.shape[1], dtype=np.int64)
+    total = np.zeros(values.shape[1])
+    avg = np.full(values.shape[1], np.nan)
+    for i in range(values.shape[0]):
+        row = values[i]
+        valid = ~np.isnan(row)
+        warming = valid & (seen < period)
+        step = valid & ~warming
+        total[warming] += row[warming]
+        seen[valid] += 1
+        ready = warming & (seen == period)
+        avg[ready] = total[ready] / period
+        avg[step] += (row[step] - avg[step]) / period
+        out[i] = avg
+    return out
+
+
+def _changes(prices):
+    """Day-over-day change with the input's shape (first row NaN)."""
+    prices = rolling._as_2d(prices)
+    changes = np.full(prices.shape, np.nan)
+    np.subtract(prices[1:], prices[:-1], out=changes[1:])
+    return changes
+
+
+def rsi(prices, period=RSI_PERIOD):
+    """Wilder's Relative Strength Index, 0-100."""
+    changes = _changes(prices)
+    gains = np.maximum(changes, 0.0)
+    losses = np.maximum(-changes, 0.0)
+    avg_gain = wilder_smooth(gains, period)
+    avg_loss = wilder_smooth(losses, period)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        value = 100.0 - 100.0 / (1.0 + avg_gain / avg_loss)
+    # No losses in the window: RSI is 100 (50 if the price did not move).
+    flat = avg_loss == 0
+    value[flat] = np.where(avg_gain[flat] > 0, 100.0, 50.0)
+    return value
+
+
+def macd(prices, fast=12, slow=26, signal=9):
+    """(macd line, signal line, histogram) from exponential averages."""
+    line = rolling.ema(prices, span=fast) - rolling.ema(prices, span=slow)
+    signal_line = rolling.ema(line, span=signal)
+    return line, signal_line, line - signal_line
+
+
+def bollinger(prices, window=20, width=2.0):
+    """(middle, upper, lower, %B) bands around a simple moving average."""
+    prices = rolling._as_2d(prices)
+    middle = rolling.sma(prices, window)
+    spread = width * rolling.rolling_std(prices, window, ddof=0)
+    upper, lower = middle + spread, middle - spread
+    with np.errstate(divide='ignore', invalid='ignore'):
+        percent_b = (prices - lower) / (upper - lower)
+    return middle, upper, lower, percent_b
+
+
+def true_range(high, low, close):
+    """Largest of high - low and the gaps from the previous close."""
+    high, low, close = rolling._as_2d(high), rolling._as_2d(low), rolling._as_2d(close)
+    ranges = high - low
+    previous = close[:-1]
+    with np.errstate(invalid='ignore'):
+        ranges[1:] = np.fmax(ranges[1:], np.fmax(np.abs(high[1:] - previous),
+                                                 np.abs(low[1:] - previous)))
+    return ranges
+
+
+def atr(high, low, close, period=RSI_PERIOD):
+    """Average True Range (Wilder-smoothed)."""
+    return wilder_smooth(true_range(high, low, close), period)
+
+
+def indicators(close, high, low, fast=50, slow=200):
+    """Every indicator for a (dates x tickers) panel, as a dict of 2-D arrays.
+
+    Missing days are forward-filled first, so the last row holds each
+    ticker's latest values.
+    """
+    close, high, low = (forward_fill(rolling._as_2d(values)) for values in (close, high, low))
+    ma_fast, ma_slow, _ = rolling.crossover_signals(close, fast, slow)
+    macd_line, macd_signal, macd_hist = macd(close)
+    _, upper, lower, percent_b = bollinger(close)
+    return {
+        'close': close,
+        'rsi': rsi(close),
+        'macd': macd_line,
+        'macd_signal': macd_signal,
+        'macd_hist': macd_hist,
+        'bollinger_upper': upper,
+        'bollinger_lower': lower,
+        'percent_b': percent_b,
+        'atr': atr(high, low, close),
+        'ma_fast': ma_fast,
+        'ma_slow': ma_slow,
+    }
+
+
+def signal_table(tickers, close, high, low, fast=50, slow=200):
+    """Latest indicators and a Buy/Hold/Sell call per ticker.
+
+    Trend is Bullish when the fast average is above the slow one and the
+    MACD histogram is positive, Bearish for the mirror case, otherwise
+    Neutral. The signal follows RSI extremes first (overbought -> Sell,
+    oversold -> Buy) and the trend otherwise.
+    """
+    latest = {name: values[-1] for name, values in indicators(close, high, low, fast, slow).items()}
+    above = latest['ma_fast'] > latest['ma_slow']
+    below = latest['ma_fast'] < latest['ma_slow']
+    hist = latest['macd_hist']
+    trend = np.select([above & (hist > 0), below & (hist < 0)], ['Bullish', 'Bearish'], 'Neutral')
+    value = latest['rsi']
+    signal = np.select(
+        [value >= OVERBOUGHT, value <= OVERSOLD, trend == 'Bullish', trend == 'Bearish'],
+        ['Sell', 'Buy', 'Buy', 'Sell'], 'Hold')
+    return pd.DataFrame({
+        'Ticker': np.asarray(tickers, dtype=object),
+        'RSI': value.round(1),
+        'Trend': trend.astype(object),
+        f'{fast}D vs {slow}D MA': np.select([above, below], ['Above', 'Below'], 'N/A').astype(object),
+        'Signal': signal.astype(object),
+        'MACD Hist': hist.round(2),
+        'Bollinger %B': latest['percent_b'].round(2),
+        'ATR %': (latest['atr'] / latest['close'] * 100).round(2),
+    })
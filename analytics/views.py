@@ -0,0 +1,116 @@
+"""The tables and arrays behind the dashboard pages, computed from price panels.
+
+Every view takes `panel`, a callable mapping a field name ('close',
+'volume', ...) to the (dates, tickers, values) panel to use. analytics.dashboard
+passes a window or ticker subset of the store and caches the result per
+request; analytics.snapshot passes the whole store and publishes the default
+views in a bundle, so the pages can serve them without computing anything.
+"""
+
+import pandas as pd
+
+from analytics import (backtest, correlation, metrics, overview, portfolio, seasonality,
+                       technical, volume)
+
+SWEEP_FASTS = tuple(range(10, 101, 10))
+SWEEP_SLOWS = tuple(range(50, 301, 25))
+SWEEP_THRESHOLDS = (0.0, 0.01)
+# (window, method) of the Trends page's volume baselines.
+VOLUME_BASELINES = ((20, 'rolling'), (60, 'rolling'), (20, 'ewma'))
+CORRELATION_WINDOWS = (20, 60, 120, 250)
+CANDIDATES = 10_000
+
+
+def metrics_table(panel, benchmark='SPY'):
+    dates, tickers, prices = panel('close')
+    return metrics.metrics_table(dates, tickers, prices, benchmark)
+
+
+def overview_figures(panel, benchmark='SPY'):
+    dates, tickers, prices = panel('close')
+    return overview.summary(dates, metrics.metrics_table(dates, tickers, prices, benchmark), benchmark)
+
+
+def technical_table(panel, fast=50, slow=200):
+    _, tickers, close = panel('close')
+    return technical.signal_table(tickers, close, panel('high')[2], panel('low')[2], fast, slow)
+
+
+def crossover_backtest(panel, fasts=SWEEP_FASTS, slows=SWEEP_SLOWS, thresholds=SWEEP_THRESHOLDS,
+                       short=False, cost=0.0):
+    _, tickers, close = panel('close')
+    return backtest.sweep(tickers, close, fasts, slows, thresholds, short, cost)
+
+
+def volume_zscores(panel, window=volume.WINDOW, method='rolling'):
+    dates, tickers, values = panel('volume')
+    return (dates, tickers) + volume.zscores(values, window, method)
+
+
+def volume_anomalies(panel, window=volume.WINDOW, method='rolling', k=volume.TOP_K):
+    dates, tickers, close = panel('close')
+    return volume.anomalies_table(dates, tickers, close, panel('volume')[2], window, method, k)
+
+
+def seasonality_table(panel, by='month'):
+    dates, tickers, close = panel('close')
+    return seasonality.seasonality_table(dates, tickers, close, by)
+
+
+def correlation_matrix(panel):
+    _, tickers, prices = panel('close')
+    corr, _ = correlation.correlation_matrix(metrics.daily_returns(prices))
+    return pd.DataFrame(corr, index=tickers, columns=tickers)
+
+
+def rolling_correlation(panel, window, benchmark='SPY'):
+    dates, tickers, prices = panel('close')
+    returns = metrics.daily_returns(prices)
+    rolling_corr = correlation.rolling_correlation(returns, returns[:, tickers.index(benchmark)], window)
+    return pd.DataFrame(rolling_corr, index=dates[1:], columns=tickers).drop(columns=benchmark)
+
+
+def portfolio_returns(panel, benchmark='SPY'):
+    """(tickers, daily returns on fully populated days, benchmark returns or None)."""
+    _, tickers, close = panel('close')
+    returns = portfolio.complete_rows(metrics.daily_returns(close))
+    bench = returns[:, tickers.index(benchmark)] if benchmark in tickers else None
+    return tickers, returns, bench
+
+
+def portfolio_candidates(returns_view, n=CANDIDATES, seed=0):
+    """(weights, risk) for n random long-only portfolios over a portfolio_returns() view."""
+    tickers, returns, bench = returns_view
+    weights = portfolio.random_weights(n, len(tickers), seed)
+    return weights, portfolio.portfolio_risk(returns, weights, bench)
+
+
+def defaults(benchmark='SPY'):
+    """(metric, params, compute(panel)) for every view the pages show before any input.
+
+    metric and params are what analytics.dashboard passes to cached() for
+    the same view, so a published bundle answers exactly those lookups.
+    """
+    views = [
+        ('metrics_table', {'benchmark': benchmark}, lambda p: metrics_table(p, benchmark)),
+        ('overview', {'benchmark': benchmark}, lambda p: overview_figures(p, benchmark)),
+        ('technical_table', {'fast': 50, 'slow': 200}, lambda p: technical_table(p, 50, 200)),
+        ('crossover_backtest', {'fasts': SWEEP_FASTS, 'slows': SWEEP_SLOWS,
+                                'thresholds': SWEEP_THRESHOLDS, 'short': False, 'cost': 0.0},
+         crossover_backtest),
+        ('correlation_matrix', {}, correlation_matrix),
+        ('portfolio_returns', {'benchmark': benchmark}, lambda p: portfolio_returns(p, benchmark)),
+        ('portfolio_candidates', {'n': CANDIDATES, 'seed': 0, 'benchmark': benchmark},
+         lambda p: portfolio_candidates(portfolio_returns(p, benchmark))),
+    ]
+    for window, method in VOLUME_BASELINES:
+        views.append(('volume_zscores', {'window': window, 'method': method},
+                      lambda p, w=window, m=method: volume_zscores(p, w, m)))
+        views.append(('volume_anomalies', {'window': window, 'method': method, 'k': volume.TOP_K},
+                      lambda p, w=window, m=method: volume_anomalies(p, w, m)))
+    for by in seasonality.GROUPINGS:
+        views.append(('seasonality_table', {'by': by}, lambda p, b=by: seasonality_table(p, b)))
+    for window in CORRELATION_WINDOWS:
+        views.append(('rolling_correlation', {'window': window, 'benchmark': benchmark},
+                      lambda p, w=window: rolling_correlation(p, w, benchmark)))
+    return views
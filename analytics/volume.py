@@ -0,0 +1,270 @@
+"""Volume anomalies: rolling or EWMA z-scores and a bounded top-K.
+
+analysis_queries/volume_analysis.sql scored every day against the ticker's
+full-history mean and standard deviation, which hides regime changes (a
+volume level that is normal in 2025 looks extreme against 2020), and then
+sorted all flagged rows to keep 20. Here each day is scored against the
+trailing window that ends the day before (a rolling 20/60-day window or an
+exponentially weighted one), for all tickers at once, and only the K largest
+scores are kept, in a heap of size K.
+
+VolumeAnomalyStream applies the same scoring one bar at a time; the
+end-of-day batch (analytics.incremental) keeps one in its saved state and
+checks it against zscores() with --verify.
+"""
+
+import heapq
+from itertools import count
+
+import numpy as np
+import pandas as pd
+
+from analytics import rolling
+
+WINDOW = 20
+SIGMA = 2.0
+TOP_K = 20
+METHODS = ('rolling', 'ewma')
+
+
+def zscores(volume, window=WINDOW, method='rolling'):
+    """(z, ratio) of each day's volume against the trailing baseline.
+
+    The baseline covers the `window` days before each row (for 'ewma',
+    window is the span), so a spike never dilutes its own reference. Rows
+    without a full baseline are NaN.
+    """
+    volume = rolling._as_2d(volume)
+    if method == 'rolling':
+        mean = rolling.sma(volume, window)
+        std = rolling.rolling_std(volume, window)
+    elif method == 'ewma':
+        mean, std = ewma_moments(volume, window)
+        # The recursion starts at the first observation; wait for one span.
+        seen = np.cumsum(~np.isnan(volume), axis=0)
+        mean[seen < window] = np.nan
+    else:
+        raise ValueError(f'method must be one of {METHODS}')
+    baseline_mean = np.full(volume.shape, np.nan)
+    baseline_std = np.full(volume.shape, np.nan)
+    baseline_mean[1:], baseline_std[1:] = mean[:-1], std[:-1]
+    with np.errstate(invalid='ignore', divide='ignore'):
+        z = (volume - baseline_mean) / baseline_std
+        ratio = volume / baseline_mean
+    return z, ratio
+
+
+def ewma_moments(values, span):
+    """Exponentially weighted mean and standard deviation (adjust=False).
+
+    Loops over rows like rolling.ema(), updating every ticker per step.
+    """
+    alpha = 2.0 / (span + 1.0)
+    values = rolling._as_2d(values)
+    mean_out = np.full(values.shape, np.nan)
+    std_out = np.full(values.shape, np.nan)
+    mean = np.full(values.shape[1], np.nan)
+    var = np.zeros(values.shape[1])
+    for i in range(values.shape[0]):
+        row = values[i]
+        update = ~np.isnan(row)
+        seed = update & np.isnan(mean)
+        mean[seed] = row[seed]
+        step = update & ~seed
+        delta = row[step] - mean[step]
+        mean[step] += alpha * delta
+        var[step] = (1.0 - alpha) * (var[step] + alpha * delta * delta)
+        mean_out[i] = mean
+        std_out[i] = np.sqrt(var)
+    return mean_out, std_out
+
+
+class TopK:
+    """The k largest (score, item) pairs seen so far, in a min-heap of size k."""
+
+    def __init__(self, k=TOP_K):
+        self.k = k
+        self._heap = []
+        self._order = count()
+
+    def push(self, score, item):
+        entry = (score, -next(self._order), item)
+        if len(self._heap) < self.k:
+            heapq.heappush(self._heap, entry)
+        elif entry > self._heap[0]:
+            heapq.heapreplace(self._heap, entry)
+
+    def push_many(self, scores, items):
+        for score, item in zip(scores, items):
+            self.push(score, item)
+
+    @property
+    def threshold(self):
+        """Smallest score still kept once the heap is full, else -inf."""
+        return self._heap[0][0] if len(self._heap) == self.k else -np.inf
+
+    def items(self):
+        """(score, item) pairs, largest first; ties keep arrival order."""
+        return [(score, item) for score, _, item in sorted(self._heap, reverse=True)]
+
+
+def top_anomalies(z, k=TOP_K, sigma=SIGMA):
+    """(rows, cols) of the k largest z-scores above sigma, largest first.
+
+    Only flagged cells enter the heap, so the cost is O(flagged x log k).
+    """
+    with np.errstate(invalid='ignore'):
+        rows, cols = np.nonzero(z > sigma)
+    top = TopK(k)
+    top.push_many(z[rows, cols].tolist(), zip(rows.tolist(), cols.tolist()))
+    kept = [item for _, item in top.items()]
+    if not kept:
+        return np.array([], dtype=np.int64), np.array([], dtype=np.int64)
+    rows, cols = (np.array(axis, dtype=np.int64) for axis in zip(*kept))
+    return rows, cols
+
+
+def anomalies_table(dates, tickers, close, volume, window=WINDOW, method='rolling',
+                    k=TOP_K, sigma=SIGMA):
+    """Top-k volume days in the layout of data_outputs/high_volume_analysis.csv."""
+    volume = rolling._as_2d(volume)
+    close = rolling._as_2d(close)
+    z, ratio = zscores(volume, window, method)
+    rows, cols = top_anomalies(z, k, sigma)
+    return pd.DataFrame({
+        'ticker': np.asarray(tickers, dtype=object)[cols],
+        'date': np.asarray(dates)[rows],
+        'close_price': close[rows, cols],
+        'volume': volume[rows, cols].astype(np.int64),
+        'volume_ratio': ratio[rows, cols],
+        'volume_z_score': z[rows, cols],
+    })
+
+
+class VolumeAnomalyStream:
+    """Streaming version of zscores() plus a running top-K.
+
+    Rolling mode keeps the last `window` volumes per ticker in a ring buffer
+    with running sums (offset by each ticker's first volume to keep the
+    squares well conditioned); EWMA mode keeps the mean/variance recursion.
+    """
+
+    _STATE_ARRAYS = ('bars', 'offset', 'ring', 'sum', 'sum_sq', 'mean', 'var')
+
+    def __init__(self, tickers, window=WINDOW, method='rolling', k=TOP_K, sigma=SIGMA):
+        if method not in METHODS:
+            raise ValueError(f'method must be one of {METHODS}')
+        n = len(tickers)
+        self.tickers = list(tickers)
+        self.window = window
+        self.method = method
+        self.sigma = sigma
+        self.top = TopK(k)
+        self.bars = np.zeros(n, dtype=np.int64)
+        self.offset = np.full(n, np.nan)
+        self.ring = np.zeros((window, n))
+        self.sum = np.zeros(n)
+        self.sum_sq = np.zeros(n)
+        self.mean = np.full(n, np.nan)
+        self.var = np.zeros(n)
+
+    def baseline(self):
+        """(mean, std) the next bar will be scored against; NaN until warm."""
+        with np.errstate(invalid='ignore', divide='ignore'):
+            if self.method == 'ewma':
+                warm = self.bars >= self.window
+                return np.where(warm, self.mean, np.nan), np.where(warm, np.sqrt(self.var), np.nan)
+            warm = self.bars >= self.window
+            mean = self.sum / self.window
+            var = (self.sum_sq - self.sum * mean) / (self.window - 1)
+            return (np.where(warm, mean + self.offset, np.nan),
+                    np.where(warm, np.sqrt(np.maximum(var, 0.0)), np.nan))
+
+    def update(self, volume, close=None, date=None):
+        """Score one bar per ticker (NaN = no bar), then fold it into the state.
+
+        Returns the z-scores; flagged bars are offered to the running top-K
+        as (ticker, date, close, volume, ratio) items.
+        """
+        volume = np.asarray(volume, dtype=np.float64)
+        mean, std = self.baseline()
+        with np.errstate(invalid='ignore', divide='ignore'):
+            z = (volume - mean) / std
+            ratio = volume / mean
+            flagged = np.flatnonzero(z > self.sigma)
+        for col in flagged.tolist():
+            if z[col] > self.top.threshold:
+                self.top.push(float(z[col]), (self.tickers[col], date,
+                                              None if close is None else float(close[col]),
+                                              int(volume[col]), float(ratio[col])))
+
+        cols = np.flatnonzero(~np.isnan(volume))
+        v = volume[cols]
+        if self.method == 'ewma':
+            alpha = 2.0 / (self.window + 1.0)
+            seed = np.isnan(self.mean[cols])
+            self.mean[cols[seed]] = v[seed]
+            step = cols[~seed]
+            delta = volume[step] - self.mean[step]
+            self.mean[step] += alpha * delta
+            self.var[step] = (1.0 - alpha) * (self.var[step] + alpha * delta * delta)
+        else:
+            first = np.isnan(self.offset[cols])
+            self.offset[cols[first]] = v[first]
+            shifted = v - self.offset[cols]
+            bars = self.bars[cols]
+            slot = bars % self.window
+            leaving = np.where(bars >= self.window, self.ring[slot, cols], 0.0)
+            self.sum[cols] += shifted - leaving
+            self.sum_sq[cols] += shifted * shifted - leaving * leaving
+            self.ring[slot, cols] = shifted
+        self.bars[cols] += 1
+        return z
+
+    def arrays(self):
+        """The whole state as named arrays for np.savez; see from_arrays()."""
+        # Heap entries are (score, -arrival, item); saved in arrival order so
+        # replaying them keeps the tie-breaking.
+        entries = sorted(self.top._heap, key=lambda entry: -entry[1])
+        items = [item for _, _, item in entries]
+        return {
+            'tickers': np.array(self.tickers),
+            'settings': np.array([self.window, self.top.k]),
+            'method': np.array(self.method),
+            'sigma': np.array(self.sigma),
+            **{name: getattr(self, name) for name in self._STATE_ARRAYS},
+            'top_score': np.array([score for score, _, _ in entries], dtype=np.float64),
+            'top_ticker': np.array([item[0] for item in items], dtype=str),
+            'top_date': np.array([item[1] for item in items], dtype='datetime64[D]'),
+            'top_close': np.array([np.nan if item[2] is None else item[2] for item in items],
+                                  dtype=np.float64),
+            'top_volume': np.array([item[3] for item in items], dtype=np.int64),
+            'top_ratio': np.array([item[4] for item in items], dtype=np.float64),
+        }
+
+    @classmethod
+    def from_arrays(cls, arrays):
+        window, k = (int(value) for value in arrays['settings'])
+        stream = cls(arrays['tickers'].tolist(), window, str(arrays['method']), k,
+                     float(arrays['sigma']))
+        for name in cls._STATE_ARRAYS:
+            setattr(stream, name, np.array(arrays[name]))
+        for score, ticker, date, close, volume, ratio in zip(
+                arrays['top_score'].tolist(), arrays['top_ticker'].tolist(), arrays['top_date'],
+                arrays['top_close'].tolist(), arrays['top_volume'].tolist(),
+                arrays['top_ratio'].tolist()):
+            stream.top.push(score, (ticker, None if np.isnat(date) else date,
+                                    None if np.isnan(close) else close, volume, ratio))
+        return stream
+
+    def table(self):
+        """The running top-K in the high_volume_analysis.csv layout."""
+        items = self.top.items()
+        return pd.DataFrame({
+            'ticker': [item[0] for _, item in items],
+            'date': [item[1] for _, item in items],
+            'close_price': [item[2] for _, item in items],
+            'volume': [item[3] for _, item in items],
+            'volume_ratio': [item[4] for _, item in items],
+            'volume_z_score': [score for score, _ in items],
+        })
@@ -1,5 +1,6 @@
 import streamlit as st
-import pandas as pd
+
+from analytics import overview
 
 st.set_page_config(
     page_title="Financial Analysis Dashboard",
@@ -19,19 +20,29 @@ and market trends for major technology companies compared to market benchmarks.
 # Quick Overview
 st.subheader("Portfolio Overview")
 
+# Served from the published snapshot without loading pandas; computed if there is none yet.
+figures = overview.published()
+if figures is None:
+    from analytics.dashboard import overview as compute_overview
+    figures = compute_overview()
+
 col1, col2, col3, col4 = st.columns(4)
 
 with col1:
-    st.metric("Stocks Analyzed", "6", "Major Tech")
+    st.metric("Stocks Analyzed", str(figures['stocks']), f"vs {figures['benchmark']}",
+              delta_color="off")
 
 with col2:
-    st.metric("Analysis Period", "5 Years", "2019-2024")
+    st.metric("Analysis Period", f"{figures['years']:.1f} Years",
+              f"{figures['start'][:4]}-{figures['end'][:4]}", delta_color="off")
 
 with col3:
-    st.metric("Best Performer", "TSLA", "343.9%")
+    st.metric("Best Performer", figures['best'], f"{figures['best_return']:.1f}%")
 
 with col4:
-    st.metric("Market Benchmark", "SPY", "100.0%")
+    market_return = figures['benchmark_return']
+    st.metric("Market Benchmark", figures['benchmark'],
+              None if market_return is None else f"{market_return:.1f}%")
 
 # Navigation Guide
 st.markdown("---")
@@ -0,0 +1,64 @@
+"""MA crossover sweep from one cumulative sum vs recomputing rolling means per pair.
+
+    python -m benchmarks.bench_backtest --tickers 100 --years 10 --pairs-sample 20
+"""
+
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from analytics import backtest
+from benchmarks.bench_rolling import synthetic_prices
+
+
+def pandas_pair(close, fast, slow, threshold):
+    """One parameter set: rolling means and the long/flat strategy with pandas."""
+    prices = pd.DataFrame(close)
+    spread = prices.rolling(fast).mean() / prices.rolling(slow).mean() - 1.0
+    held = (spread > threshold).astype(float).shift(1).fillna(0.0)
+    daily = held * prices.pct_change().fillna(0.0)
+    trades = held.diff().abs().fillna(held.abs())
+    return (1.0 + daily).prod() - 1.0, daily.mean() / daily.std() * np.sqrt(252), trades.sum()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--tickers', type=int, default=100)
+    parser.add_argument('--years', type=int, default=10)
+    parser.add_argument('--fast', default='5:100:5')
+    parser.add_argument('--slow', default='50:300:10')
+    parser.add_argument('--thresholds', nargs='+', type=float, default=[0.0, 0.01, 0.02])
+    parser.add_argument('--workers', type=int, nargs='+', default=[1])
+    parser.add_argument('--pairs-sample', type=int, default=20,
+                        help='parameter sets timed in the pandas baseline (extrapolated)')
+    args = parser.parse_args()
+
+    close = synthetic_prices(args.years * 252, args.tickers)
+    tickers = [f'T{i:05d}' for i in range(args.tickers)]
+    fasts, slows = backtest._windows(args.fast), backtest._windows(args.slow)
+    combos = len(backtest.window_pairs(fasts, slows)) * len(args.thresholds)
+    print(f'{combos:,} parameter sets x {args.tickers} tickers x {len(close)} days')
+
+    for workers in args.workers:
+        started = time.perf_counter()
+        results = backtest.sweep(tickers, close, fasts, slows, args.thresholds, workers=workers)
+        t_sweep = time.perf_counter() - started
+        print(f'sweep workers={workers}: {t_sweep:8.2f} s  ({len(results) / t_sweep:,.0f} backtests/s)')
+
+    sample = backtest.window_pairs(fasts, slows)[:args.pairs_sample]
+    started = time.perf_counter()
+    for fast, slow in sample:
+        total, _, trades = pandas_pair(close, fast, slow, args.thresholds[0])
+    t_pandas = (time.perf_counter() - started) * combos / len(sample)
+    fast, slow = sample[-1]
+    row = results[(results['fast'] == fast) & (results['slow'] == slow)
+                  & (results['threshold'] == args.thresholds[0])]
+    gap = np.abs(row['Total Return %'].to_numpy() - total.to_numpy() * 100).max()
+    print(f'pandas (estimate)  : {t_pandas:8.2f} s   max total-return gap {gap:.1e} pp')
+    print(f'speedup            : {t_pandas / t_sweep:8.1f}x')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,80 @@
+"""Date-window lookups: binary search (analytics.dateindex) vs scanning every row.
+
+Runs on a synthetic store of --tickers x --years (cached like benchmarks.suite)
+and times a batch of random windows:
+
+    store rows   segmented binary search over all tickers vs a boolean mask of the date column
+    panel rows   calendar searchsorted + row slice vs a pandas boolean .loc
+    range change panel window + metrics_table on the slice (what a sidebar change costs)
+
+    python -m benchmarks.bench_dateindex --tickers 2000 --years 20
+"""
+
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from analytics import dateindex, metrics, store
+from benchmarks.suite import DATA_DIR, raw_panel
+
+
+def best_of(fn, windows, repeat):
+    """Best mean seconds per window over `repeat` passes."""
+    best = float('inf')
+    for _ in range(repeat):
+        started = time.perf_counter()
+        for start, end in windows:
+            fn(start, end)
+        best = min(best, (time.perf_counter() - started) / len(windows))
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--tickers', type=int, default=2000)
+    parser.add_argument('--years', type=int, default=20)
+    parser.add_argument('--windows', type=int, default=20)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    raw_dir = raw_panel(args.tickers, args.years)
+    store_dir = DATA_DIR / f'{args.tickers}x{args.years}' / 'store'
+    store.build_store(raw_dir, store_dir)
+    price_store = store.PriceStore(store_dir)
+
+    started = time.perf_counter()
+    index = dateindex.DateIndex(price_store)
+    print(f'{price_store.rows:,} rows, {len(index.tickers):,} tickers; '
+          f'index built in {(time.perf_counter() - started) * 1000:.1f} ms')
+
+    dates, tickers, close = price_store.panel('close')
+    frame = pd.DataFrame(close, index=pd.DatetimeIndex(dates), columns=tickers)
+    rng = np.random.default_rng(0)
+    windows = [tuple(np.sort(rng.choice(dates, 2, replace=False))) for _ in range(args.windows)]
+
+    column = price_store.field('date')
+    def scan_rows(start, end):
+        inside = (column >= start) & (column <= end)
+        return [np.flatnonzero(inside[lo:hi]) for lo, hi in zip(index.starts, index.stops)]
+    def pandas_window(start, end):
+        return frame.loc[(frame.index >= start) & (frame.index <= end)]
+    def range_change(start, end):
+        window_dates, names, values = dateindex.panel_window((dates, tickers, close), start, end)
+        return metrics.metrics_table(window_dates, names, values)
+
+    rows = [
+        ('store rows: binary search', best_of(index.rows, windows, args.repeat)),
+        ('store rows: full scan', best_of(scan_rows, windows, args.repeat)),
+        ('panel: searchsorted slice',
+         best_of(lambda s, e: dateindex.panel_window((dates, tickers, close), s, e), windows, args.repeat)),
+        ('panel: pandas mask', best_of(pandas_window, windows, args.repeat)),
+        ('range change + metrics_table', best_of(range_change, windows, 1)),
+    ]
+    for name, seconds in rows:
+        print(f'{name:<30} {seconds * 1000:10.3f} ms')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,86 @@
+"""Import-time profile of the dashboard entry points (cold start).
+
+Each script runs in a fresh interpreter under `python -X importtime`, outside
+a Streamlit server, and the self/cumulative import times are summarized per
+top-level package. The landing page must not load pandas or matplotlib, and
+matplotlib should only appear once a chart is actually rendered.
+
+    python -m benchmarks.bench_imports
+    python -m benchmarks.bench_imports app.py pages/4_trends_patterns.py --top 15
+"""
+
+import argparse
+import os
+import re
+import subprocess
+import sys
+import time
+from collections import defaultdict
+from pathlib import Path
+
+PROJECT_DIR = Path(__file__).resolve().parent.parent
+ENTRY_POINTS = ['app.py'] + sorted(str(path.relative_to(PROJECT_DIR)) for path in (PROJECT_DIR / 'pages').glob('*.py'))
+HEAVY = ('pandas', 'numpy', 'matplotlib', 'pyarrow', 'duckdb')
+
+# Run the page the way `streamlit run` would, minus the server.
+RUNNER = """
+import logging, runpy, sys
+logging.disable(logging.WARNING)
+sys.path.insert(0, {root!r})
+runpy.run_path({script!r}, run_name='__main__')
+"""
+
+_LINE = re.compile(r'import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)')
+
+
+def profile(script):
+    """(wall seconds, {module: (self_us, cumulative_us, depth)}) for one script."""
+    code = RUNNER.format(root=str(PROJECT_DIR), script=str(PROJECT_DIR / script))
+    env = dict(os.environ, PYTHONDONTWRITEBYTECODE='1')
+    started = time.perf_counter()
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', code],
+                            cwd=PROJECT_DIR, env=env, capture_output=True, text=True)
+    wall = time.perf_counter() - started
+    if result.returncode != 0:
+        raise RuntimeError(f'{script} failed:\n{result.stderr[-2000:]}')
+    modules = {}
+    for line in result.stderr.splitlines():
+        match = _LINE.match(line)
+        if match:
+            self_us, cumulative_us, indent, name = match.groups()
+            modules[name] = (int(self_us), int(cumulative_us), len(indent) // 2)
+    return wall, modules
+
+
+def by_package(modules):
+    """Self time summed per top-level package, in microseconds."""
+    totals = defaultdict(int)
+    for name, (self_us, _, _) in modules.items():
+        totals[name.split('.')[0]] += self_us
+    return totals
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('scripts', nargs='*', default=ENTRY_POINTS)
+    parser.add_argument('--top', type=int, default=8, help='packages listed per script')
+    args = parser.parse_args(argv)
+
+    failed = False
+    for script in args.scripts:
+        wall, modules = profile(script)
+        packages = by_package(modules)
+        total = sum(packages.values())
+        loaded = [name for name in HEAVY if name in modules]
+        print(f'{script}: {wall * 1000:.0f} ms wall, {total / 1000:.0f} ms importing, '
+              f'heavy: {", ".join(loaded) or "none"}')
+        for name, self_us in sorted(packages.items(), key=lambda item: -item[1])[:args.top]:
+            print(f'    {name:<24} {self_us / 1000:8.1f} ms')
+        if script == 'app.py' and {'pandas', 'matplotlib'} & set(loaded):
+            print('    FAIL: the landing page imports pandas/matplotlib')
+            failed = True
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,59 @@
+"""Chunked Monte Carlo paths vs a per-path loop.
+
+    python -m benchmarks.bench_montecarlo --paths 1000000 --horizon 21 --workers 1 2
+"""
+
+import argparse
+import time
+
+import numpy as np
+
+from analytics import metrics, montecarlo
+from benchmarks.bench_rolling import synthetic_prices
+
+
+def loop_paths(series, n_paths, horizon, seed=0):
+    """One path at a time: draw days, compound, track the peak."""
+    rng = np.random.default_rng(seed)
+    out = np.empty((n_paths, 2))
+    for i in range(n_paths):
+        wealth = np.cumprod(1.0 + series[rng.integers(0, len(series), horizon)])
+        out[i] = wealth[-1] - 1.0, (wealth / np.maximum(np.maximum.accumulate(wealth), 1.0)).min() - 1.0
+    return out
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--paths', type=int, default=1_000_000)
+    parser.add_argument('--horizon', type=int, default=montecarlo.HORIZON)
+    parser.add_argument('--tickers', type=int, default=6)
+    parser.add_argument('--years', type=int, default=5)
+    parser.add_argument('--workers', type=int, nargs='+', default=[1])
+    parser.add_argument('--loop-sample', type=int, default=20_000,
+                        help='paths timed in the loop baseline (extrapolated)')
+    args = parser.parse_args()
+
+    returns = metrics.daily_returns(synthetic_prices(args.years * 252, args.tickers))
+    weights = np.ones(args.tickers)
+    print(f'{args.paths:,} paths x {args.horizon} days, {args.tickers} tickers, '
+          f'{montecarlo.chunk_paths(args.horizon):,} paths per chunk')
+
+    for method in montecarlo.METHODS:
+        for workers in args.workers:
+            started = time.perf_counter()
+            result = montecarlo.simulate(returns, weights, args.paths, args.horizon, method,
+                                         workers=workers)
+            seconds = time.perf_counter() - started
+            summary = montecarlo.summarize(result)
+            print(f'{method:<10} workers={workers}: {seconds:8.2f} s   '
+                  f'VaR {summary["var"] * 100:6.2f}%   CVaR {summary["cvar"] * 100:6.2f}%')
+
+    series = montecarlo.build_model(returns, weights)['series']
+    started = time.perf_counter()
+    loop_paths(series, args.loop_sample, args.horizon)
+    t_loop = (time.perf_counter() - started) * args.paths / args.loop_sample
+    print(f'loop (estimate)     : {t_loop:8.2f} s')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,58 @@
+"""Batched portfolio risk vs a per-portfolio loop.
+
+    python -m benchmarks.bench_portfolio --portfolios 100000 --tickers 6 --years 5
+"""
+
+import argparse
+import time
+
+import numpy as np
+
+from analytics import metrics, portfolio
+from benchmarks.bench_rolling import synthetic_prices
+
+
+def loop_risk(returns, weights, benchmark, level=metrics.VAR_LEVEL):
+    """One portfolio at a time, each measure computed from its return series."""
+    out = np.empty((len(weights), 4))
+    for i, w in enumerate(weights):
+        series = returns @ w
+        wealth = np.cumprod(1.0 + series)
+        out[i] = (series.std(ddof=1),
+                  np.cov(series, benchmark)[0, 1] / benchmark.var(ddof=1),
+                  np.quantile(series, 1.0 - level),
+                  (wealth / np.maximum(np.maximum.accumulate(wealth), 1.0)).min() - 1.0)
+    return out
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--portfolios', type=int, default=100_000)
+    parser.add_argument('--tickers', type=int, default=6)
+    parser.add_argument('--years', type=int, default=5)
+    parser.add_argument('--loop-sample', type=int, default=2_000,
+                        help='portfolios timed in the loop baseline (extrapolated)')
+    args = parser.parse_args()
+
+    returns = metrics.daily_returns(synthetic_prices(args.years * 252, args.tickers))
+    benchmark = returns.mean(axis=1)
+    weights = portfolio.random_weights(args.portfolios, args.tickers)
+    print(f'{args.portfolios:,} portfolios x {args.tickers} tickers x {len(returns)} days')
+
+    started = time.perf_counter()
+    risk = portfolio.portfolio_risk(returns, weights, benchmark)
+    t_batch = time.perf_counter() - started
+
+    sample = weights[:args.loop_sample]
+    started = time.perf_counter()
+    reference = loop_risk(returns, sample, benchmark)
+    t_loop = (time.perf_counter() - started) * len(weights) / len(sample)
+
+    gap = np.abs(reference[:, 2] - risk['historical_var'][:len(sample)]).max()
+    print(f'batched         : {t_batch:8.2f} s')
+    print(f'loop (estimate) : {t_loop:8.2f} s   max VaR gap {gap:.1e}')
+    print(f'speedup         : {t_loop / t_batch:8.1f}x')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,54 @@
+"""Best/worst days: argpartition selection vs the SQL's double RANK().
+
+The baseline mirrors analysis_queries/best_worst_days.sql on a long
+(ticker, date) table: one LAG per ticker, then a full descending and a full
+ascending rank per ticker, keeping ranks <= n.
+
+    python -m benchmarks.bench_ranking --tickers 1000 --years 20 --top 5
+"""
+
+import argparse
+
+import numpy as np
+import pandas as pd
+
+from analytics import ranking
+from benchmarks.bench_rolling import best_of, synthetic_prices
+
+
+def double_rank(dates, tickers, close, n):
+    frame = pd.DataFrame({
+        'ticker': np.repeat(np.asarray(tickers), len(dates)),
+        'date': np.tile(dates, len(tickers)),
+        'close_price': close.T.ravel(),
+    })
+    frame['daily_change_pct'] = frame.groupby('ticker')['close_price'].pct_change() * 100
+    frame = frame.dropna(subset=['daily_change_pct'])
+    by_ticker = frame.groupby('ticker')['daily_change_pct']
+    frame['best_rank'] = by_ticker.rank(method='min', ascending=False)
+    frame['worst_rank'] = by_ticker.rank(method='min', ascending=True)
+    return frame[(frame['best_rank'] <= n) | (frame['worst_rank'] <= n)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--tickers', type=int, default=1000)
+    parser.add_argument('--years', type=int, default=20)
+    parser.add_argument('--top', type=int, default=1)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    close = synthetic_prices(args.years * 252, args.tickers)
+    dates = np.arange(np.datetime64('2000-01-03'), np.datetime64('2000-01-03') + len(close))
+    tickers = [f'T{i:05d}' for i in range(args.tickers)]
+    print(f'{close.shape[0]} days x {close.shape[1]} tickers, top/bottom {args.top}')
+
+    t_rank, ranked = best_of(args.repeat, double_rank, dates, tickers, close, args.top)
+    t_part, table = best_of(args.repeat, ranking.extremes_table, dates, tickers, close, args.top)
+    print(f'double RANK()   : {t_rank * 1000:8.1f} ms  ({len(ranked)} rows)')
+    print(f'argpartition    : {t_part * 1000:8.1f} ms  ({len(table)} rows)')
+    print(f'speedup         : {t_rank / t_part:8.2f}x')
+
+
+if __name__ == '__main__':
+    main()
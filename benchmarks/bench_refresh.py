@@ -0,0 +1,62 @@
+"""Concurrent vs serial data refresh against the local chart-API stand-in.
+
+Each ticker's CSV ends --gap calendar days before the refresh date, and the
+stand-in server adds --latency seconds to every response.
+
+    python -m benchmarks.bench_refresh --tickers 2000 --latency 0.05 --workers 32
+"""
+
+import argparse
+import datetime as dt
+import shutil
+import tempfile
+import time
+from pathlib import Path
+
+from analytics import refresh, store
+from benchmarks import market_data_server
+from benchmarks.suite import LAST_DATE, write_raw_panel
+
+
+def timed_refresh(template, work_dir, tickers, url, workers, rate, until):
+    raw_dir = Path(work_dir) / f'raw_{workers}'
+    shutil.copytree(template, raw_dir)
+    started = time.perf_counter()
+    reports = refresh.refresh(tickers, raw_dir, until, workers=workers, rate=rate,
+                              update_store=False, base_url=url)
+    seconds = time.perf_counter() - started
+    return seconds, sum(report['status'] == 'updated' for report in reports)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--tickers', type=int, default=2000)
+    parser.add_argument('--latency', type=float, default=0.05)
+    parser.add_argument('--fail-rate', type=float, default=0.0)
+    parser.add_argument('--gap', type=int, default=14, help='days missing per ticker')
+    parser.add_argument('--workers', type=int, nargs='+', default=[8, 32])
+    parser.add_argument('--rate', type=float, default=0.0, help='requests/s limit (0: none)')
+    parser.add_argument('--serial-sample', type=int, default=100,
+                        help='tickers timed with one worker (extrapolated)')
+    args = parser.parse_args()
+
+    server, url = market_data_server.serve(latency=args.latency, fail_rate=args.fail_rate)
+    until = LAST_DATE.astype(dt.date) + dt.timedelta(days=args.gap)
+    with tempfile.TemporaryDirectory() as work_dir:
+        template = write_raw_panel(Path(work_dir) / 'template', args.tickers, 1)
+        tickers = sorted(store.discover_sources(template))
+        print(f'{len(tickers):,} tickers, {args.gap} days missing each, {args.latency * 1000:.0f} ms latency')
+
+        sample = tickers[:args.serial_sample]
+        seconds, _ = timed_refresh(template, work_dir, sample, url, 1, args.rate, until)
+        serial = seconds * len(tickers) / len(sample)
+        print(f'workers=1  (estimate): {serial:8.2f} s')
+        for workers in args.workers:
+            seconds, updated = timed_refresh(template, work_dir, tickers, url, workers, args.rate, until)
+            print(f'workers={workers:<3}            : {seconds:8.2f} s  {updated:,} updated  '
+                  f'{serial / seconds:5.1f}x')
+    server.shutdown()
+
+
+if __name__ == '__main__':
+    main()
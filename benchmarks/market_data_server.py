@@ -0,0 +1,117 @@
+"""Local stand-in for the Yahoo chart API used by analytics.refresh.
+
+Serves /v8/finance/chart/<TICKER>?period1=..&period2=.. with a deterministic
+random walk per ticker (one bar per weekday), after an optional simulated
+network latency, and can fail a share of requests with 429/503 to exercise
+the client's retry path.
+
+    python -m benchmarks.market_data_server --port 8765 --latency 0.05 --fail-rate 0.05
+    MARKET_DATA_URL=http://127.0.0.1:8765 python -m analytics.refresh --raw-dir /tmp/raw
+"""
+
+import argparse
+import datetime as dt
+import json
+import random
+import threading
+import time
+import zlib
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import numpy as np
+
+EPOCH = np.datetime64('2000-01-03')
+GMT_OFFSET = -18000
+OPEN_SECONDS = 9 * 3600 + 30 * 60
+
+
+def bars(ticker, period1, period2):
+    """Chart-API payload for weekdays in [period1, period2)."""
+    first = np.datetime64(dt.datetime.fromtimestamp(period1, dt.timezone.utc).date())
+    last = np.datetime64(dt.datetime.fromtimestamp(period2, dt.timezone.utc).date())
+    days = np.arange(max(first, EPOCH), max(last, EPOCH), dtype='datetime64[D]')
+    days = days[np.is_busday(days)]
+    # The walk is indexed by business days since EPOCH, so overlapping requests agree.
+    index = np.busday_count(EPOCH, days)
+    rng = np.random.default_rng(zlib.crc32(ticker.encode()))
+    steps = rng.normal(0.0003, 0.02, int(index.max()) + 1 if len(index) else 0)
+    close = 100.0 * np.exp(np.cumsum(steps))[index]
+    open_ = close * (1.0 + rng.normal(0.0, 0.005, len(close)))
+    stamps = (days - np.datetime64('1970-01-01')).astype(np.int64) * 86400 + OPEN_SECONDS - GMT_OFFSET
+    quote = {
+        'close': close.round(4).tolist(),
+        'volume': rng.integers(1_000_000, 50_000_000, len(close)).tolist(),
+        'open': open_.round(4).tolist(),
+        'high': (np.maximum(open_, close) * 1.01).round(4).tolist(),
+        'low': (np.minimum(open_, close) * 0.99).round(4).tolist(),
+    }
+    return {'chart': {'result': [{
+        'meta': {'symbol': ticker, 'gmtoffset': GMT_OFFSET, 'currency': 'USD'},
+        'timestamp': stamps.tolist(),
+        'indicators': {'quote': [quote]},
+    }], 'error': None}}
+
+
+def make_handler(latency=0.0, fail_rate=0.0):
+    class ChartHandler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+        requests_served = 0
+        lock = threading.Lock()
+
+        def do_GET(self):
+            with ChartHandler.lock:
+                ChartHandler.requests_served += 1
+            url = urlparse(self.path)
+            prefix = '/v8/finance/chart/'
+            if not url.path.startswith(prefix):
+                return self._send(404, {'chart': {'result': None, 'error': 'not found'}})
+            if latency:
+                time.sleep(latency)
+            if fail_rate and random.random() < fail_rate:
+                return self._send(random.choice((429, 503)), {'error': 'try again'}, {'Retry-After': '0'})
+            query = parse_qs(url.query)
+            payload = bars(url.path[len(prefix):].upper(), int(query['period1'][0]), int(query['period2'][0]))
+            self._send(200, payload)
+
+        def _send(self, status, payload, headers=None):
+            body = json.dumps(payload).encode()
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            for name, value in (headers or {}).items():
+                self.send_header(name, value)
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    return ChartHandler
+
+
+def serve(port=0, latency=0.0, fail_rate=0.0):
+    """Start the server on a background thread; returns (server, base_url)."""
+    server = ThreadingHTTPServer(('127.0.0.1', port), make_handler(latency, fail_rate))
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f'http://127.0.0.1:{server.server_address[1]}'
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--latency', type=float, default=0.0, help='seconds added to each response')
+    parser.add_argument('--fail-rate', type=float, default=0.0, help='share of requests answered 429/503')
+    args = parser.parse_args()
+
+    server, url = serve(args.port, args.latency, args.fail_rate)
+    print(f'serving the chart API on {url} (Ctrl+C to stop)')
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == '__main__':
+    main()
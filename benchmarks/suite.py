@@ -0,0 +1,232 @@
+"""End-to-end benchmark of every analysis stage on synthetic raw CSVs.
+
+Synthetic price panels are written in the raw export schema (one
+<TICKER>_stock_data.csv per ticker, newest row first, SPY included) and
+cached under --data-dir, then each stage is timed on them: CSV parse into
+the store, panel load, returns, risk metrics, correlation, MA signals,
+period rollups, volume anomalies and the dashboard pages' table prep. For
+every stage the best wall time of --repeat runs, throughput in price
+observations per second and the peak traced allocation (tracemalloc, in a
+separate untimed run) are reported and compared with benchmarks/baselines.json.
+
+    python -m benchmarks.suite --size small medium          # exit status 1 on a regression
+    python -m benchmarks.suite --size small --save          # record new baselines
+    python -m benchmarks.suite --tickers 2000 --years 15    # ad-hoc size, no baseline
+"""
+
+import argparse
+import json
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from analytics import correlation, ingest, metrics, pipeline, rolling, store, technical, volume
+
+# Sizes with a recorded baseline. 5,000 tickers x 20 years ran out of memory on a 6 GB
+# host, so larger panels are ad-hoc runs (--tickers/--years) and are not compared.
+SIZES = {
+    'small': (6, 5),
+    'medium': (500, 10),
+}
+BASELINES = Path(__file__).resolve().parent / 'baselines.json'
+DATA_DIR = Path(tempfile.gettempdir()) / 'financial_analysis_bench'
+LAST_DATE = np.datetime64('2025-11-21')
+TOLERANCE = 0.25
+MIN_SECONDS = 0.01
+MIN_MB = 1.0
+
+
+def synthetic_tickers(n_tickers):
+    return ['SPY'] + [f'T{i:04d}' for i in range(1, n_tickers)]
+
+
+def write_raw_panel(raw_dir, n_tickers, years, seed=0):
+    """Write n_tickers random-walk CSVs of `years` trading years in the raw schema."""
+    raw_dir = Path(raw_dir)
+    raw_dir.mkdir(parents=True, exist_ok=True)
+    n_days = years * 252
+    dates = np.busday_offset(LAST_DATE, -np.arange(n_days), roll='backward')
+    labels = pd.to_datetime(dates).strftime(store.DATE_FORMAT)
+    rng = np.random.default_rng(seed)
+    for ticker in synthetic_tickers(n_tickers):
+        # Rows run newest first, so walk the returns backwards from the last close.
+        close = 100.0 * np.exp(np.cumsum(rng.normal(-0.0003, 0.02, n_days)))
+        open_ = close * np.exp(rng.normal(0.0, 0.005, n_days))
+        spread = np.abs(rng.normal(0.0, 0.01, (2, n_days)))
+        frame = pd.DataFrame({
+            'Ticker': ticker,
+            'Date': labels,
+            'Close/Last': close,
+            'Volume': rng.lognormal(16.0, 0.5, n_days).astype(np.int64),
+            'Open': open_,
+            'High': np.maximum(open_, close) * (1.0 + spread[0]),
+            'Low': np.minimum(open_, close) * (1.0 - spread[1]),
+        }, columns=store.CSV_COLUMNS)
+        frame.to_csv(raw_dir / f'{ticker}{store.CSV_SUFFIX}', index=False, float_format='%.2f')
+    return raw_dir
+
+
+def raw_panel(n_tickers, years, data_dir=DATA_DIR):
+    """Directory of cached synthetic CSVs for this size, written on first use."""
+    raw_dir = Path(data_dir) / f'{n_tickers}x{years}' / 'raw_data'
+    if len(store.discover_sources(raw_dir)) != n_tickers:
+        write_raw_panel(raw_dir, n_tickers, years)
+    return raw_dir
+
+
+def stages(raw_dir, store_dir):
+    """(name, function) pairs; each function takes and extends a shared state dict."""
+    def csv_parse(state):
+        store.build_store(raw_dir, store_dir, force=True)
+
+    def load_panels(state):
+        price_store = store.PriceStore(store_dir)
+        state['dates'], state['tickers'], state['close'] = price_store.panel('close')
+        for field in ('volume', 'high', 'low'):
+            state[field] = price_store.panel(field)[2]
+
+    def returns(state):
+        state['returns'] = metrics.daily_returns(state['close'])
+
+    def risk_metrics(state):
+        metrics.metrics_table(state['dates'], state['tickers'], state['close'])
+
+    def correlations(state):
+        correlation.correlation_matrix(state['returns'])
+
+    def ma_signals(state):
+        rolling.signals_table(state['dates'], state['tickers'], state['close'])
+
+    def rollups(state):
+        pipeline.stage_rollups(state['dates'], state['tickers'], state['close'], state['volume'])
+
+    def volume_anomalies(state):
+        pipeline.stage_volume(state['dates'], state['tickers'], state['close'], state['volume'])
+
+    def page_prep(state):
+        # The tables the Technical Signals and Trends pages build on first load.
+        technical.signal_table(state['tickers'], state['close'], state['high'], state['low'])
+        volume.zscores(state['volume'])
+
+    return [
+        ('csv_parse', csv_parse),
+        ('load_panels', load_panels),
+        ('returns', returns),
+        ('risk_metrics', risk_metrics),
+        ('correlation', correlations),
+        ('ma_signals', ma_signals),
+        ('rollups', rollups),
+        ('volume_anomalies', volume_anomalies),
+        ('page_prep', page_prep),
+    ]
+
+
+def run_suite(n_tickers, years, repeat=1, memory=True, data_dir=DATA_DIR):
+    """{stage: {'seconds', 'rows_per_s', 'peak_mb'}} for one panel size."""
+    raw_dir = raw_panel(n_tickers, years, data_dir)
+    results, state = {}, {}
+    with tempfile.TemporaryDirectory() as store_dir:
+        for name, func in stages(raw_dir, store_dir):
+            timings = []
+            for _ in range(repeat):
+                started = time.perf_counter()
+                func(state)
+                timings.append(time.perf_counter() - started)
+            peak = np.nan
+            if memory:
+                tracemalloc.start()
+                func(state)
+                peak = tracemalloc.get_traced_memory()[1] / 2**20
+                tracemalloc.stop()
+            seconds = min(timings)
+            observations = n_tickers * years * 252
+            results[name] = {'seconds': seconds, 'rows_per_s': observations / seconds, 'peak_mb': peak}
+    return results
+
+
+def load_baselines(path=BASELINES):
+    if not Path(path).exists():
+        return {}
+    with open(path) as fh:
+        return json.load(fh)
+
+
+def save_baselines(baselines, path=BASELINES):
+    with open(path, 'w') as fh:
+        json.dump(baselines, fh, indent=1, sort_keys=True)
+        fh.write('\n')
+
+
+def compare(results, baseline, tolerance=TOLERANCE):
+    """{stage: [flags]} where a stage is slower or uses more memory than allowed."""
+    flags = {}
+    for name, current in results.items():
+        base = baseline.get(name)
+        if base is None:
+            continue
+        stage_flags = []
+        if (current['seconds'] > base['seconds'] * (1.0 + tolerance)
+                and current['seconds'] - base['seconds'] > MIN_SECONDS):
+            stage_flags.append(f"time {current['seconds'] / base['seconds']:.2f}x")
+        if (current['peak_mb'] > base['peak_mb'] * (1.0 + tolerance)
+                and current['peak_mb'] - base['peak_mb'] > MIN_MB):
+            stage_flags.append(f"memory {current['peak_mb'] / base['peak_mb']:.2f}x")
+        if stage_flags:
+            flags[name] = stage_flags
+    return flags
+
+
+def print_results(label, results, baseline, flags):
+    print(f'\n{label}')
+    print(f"{'stage':<18} {'seconds':>9} {'baseline':>9} {'Mobs/s':>9} {'peak MB':>9}  flags")
+    for name, row in results.items():
+        base = baseline.get(name, {}).get('seconds', np.nan)
+        print(f"{name:<18} {row['seconds']:9.3f} {base:9.3f} {row['rows_per_s'] / 1e6:9.2f} "
+              f"{row['peak_mb']:9.1f}  {', '.join(flags.get(name, []))}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--size', nargs='+', choices=SIZES, default=['small'])
+    parser.add_argument('--tickers', type=int, help='ad-hoc size (with --years); not compared')
+    parser.add_argument('--years', type=int, default=10)
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--no-memory', action='store_true', help='skip the tracemalloc pass')
+    parser.add_argument('--tolerance', type=float, default=TOLERANCE)
+    parser.add_argument('--data-dir', default=DATA_DIR)
+    parser.add_argument('--baselines', default=BASELINES)
+    parser.add_argument('--save', action='store_true', help='store these results as the baselines')
+    args = parser.parse_args()
+
+    if args.tickers:
+        runs = [(f'{args.tickers} tickers x {args.years} years', None, args.tickers, args.years)]
+    else:
+        runs = [(f'{size}: {SIZES[size][0]} tickers x {SIZES[size][1]} years', size, *SIZES[size])
+                for size in args.size]
+
+    baselines = load_baselines(args.baselines)
+    regressions = 0
+    for label, size, n_tickers, years in runs:
+        results = run_suite(n_tickers, years, args.repeat, not args.no_memory, args.data_dir)
+        baseline = baselines.get(size, {}) if size else {}
+        flags = {} if args.save else compare(results, baseline, args.tolerance)
+        regressions += len(flags)
+        print_results(label, results, baseline, flags)
+        if args.save and size:
+            baselines[size] = results
+    print(f'\npeak RSS {ingest.peak_rss_mb():.0f} MB')
+
+    if args.save:
+        save_baselines(baselines, args.baselines)
+        print(f'baselines written to {args.baselines}')
+    elif regressions:
+        print(f'{regressions} stage(s) regressed beyond {args.tolerance:.0%}')
+        raise SystemExit(1)
+
+
+if __name__ == '__main__':
+    main()
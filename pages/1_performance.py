@@ -1,7 +1,6 @@
 import streamlit as st
-import pandas as pd
-import matplotlib.pyplot as plt
-import numpy as np
+
+from analytics.dashboard import metrics_table, show_chart, sidebar_filters
 
 st.set_page_config(
     page_title="Performance Analysis",
@@ -11,16 +10,12 @@ st.set_page_config(
 st.title(" Performance Analysis")
 st.markdown("---")
 
+start, end, tickers = sidebar_filters()
+
 # Performance Data
-@st.cache_data
 def load_performance_data():
-    return pd.DataFrame({
-        'Ticker': ['TSLA', 'GOOGL', 'AMZN', 'MSFT', 'AAPL', 'SPY'],
-        'Total Return %': [343.90, 250.96, 210.44, 157.99, 141.77, 100.00],
-        'Annualized Return %': [34.7, 28.5, 25.4, 20.9, 19.3, 14.9],
-        'Volatility %': [52.3, 28.7, 32.1, 24.5, 26.8, 18.2],
-        'Outperformance': ['Yes', 'Yes', 'Yes', 'Yes', 'Yes', 'Benchmark']
-    })
+    return metrics_table(start=start, end=end, tickers=tickers)[['Ticker', 'Total Return %', 'Annualized Return %',
+                            'Volatility %', 'Outperformance']].round(2)
 
 performance_data = load_performance_data()
 
@@ -35,7 +30,8 @@ with metric_col1:
 
 with metric_col2:
     outperform_count = len(performance_data[performance_data['Outperformance'] == 'Yes'])
-    st.metric("Outperforming Stocks", f"{outperform_count}/5")
+    stock_count = len(performance_data[performance_data['Outperformance'] != 'Benchmark'])
+    st.metric("Outperforming Stocks", f"{outperform_count}/{stock_count}")
 
 with metric_col3:
     best_performer = performance_data.loc[performance_data['Total Return %'].idxmax(), 'Ticker']
@@ -50,34 +46,37 @@ with metric_col4:
 st.markdown("---")
 st.subheader("Returns Comparison")
 
-fig, ax = plt.subplots(figsize=(12, 6))
-
-# Create bars with conditional coloring
-colors = ['#2E8B57' if ticker != 'SPY' else '#1f77b4' 
-          for ticker in performance_data['Ticker']]
-
-bars = ax.bar(performance_data['Ticker'], 
-              performance_data['Total Return %'], 
-              color=colors, 
-              alpha=0.8)
-
-# Add value labels on bars
-for bar in bars:
-    height = bar.get_height()
-    ax.text(bar.get_x() + bar.get_width()/2., height + 10,
-            f'{height:.1f}%', 
-            ha='center', va='bottom',
-            fontweight='bold', fontsize=11)
-
-ax.set_ylabel('Total Return (%)', fontweight='bold', fontsize=12)
-ax.set_title('5-Year Total Returns vs Market Benchmark (SPY)', 
-             fontweight='bold', fontsize=14)
-ax.grid(axis='y', alpha=0.3)
-
-plt.xticks(rotation=45)
-plt.tight_layout()
+def draw_returns(fig):
+    ax = fig.subplots()
+    
+    # Create bars with conditional coloring
+    colors = ['#2E8B57' if ticker != 'SPY' else '#1f77b4' 
+              for ticker in performance_data['Ticker']]
+    
+    bars = ax.bar(performance_data['Ticker'], 
+                  performance_data['Total Return %'], 
+                  color=colors, 
+                  alpha=0.8)
+    
+    # Add value labels on bars
+    for bar in bars:
+        height = bar.get_height()
+        ax.text(bar.get_x() + bar.get_width()/2., height + 10,
+                f'{height:.1f}%', 
+                ha='center', va='bottom',
+                fontweight='bold', fontsize=11)
+    
+    ax.set_ylabel('Total Return (%)', fontweight='bold', fontsize=12)
+    period = '5-Year' if start is None and end is None else f"{start or 'Start'} to {end or 'Latest'}"
+    ax.set_title(f'{period} Total Returns vs Market Benchmark (SPY)', 
+                 fontweight='bold', fontsize=14)
+    ax.grid(axis='y', alpha=0.3)
+    
+    ax.tick_params(axis='x', labelrotation=45)
+    fig.tight_layout()
 
-st.pyplot(fig)
+show_chart('performance_returns', draw_returns, (performance_data,), figsize=(12, 6),
+           start=start, end=end)
 
 # Detailed Data Table
 st.markdown("---")
@@ -98,7 +97,7 @@ insight_col1, insight_col2 = st.columns(2)
 with insight_col1:
     st.success("""
     **Strengths:**
-    - All analyzed stocks significantly outperformed the market
+    - Most analyzed stocks outperformed the market benchmark
     - Technology sector showing strong growth momentum
     - Consistent performance across major tech companies
     """)
@@ -1,7 +1,8 @@
 import streamlit as st
 import pandas as pd
-import numpy as np
-import matplotlib.pyplot as plt
+
+from analytics.dashboard import (metrics_table, portfolio_candidates, portfolio_risk,
+                                 portfolio_simulation, show_chart, sidebar_filters)
 
 st.set_page_config(
     page_title="Risk Analysis",
@@ -14,17 +15,18 @@ def main():
     
     st.write("Comprehensive risk assessment and volatility analysis for portfolio management.")
     
-    # Risk metrics data
-    risk_data = {
-        'Ticker': ['TSLA', 'GOOGL', 'AMZN', 'MSFT', 'AAPL', 'SPY'],
-        'Volatility (%)': [52.3, 28.7, 32.1, 24.5, 26.8, 18.2],
-        'Beta': [2.10, 1.05, 1.04, 0.98, 1.21, 1.00],
-        'Max Drawdown (%)': [-45.2, -28.7, -35.1, -22.4, -31.5, -19.8],
-        'Sharpe Ratio': [0.65, 1.02, 0.79, 1.15, 0.94, 0.82],
-        'VaR (95%)': [-12.3, -6.9, -8.2, -5.8, -7.1, -4.5]
-    }
+    start, end, selected = sidebar_filters()
+    window = dict(start=start, end=end, tickers=selected)
     
-    risk_df = pd.DataFrame(risk_data)
+    # Risk metrics data
+    metrics = metrics_table(**window).round(2)
+    risk_df = metrics[['Ticker', 'Volatility %', 'Beta', 'Max Drawdown %',
+                       'Sharpe Ratio', 'VaR 95% %']].rename(columns={
+        'Volatility %': 'Volatility (%)',
+        'Max Drawdown %': 'Max Drawdown (%)',
+        'VaR 95% %': 'VaR (95%)'
+    })
+    market_vol = risk_df.loc[risk_df['Ticker'] == 'SPY', 'Volatility (%)'].iloc[0]
     
     # Key metrics
     col1, col2, col3, col4 = st.columns(4)
@@ -34,12 +36,12 @@ def main():
         st.metric("Average Volatility", f"{avg_vol:.1f}%")
     
     with col2:
-        high_beta = risk_df.loc[risk_df['Beta'].idxmax(), 'Ticker']
-        st.metric("Highest Beta", high_beta, "2.10")
+        high_beta = risk_df.loc[risk_df['Beta'].idxmax()]
+        st.metric("Highest Beta", high_beta['Ticker'], f"{high_beta['Beta']:.2f}")
     
     with col3:
-        best_sharpe = risk_df.loc[risk_df['Sharpe Ratio'].idxmax(), 'Ticker']
-        st.metric("Best Risk-Adjusted", best_sharpe, "1.15")
+        best_sharpe = risk_df.loc[risk_df['Sharpe Ratio'].idxmax()]
+        st.metric("Best Risk-Adjusted", best_sharpe['Ticker'], f"{best_sharpe['Sharpe Ratio']:.2f}")
     
     with col4:
         worst_dd = risk_df['Max Drawdown (%)'].min()
@@ -48,65 +50,203 @@ def main():
     # Volatility Analysis
     st.subheader("Volatility Comparison")
     
-    fig, ax = plt.subplots(figsize=(10, 5))
+    def draw_volatility(fig):
+        ax = fig.subplots()
+        
+        bars = ax.bar(risk_df['Ticker'], risk_df['Volatility (%)'], 
+                     color='steelblue', alpha=0.7)
+        
+        ax.axhline(y=market_vol, color='red', linestyle='--', label='Market Volatility')
+        ax.set_ylabel('Annual Volatility (%)')
+        ax.set_title('Historical Volatility Analysis')
+        ax.legend()
+        ax.grid(True, alpha=0.3)
+        
+        for bar in bars:
+            height = bar.get_height()
+            ax.text(bar.get_x() + bar.get_width()/2, height + 1,
+                    f'{height:.1f}%', ha='center', va='bottom')
+    
+    show_chart('risk_volatility', draw_volatility, (risk_df, market_vol), figsize=(10, 5))
     
-    bars = ax.bar(risk_df['Ticker'], risk_df['Volatility (%)'], 
-                 color='steelblue', alpha=0.7)
+    # Risk-Return Scatter
+    st.subheader("Risk-Return Profile")
     
-    ax.axhline(y=18.2, color='red', linestyle='--', label='Market Volatility')
-    ax.set_ylabel('Annual Volatility (%)')
-    ax.set_title('Historical Volatility Analysis')
-    ax.legend()
-    ax.grid(True, alpha=0.3)
+    returns = metrics['Total Return %']
+    
+    def draw_risk_return(fig):
+        ax = fig.subplots()
+        
+        scatter = ax.scatter(risk_df['Volatility (%)'], returns, 
+                            s=risk_df['Beta'] * 100, alpha=0.7)
+        
+        for i, ticker in enumerate(risk_df['Ticker']):
+            ax.annotate(ticker, (risk_df['Volatility (%)'][i], returns[i]),
+                       xytext=(5, 5), textcoords='offset points')
+        
+        ax.set_xlabel('Volatility (%)')
+        ax.set_ylabel('Total Return (%)')
+        ax.set_title('Risk-Return Analysis')
+        ax.grid(True, alpha=0.3)
+    
+    show_chart('risk_return', draw_risk_return, (risk_df, returns), figsize=(10, 6))
     
-    for bar in bars:
-        height = bar.get_height()
-        ax.text(bar.get_x() + bar.get_width()/2, height + 1,
-                f'{height:.1f}%', ha='center', va='bottom')
+    # Detailed Metrics Table
+    st.subheader("Risk Metrics Table")
+    st.dataframe(risk_df, use_container_width=True, hide_index=True)
     
-    st.pyplot(fig)
+    # Portfolio Risk
+    st.subheader("Portfolio Risk")
+    st.write("Set portfolio weights (rebalanced daily) to see the combined risk, "
+             "compared with 10,000 random long-only portfolios of the same securities.")
     
-    # Risk-Return Scatter
-    st.subheader("Risk-Return Profile")
+    tickers = sorted(risk_df['Ticker'])
+    weight_cols = st.columns(len(tickers))
+    weights = []
+    for col, ticker in zip(weight_cols, tickers):
+        with col:
+            weights.append(st.number_input(f"{ticker} %", min_value=0.0, max_value=100.0,
+                                           value=round(100 / len(tickers), 1), step=5.0))
     
-    returns = [343.9, 251.0, 210.4, 158.0, 141.8, 100.0]
+    if sum(weights) <= 0:
+        st.warning("Give at least one security a positive weight.")
+        return
     
-    fig2, ax = plt.subplots(figsize=(10, 6))
+    risk = {name: values[0] for name, values in portfolio_risk([weights], **window).items()}
     
-    scatter = ax.scatter(risk_df['Volatility (%)'], returns, 
-                        s=risk_df['Beta'] * 100, alpha=0.7)
+    col1, col2, col3, col4 = st.columns(4)
     
-    for i, ticker in enumerate(risk_df['Ticker']):
-        ax.annotate(ticker, (risk_df['Volatility (%)'][i], returns[i]),
-                   xytext=(5, 5), textcoords='offset points')
+    with col1:
+        st.metric("Volatility", f"{risk['volatility'] * 100:.1f}%")
+        st.metric("Beta to SPY", f"{risk['beta']:.2f}")
     
-    ax.set_xlabel('Volatility (%)')
-    ax.set_ylabel('Total Return (%)')
-    ax.set_title('Risk-Return Analysis')
-    ax.grid(True, alpha=0.3)
+    with col2:
+        st.metric("VaR 95% (historical)", f"{risk['historical_var'] * 100:.2f}%")
+        st.metric("VaR 95% (normal)", f"{risk['parametric_var'] * 100:.2f}%")
     
-    st.pyplot(fig2)
+    with col3:
+        st.metric("CVaR 95% (historical)", f"{risk['historical_cvar'] * 100:.2f}%")
+        st.metric("CVaR 95% (normal)", f"{risk['parametric_cvar'] * 100:.2f}%")
     
-    # Detailed Metrics Table
-    st.subheader("Risk Metrics Table")
-    st.dataframe(risk_df, use_container_width=True, hide_index=True)
+    with col4:
+        st.metric("Max Drawdown", f"{risk['max_drawdown'] * 100:.1f}%")
+        st.metric("Sharpe Ratio", f"{risk['sharpe']:.2f}")
+    
+    candidate_weights, candidates = portfolio_candidates(**window)
+    min_vol = int(candidates['volatility'].argmin())
+    max_sharpe = int(candidates['sharpe'].argmax())
+    
+    def draw_candidates(fig):
+        ax = fig.subplots()
+        
+        points = ax.scatter(candidates['volatility'] * 100, candidates['annual_return'] * 100,
+                            c=candidates['sharpe'], cmap='viridis', s=4, alpha=0.5)
+        ax.scatter(risk['volatility'] * 100, risk['annual_return'] * 100,
+                   marker='*', s=300, color='red', label='Your portfolio')
+        ax.scatter(candidates['volatility'][min_vol] * 100, candidates['annual_return'][min_vol] * 100,
+                   marker='D', s=80, color='black', label='Minimum volatility')
+        ax.scatter(candidates['volatility'][max_sharpe] * 100, candidates['annual_return'][max_sharpe] * 100,
+                   marker='P', s=120, color='orange', label='Maximum Sharpe')
+        
+        ax.set_xlabel('Volatility (%)')
+        ax.set_ylabel('Annualized Mean Return (%)')
+        ax.set_title('Candidate Portfolios')
+        ax.legend()
+        ax.grid(True, alpha=0.3)
+        fig.colorbar(points, ax=ax, label='Sharpe Ratio')
+    
+    show_chart('portfolio_candidates', draw_candidates, (candidates['volatility'], tuple(weights)),
+               figsize=(10, 6))
+    
+    best = pd.DataFrame(candidate_weights[[min_vol, max_sharpe]] * 100, columns=tickers,
+                        index=['Minimum volatility', 'Maximum Sharpe'])
+    best['Volatility %'] = candidates['volatility'][[min_vol, max_sharpe]] * 100
+    best['Sharpe Ratio'] = candidates['sharpe'][[min_vol, max_sharpe]]
+    st.dataframe(best.round(2), use_container_width=True)
+    
+    # Monte Carlo Projection
+    st.subheader("Scenario Simulation")
+    st.write("Simulated paths of the portfolio above, drawn from the historical daily returns "
+             "either by resampling whole trading days or from a correlated normal model.")
+    
+    col1, col2, col3 = st.columns(3)
+    
+    with col1:
+        method = st.radio("Return model", ['bootstrap', 'normal'], horizontal=True,
+                          format_func={'bootstrap': 'Historical bootstrap',
+                                       'normal': 'Correlated normal'}.get)
+    
+    with col2:
+        horizon = st.selectbox("Horizon (trading days)", [5, 21, 63, 252], index=1)
+    
+    with col3:
+        n_paths = st.selectbox("Paths", [10_000, 100_000, 1_000_000], index=1,
+                               format_func=lambda n: f"{n:,}")
+    
+    summary, return_hist, drawdown_hist = portfolio_simulation([weights], n_paths, horizon, method,
+                                                               **window)
+    
+    col1, col2, col3, col4 = st.columns(4)
+    
+    with col1:
+        st.metric(f"VaR 95% ({horizon}d)", f"{summary['var'] * 100:.2f}%")
+    
+    with col2:
+        st.metric(f"CVaR 95% ({horizon}d)", f"{summary['cvar'] * 100:.2f}%")
+    
+    with col3:
+        st.metric("Probability of Loss", f"{summary['probability_of_loss'] * 100:.1f}%")
+    
+    with col4:
+        st.metric("Median Max Drawdown", f"{summary['drawdown_quantiles'][0.5] * 100:.1f}%")
+    
+    def draw_simulation(fig):
+        ax1, ax2 = fig.subplots(1, 2)
+    
+        counts, edges = return_hist
+        ax1.stairs(counts, edges * 100, fill=True, color='steelblue', alpha=0.7)
+        ax1.axvline(summary['var'] * 100, color='red', linestyle='--', label='VaR 95%')
+        ax1.axvline(summary['cvar'] * 100, color='darkred', linestyle=':', label='CVaR 95%')
+        ax1.set_xlabel(f'{horizon}-Day Return (%)')
+        ax1.set_ylabel('Paths')
+        ax1.set_title('Horizon Return Distribution')
+        ax1.legend()
+        ax1.grid(True, alpha=0.3)
+    
+        counts, edges = drawdown_hist
+        ax2.stairs(counts, edges * 100, fill=True, color='indianred', alpha=0.7)
+        ax2.set_xlabel('Max Drawdown (%)')
+        ax2.set_title('Drawdown Distribution')
+        ax2.grid(True, alpha=0.3)
+    
+        fig.tight_layout()
+    
+    show_chart('portfolio_simulation', draw_simulation, (return_hist, drawdown_hist), figsize=(12, 4.5))
+    
+    quantiles = pd.DataFrame({
+        f'{horizon}-Day Return %': summary['return_quantiles'],
+        'Max Drawdown %': summary['drawdown_quantiles'],
+    }) * 100
+    quantiles.index = [f"{q:.0%}" for q in quantiles.index]
+    st.dataframe(quantiles.round(2).T, use_container_width=True)
     
     # Risk Insights
     st.subheader("Risk Assessment")
     
+    by_volatility = risk_df.sort_values('Volatility (%)')
+    by_beta = risk_df.sort_values('Beta', ascending=False)
+    
     col1, col2 = st.columns(2)
     
     with col1:
         st.write("**Lower Risk Profile:**")
-        st.write("- MSFT: Strong risk-adjusted returns")
-        st.write("- GOOGL: Moderate volatility with good returns")
-        st.write("- SPY: Market-level risk characteristics")
+        for ticker, vol, sharpe in by_volatility[['Ticker', 'Volatility (%)', 'Sharpe Ratio']].head(3).itertuples(index=False):
+            st.write(f"- {ticker}: {vol:.1f}% volatility, Sharpe {sharpe:.2f}")
     
     with col2:
         st.write("**Higher Risk Considerations:**")
-        st.write("- TSLA: High volatility and beta")
-        st.write("- AMZN: Significant drawdown potential")
-        st.write("- Sector concentration risk")
+        for ticker, beta, drawdown in by_beta[['Ticker', 'Beta', 'Max Drawdown (%)']].head(3).itertuples(index=False):
+            st.write(f"- {ticker}: beta {beta:.2f}, max drawdown {drawdown:.1f}%")
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -1,7 +1,7 @@
 import streamlit as st
-import pandas as pd
 import numpy as np
-import matplotlib.pyplot as plt
+
+from analytics.dashboard import correlation_matrix, rolling_correlation, show_chart, sidebar_filters
 
 st.set_page_config(
     page_title="Correlation Analysis",
@@ -10,23 +10,19 @@ st.set_page_config(
 st.title("Correlation Analysis")
 st.markdown("---")
 
+start, end, selected = sidebar_filters()
+
 # Correlation Data
-@st.cache_data
 def load_correlation_data():
-    tickers = ['TSLA', 'GOOGL', 'AMZN', 'MSFT', 'AAPL', 'SPY']
-    
-    correlation_matrix = np.array([
-        [1.00, 0.65, 0.62, 0.58, 0.61, 0.72],
-        [0.65, 1.00, 0.78, 0.75, 0.74, 0.85],
-        [0.62, 0.78, 1.00, 0.72, 0.70, 0.82],
-        [0.58, 0.75, 0.72, 1.00, 0.68, 0.88],
-        [0.61, 0.74, 0.70, 0.68, 1.00, 0.80],
-        [0.72, 0.85, 0.82, 0.88, 0.80, 1.00]
-    ])
-    
-    return pd.DataFrame(correlation_matrix, index=tickers, columns=tickers)
+    return correlation_matrix(start, end, selected)
+
+def load_rolling_correlation(window, benchmark='SPY'):
+    return rolling_correlation(window, benchmark, start, end, selected)
 
 corr_df = load_correlation_data()
+if len(corr_df) < 2:
+    st.info("Select at least one security besides SPY to compare.")
+    st.stop()
 
 # Correlation Statistics
 st.subheader("Correlation Overview")
@@ -51,25 +47,46 @@ with col3:
 st.markdown("---")
 st.subheader("Correlation Matrix")
 
-fig, ax = plt.subplots(figsize=(8, 6))
+def draw_matrix(fig):
+    ax = fig.subplots()
+    
+    im = ax.imshow(corr_df.values, cmap='coolwarm', vmin=np.floor(upper_tri.min() * 10) / 10, vmax=1.0)
+    
+    ax.set_xticks(np.arange(len(corr_df.columns)))
+    ax.set_yticks(np.arange(len(corr_df.index)))
+    ax.set_xticklabels(corr_df.columns)
+    ax.set_yticklabels(corr_df.index)
+    
+    for label in ax.get_xticklabels():
+        label.set(rotation=45, ha="right", rotation_mode="anchor")
+    
+    for i in range(len(corr_df.index)):
+        for j in range(len(corr_df.columns)):
+            text = ax.text(j, i, f'{corr_df.values[i, j]:.2f}',
+                          ha="center", va="center", color="black", fontweight='bold')
+    
+    ax.set_title('Security Correlation Matrix', fontweight='bold', fontsize=14)
+    fig.colorbar(im, ax=ax)
 
-im = ax.imshow(corr_df.values, cmap='coolwarm', vmin=0.5, vmax=1.0)
+show_chart('correlation_matrix', draw_matrix, (corr_df,), figsize=(8, 6))
 
-ax.set_xticks(np.arange(len(corr_df.columns)))
-ax.set_yticks(np.arange(len(corr_df.index)))
-ax.set_xticklabels(corr_df.columns)
-ax.set_yticklabels(corr_df.index)
+# Rolling Correlation
+st.markdown("---")
+st.subheader("Rolling Correlation with SPY")
 
-plt.setp(ax.get_xticklabels(), rotation=45, ha="right", rotation_mode="anchor")
+window = st.select_slider("Window (trading days)", options=[20, 60, 120, 250], value=60)
+rolling_df = load_rolling_correlation(window)
 
-for i in range(len(corr_df.index)):
-    for j in range(len(corr_df.columns)):
-        text = ax.text(j, i, f'{corr_df.values[i, j]:.2f}',
-                      ha="center", va="center", color="black", fontweight='bold')
+def draw_rolling(fig):
+    ax = fig.subplots()
+    for ticker in rolling_df.columns:
+        ax.plot(rolling_df.index, rolling_df[ticker], label=ticker, linewidth=1.2)
+    ax.set_ylabel('Correlation')
+    ax.set_title(f'{window}-Day Rolling Correlation vs SPY', fontweight='bold', fontsize=14)
+    ax.legend(ncol=len(rolling_df.columns))
+    ax.grid(True, alpha=0.3)
 
-ax.set_title('Security Correlation Matrix', fontweight='bold', fontsize=14)
-fig.colorbar(im, ax=ax)
-st.pyplot(fig)
+show_chart('rolling_correlation', draw_rolling, (rolling_df,), figsize=(12, 5), window=window)
 
 # Detailed Data Table
 st.markdown("---")
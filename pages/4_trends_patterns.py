@@ -1,8 +1,11 @@
 import streamlit as st
 import pandas as pd
-import matplotlib.pyplot as plt
 import numpy as np
 
+from analytics import charts, rolling
+from analytics.dashboard import (cached, date_index, seasonality_table, show_chart, sidebar_filters,
+                                 volume_anomalies, volume_zscores)
+
 st.set_page_config(
     page_title="Trends & Patterns",
 )
@@ -15,40 +18,133 @@ Technical analysis and market trend identification for comprehensive market unde
 This section analyzes price patterns, moving averages, and emerging market trends.
 """)
 
-# Sample Technical Data
+start, end, selected = sidebar_filters()
+
+# Technical Data
 st.subheader(" Technical Indicators")
 
-# Generate sample price data
-dates = pd.date_range(start='2020-01-01', periods=1000, freq='D')
-base_price = 100
-np.random.seed(42)  # For reproducible results
-price_data = base_price + np.cumsum(np.random.randn(1000) * 0.5)
+prices = date_index()
+securities = selected or prices.tickers
+ticker = st.selectbox("Security", securities)
+
+close = prices.column(ticker, 'close', start, end)
+ma_50, ma_200, (cross_rows, _, cross_direction) = cached(
+    'ma_crossovers', lambda: rolling.crossover_signals(close, 50, 200),
+    [ticker], start, end, fast=50, slow=200)
 
 technical_df = pd.DataFrame({
-    'Date': dates,
-    'Price': price_data,
-    'MA_50': pd.Series(price_data).rolling(50).mean(),
-    'MA_200': pd.Series(price_data).rolling(200).mean()
+    'Date': prices.column(ticker, 'date', start, end),
+    'Price': close,
+    'MA_50': ma_50[:, 0],
+    'MA_200': ma_200[:, 0]
 })
 
 # Technical Analysis Chart
-fig, ax = plt.subplots(figsize=(12, 6))
-
-ax.plot(technical_df['Date'], technical_df['Price'], 
-        label='Price', linewidth=1.5, alpha=0.8)
-ax.plot(technical_df['Date'], technical_df['MA_50'], 
-        label='50-Day MA', linewidth=2, color='orange')
-ax.plot(technical_df['Date'], technical_df['MA_200'], 
-        label='200-Day MA', linewidth=2, color='red')
-
-ax.set_title('Price Trends with Moving Averages', fontweight='bold', fontsize=14)
-ax.set_ylabel('Price', fontweight='bold')
-ax.legend()
-ax.grid(True, alpha=0.3)
-plt.xticks(rotation=45)
-plt.tight_layout()
-
-st.pyplot(fig)
+downsample = st.checkbox("Downsample long series for display", value=True,
+                         help="Plot about 800 shape-preserving points (LTTB); crossover markers stay exact.")
+if downsample:
+    keep = charts.lttb(technical_df['Date'].to_numpy().astype('int64'), technical_df['Price'].to_numpy(), 800)
+    # Also keep the first 200-day MA point so that line starts where it should.
+    plot_df = technical_df.iloc[np.union1d(keep, np.flatnonzero(technical_df['MA_200'].notna())[:1])]
+else:
+    plot_df = technical_df
+
+def draw_trends(fig):
+    ax = fig.subplots()
+    
+    ax.plot(plot_df['Date'], plot_df['Price'], 
+            label='Price', linewidth=1.5, alpha=0.8)
+    ax.plot(plot_df['Date'], plot_df['MA_50'], 
+            label='50-Day MA', linewidth=2, color='orange')
+    ax.plot(plot_df['Date'], plot_df['MA_200'], 
+            label='200-Day MA', linewidth=2, color='red')
+    
+    buys = cross_rows[cross_direction == rolling.BUY]
+    sells = cross_rows[cross_direction == rolling.SELL]
+    ax.scatter(technical_df['Date'].iloc[buys], technical_df['MA_50'].iloc[buys],
+               marker='^', s=120, color='green', zorder=3, label='Golden Cross')
+    ax.scatter(technical_df['Date'].iloc[sells], technical_df['MA_50'].iloc[sells],
+               marker='v', s=120, color='darkred', zorder=3, label='Death Cross')
+    
+    ax.set_title(f'{ticker} Price Trends with Moving Averages', fontweight='bold', fontsize=14)
+    ax.set_ylabel('Price', fontweight='bold')
+    ax.legend()
+    ax.grid(True, alpha=0.3)
+    ax.tick_params(axis='x', labelrotation=45)
+    fig.tight_layout()
+
+show_chart('price_trends', draw_trends, (technical_df, cross_rows), figsize=(12, 6),
+           ticker=ticker, downsample=downsample)
+
+# Volume Anomalies
+st.markdown("---")
+st.subheader(" Volume Anomalies")
+
+baselines = {'20-day rolling': (20, 'rolling'), '60-day rolling': (60, 'rolling'),
+             '20-day EWMA': (20, 'ewma')}
+baseline = st.radio("Baseline", list(baselines), horizontal=True,
+                    help="Each day's volume is scored against the window that ends the day before.")
+window, method = baselines[baseline]
+z_dates, z_tickers, z_scores, _ = volume_zscores(window, method, start, end, selected)
+ticker_z = pd.Series(z_scores[:, z_tickers.index(ticker)], index=z_dates)
+ticker_volume = pd.Series(prices.column(ticker, 'volume', start, end), index=technical_df['Date'])
+spikes = ticker_z[ticker_z > 2].index
+
+def draw_volume(fig):
+    ax = fig.subplots()
+    ax.bar(ticker_volume.index, ticker_volume.values, width=1.0, color='steelblue', alpha=0.5,
+           label='Volume')
+    ax.bar(spikes, ticker_volume.reindex(spikes).values, width=3.0, color='red',
+           label='z-score > 2')
+    ax.set_title(f'{ticker} Daily Volume ({baseline} baseline)', fontweight='bold', fontsize=14)
+    ax.set_ylabel('Shares', fontweight='bold')
+    ax.legend()
+    ax.grid(True, alpha=0.3)
+    fig.tight_layout()
+
+show_chart('volume_anomalies', draw_volume, (ticker_volume, spikes.to_numpy()), figsize=(12, 4),
+           ticker=ticker, baseline=baseline)
+
+st.write(f"**Largest volume anomalies across all securities** ({len(spikes)} flagged days for {ticker})")
+st.dataframe(volume_anomalies(window, method, start=start, end=end, tickers=selected).round(2),
+             use_container_width=True, hide_index=True)
+
+# Seasonality
+st.markdown("---")
+st.subheader(" Seasonal Patterns")
+
+groupings = {'Calendar month': 'month', 'Quarter': 'quarter', 'Weekday': 'weekday',
+             'Turn of month': 'turn_of_month'}
+grouping = st.radio("Group returns by", list(groupings), horizontal=True,
+                    help="Months and quarters use each period's first-to-last close; weekdays and "
+                         "turn of month (last trading day plus the first three) use daily returns.")
+season_df = seasonality_table(groupings[grouping], start, end, selected)
+scope = st.selectbox("Securities", ['All securities'] + securities, key='season_scope')
+season = season_df[season_df['Ticker'] == ('ALL' if scope == 'All securities' else scope)]
+
+def draw_seasonality(fig):
+    ax = fig.subplots()
+    significant = season['p-value'] < 0.05
+    colors = np.where(season['Mean %'] >= 0,
+                      np.where(significant, 'seagreen', 'lightgreen'),
+                      np.where(significant, 'firebrick', 'lightcoral'))
+    error = 1.96 * season['Std %'] / np.sqrt(season['Observations'])
+    ax.bar(season['Period'], season['Mean %'], yerr=error, color=colors, capsize=4)
+    ax.axhline(0, color='black', linewidth=0.8)
+    ax.set_ylabel('Mean Return (%)', fontweight='bold')
+    ax.set_title(f'{scope}: Mean Return by {grouping} (95% interval; dark = p < 0.05)',
+                 fontweight='bold', fontsize=14)
+    hits = ax.twinx()
+    hits.plot(season['Period'], season['Hit Rate %'], color='navy', marker='o', label='Hit rate')
+    hits.set_ylabel('Hit Rate (%)')
+    hits.set_ylim(0, 100)
+    hits.legend(loc='upper right')
+    ax.grid(True, alpha=0.3)
+    fig.tight_layout()
+
+show_chart('seasonality', draw_seasonality, (season,), figsize=(12, 5), scope=scope, grouping=grouping)
+
+st.dataframe(season.drop(columns='Ticker').round(3), use_container_width=True, hide_index=True)
 
 # Market Insights
 st.markdown("---")
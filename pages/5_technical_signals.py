@@ -1,68 +1,74 @@
 import streamlit as st
 import pandas as pd
-import numpy as np
-import matplotlib.pyplot as plt
+
+from analytics.dashboard import crossover_backtest, show_chart, sidebar_filters, technical_table
 
 st.set_page_config(
     page_title="Technical Analysis",
     layout="wide"
 )
 
+# Tickers shown as metrics and bars; the full universe is in the indicators table.
+SUMMARY_TICKERS = 6
+
 def main():
     st.title("Technical Analysis")
     st.markdown("---")
     
-    st.write("Technical indicators and market signal analysis.")
+    st.write("Technical indicators and market signal analysis, computed from the latest prices in the selected date range.")
+    
+    start, end, selected = sidebar_filters()
+    window = dict(start=start, end=end, tickers=selected)
     
     # Technical data
-    tech_data = {
-        'Ticker': ['TSLA', 'GOOGL', 'AMZN', 'MSFT', 'AAPL', 'SPY'],
-        'RSI': [45.2, 52.8, 38.7, 58.9, 49.3, 53.1],
-        'Trend': ['Neutral', 'Bullish', 'Bearish', 'Bullish', 'Neutral', 'Neutral'],
-        '50D vs 200D MA': ['Above', 'Above', 'Below', 'Above', 'Above', 'Above'],
-        'Signal': ['Hold', 'Buy', 'Sell', 'Buy', 'Hold', 'Hold']
-    }
+    tech_df = technical_table(**window)
     
-    tech_df = pd.DataFrame(tech_data)
+    # Strongest signals first: Buy/Sell before Hold, then by RSI distance from 50.
+    strength = (tech_df['Signal'] != 'Hold') * 100 + (tech_df['RSI'] - 50).abs()
+    ranked = tech_df.loc[strength.sort_values(ascending=False, kind='stable').index]
+    strongest = ranked.head(SUMMARY_TICKERS)
     
     # Signal Overview
     st.subheader("Current Signals")
+    if len(tech_df) > len(strongest):
+        st.caption(f"The {len(strongest)} strongest of {len(tech_df)} tickers; "
+                   "all of them are listed under Technical Indicators.")
     
-    cols = st.columns(6)
-    for i, (_, row) in enumerate(tech_df.iterrows()):
-        with cols[i]:
-            signal_color = {'Buy': 'green', 'Sell': 'red', 'Hold': 'gray'}[row['Signal']]
+    cols = st.columns(len(strongest))
+    for col, ticker, signal, rsi in zip(cols, strongest['Ticker'], strongest['Signal'], strongest['RSI']):
+        with col:
             st.metric(
-                label=row['Ticker'],
-                value=row['Signal'],
-                delta=f"RSI: {row['RSI']}"
+                label=ticker,
+                value=signal,
+                delta=f"RSI: {rsi}"
             )
     
     # RSI Analysis
     st.subheader("RSI Analysis")
     
-    fig, ax = plt.subplots(figsize=(10, 5))
-    
-    colors = ['red' if rsi > 70 else 'green' if rsi < 30 else 'steelblue' 
-             for rsi in tech_df['RSI']]
-    
-    bars = ax.bar(tech_df['Ticker'], tech_df['RSI'], color=colors, alpha=0.7)
-    
-    ax.axhline(y=70, color='red', linestyle='--', alpha=0.7, label='Overbought')
-    ax.axhline(y=30, color='green', linestyle='--', alpha=0.7, label='Oversold')
-    ax.axhline(y=50, color='gray', linestyle='-', alpha=0.5)
-    
-    ax.set_ylabel('RSI Value')
-    ax.set_title('Relative Strength Index (14-period)')
-    ax.legend()
-    ax.grid(True, alpha=0.3)
-    
-    for bar in bars:
-        height = bar.get_height()
-        ax.text(bar.get_x() + bar.get_width()/2, height + 1,
-                f'{height:.1f}', ha='center', va='bottom')
-    
-    st.pyplot(fig)
+    def draw_rsi(fig):
+        ax = fig.subplots()
+        
+        colors = ['red' if rsi > 70 else 'green' if rsi < 30 else 'steelblue' 
+                 for rsi in strongest['RSI']]
+        
+        bars = ax.bar(strongest['Ticker'], strongest['RSI'], color=colors, alpha=0.7)
+        
+        ax.axhline(y=70, color='red', linestyle='--', alpha=0.7, label='Overbought')
+        ax.axhline(y=30, color='green', linestyle='--', alpha=0.7, label='Oversold')
+        ax.axhline(y=50, color='gray', linestyle='-', alpha=0.5)
+        
+        ax.set_ylabel('RSI Value')
+        ax.set_title('Relative Strength Index (14-period)')
+        ax.legend()
+        ax.grid(True, alpha=0.3)
+        
+        for bar in bars:
+            height = bar.get_height()
+            ax.text(bar.get_x() + bar.get_width()/2, height + 1,
+                    f'{height:.1f}', ha='center', va='bottom')
+        
+    show_chart('rsi', draw_rsi, (strongest,), figsize=(10, 5))
     
     # Moving Average Analysis
     st.subheader("Trend Analysis")
@@ -77,32 +83,67 @@ def main():
     # Trading Signals
     st.subheader("Trading Recommendations")
     
-    buy_signals = tech_df[tech_df['Signal'] == 'Buy']
-    sell_signals = tech_df[tech_df['Signal'] == 'Sell']
+    buy_signals = ranked[ranked['Signal'] == 'Buy']
+    sell_signals = ranked[ranked['Signal'] == 'Sell']
     
     col1, col2 = st.columns(2)
     
+    def recommendations(signals):
+        shown = signals.head(SUMMARY_TICKERS)
+        lines = '\n'.join('- ' + shown['Ticker'] + ': RSI ' + shown['RSI'].astype(str)
+                          + ', Trend: ' + shown['Trend'])
+        if len(signals) > len(shown):
+            lines += f"\n- ... and {len(signals) - len(shown)} more"
+        return lines
+    
     with col1:
         if not buy_signals.empty:
             st.write("**Buy Recommendations:**")
-            for _, stock in buy_signals.iterrows():
-                st.write(f"- {stock['Ticker']}: RSI {stock['RSI']}, Trend: {stock['Trend']}")
+            st.markdown(recommendations(buy_signals))
         else:
             st.write("No strong buy signals at this time.")
     
     with col2:
         if not sell_signals.empty:
             st.write("**Sell Recommendations:**")
-            for _, stock in sell_signals.iterrows():
-                st.write(f"- {stock['Ticker']}: RSI {stock['RSI']}, Trend: {stock['Trend']}")
+            st.markdown(recommendations(sell_signals))
         else:
             st.write("No sell signals at this time.")
     
+    # Crossover Backtest
+    st.subheader("Moving Average Crossover Backtest")
+    st.write("Long while the fast average is above the slow one by more than the threshold, "
+             "flat otherwise; signals at the close, held over the next day.")
+    
+    results = crossover_backtest(**window)
+    threshold = st.radio("Threshold", sorted(results['threshold'].unique()), horizontal=True,
+                         format_func=lambda t: f"{t:.0%}")
+    at_threshold = results[results['threshold'] == threshold]
+    grid = at_threshold.pivot_table(index='fast', columns='slow', values='Sharpe Ratio', aggfunc='mean')
+    
+    def draw_sweep(fig):
+        ax = fig.subplots()
+        
+        image = ax.imshow(grid.values, cmap='RdYlGn', aspect='auto', origin='lower')
+        ax.set_xticks(range(len(grid.columns)), grid.columns)
+        ax.set_yticks(range(len(grid.index)), grid.index)
+        ax.set_xlabel('Slow Window (days)')
+        ax.set_ylabel('Fast Window (days)')
+        ax.set_title('Average Sharpe Ratio Across Tickers')
+        fig.colorbar(image, ax=ax, label='Sharpe Ratio')
+    
+    show_chart('crossover_sweep', draw_sweep, (grid,), figsize=(10, 6), threshold=threshold)
+    
+    classic = at_threshold[(at_threshold['fast'] == 50) & (at_threshold['slow'] == 200)]
+    st.write("**50/200-day crossover by ticker:**")
+    st.dataframe(classic.drop(columns=['fast', 'slow', 'threshold']).round(2),
+                 use_container_width=True, hide_index=True)
+    
     # Market Outlook
     st.subheader("Market Outlook")
     
-    bullish_count = len(tech_df[tech_df['Trend'] == 'Bullish'])
-    bearish_count = len(tech_df[tech_df['Trend'] == 'Bearish'])
+    bullish_count = int((tech_df['Trend'] == 'Bullish').sum())
+    bearish_count = int((tech_df['Trend'] == 'Bearish').sum())
     
     if bullish_count > bearish_count:
         st.info("Overall market bias: **Bullish**")
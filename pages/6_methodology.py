@@ -1,6 +1,9 @@
 import streamlit as st
 import pandas as pd
 
+from analytics.dashboard import cache_stats
+from analytics.metrics import METRIC_DEFINITIONS
+
 st.set_page_config(
     page_title="Methodology & Approach",
     page_icon="📚",
@@ -58,26 +61,9 @@ def main():
     
     # Metrics Explanation
     st.subheader("Key Performance Metrics")
+    st.caption("These are the definitions computed by `analytics/metrics.py` for the Performance and Risk pages.")
     
-    metrics_data = {
-        'Metric': ['Total Return', 'Annualized Return', 'Volatility', 'Outperformance', 'Maximum Drawdown'],
-        'Calculation': [
-            'Simple percentage return over entire period',
-            'Compound Annual Growth Rate (CAGR)',
-            'Standard deviation of daily returns (annualized)',
-            'Return comparison against SPY benchmark',
-            'Maximum peak-to-trough decline during period'
-        ],
-        'Purpose': [
-            'Overall performance measurement',
-            'Standardized annual performance',
-            'Risk and variability assessment',
-            'Relative performance analysis',
-            'Risk management indicator'
-        ]
-    }
-    
-    metrics_df = pd.DataFrame(metrics_data)
+    metrics_df = pd.DataFrame(METRIC_DEFINITIONS, columns=['Metric', 'Calculation', 'Purpose'])
     st.dataframe(metrics_df, use_container_width=True, hide_index=True)
     
     # Technical Analysis Framework
@@ -173,6 +159,13 @@ def main():
         - **Responsive Design**: Mobile-friendly interface adaptation
         - **Real-time Capability**: Framework supports live data integration
         """)
+        
+        stats = cache_stats()
+        st.caption(
+            f"Metric cache: {stats['entries']} entries, {stats['bytes'] / 1e6:.1f} MB, "
+            f"{stats['hits']} hits / {stats['misses']} misses "
+            f"({stats['hit_rate']:.0%} hit rate)"
+        )
     
     # Disclaimer Section
     st.markdown("---")
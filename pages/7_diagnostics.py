@@ -0,0 +1,85 @@
+import streamlit as st
+import pandas as pd
+
+from analytics import instrument
+from analytics.dashboard import cache_stats, chart_cache_stats, current_snapshot, session_id
+
+st.set_page_config(
+    page_title="Diagnostics",
+    layout="wide"
+)
+
+def main():
+    st.title("Diagnostics")
+    st.markdown("---")
+
+    if not instrument.enabled():
+        st.info("Instrumentation is off. Start the dashboard with `ANALYTICS_INSTRUMENT=1` "
+                "to record load, compute and chart timings.")
+        return
+
+    scope = st.radio("Scope", ["This session", "All sessions"], horizontal=True)
+    session = session_id() if scope == "This session" else None
+
+    summary = instrument.recorder().summary(session)
+    counters = instrument.recorder().counters(session)
+
+    def hit_rate(kind):
+        hits, misses = counters.get(f'{kind}.hit', 0), counters.get(f'{kind}.miss', 0)
+        return f"{hits / (hits + misses):.0%}" if hits + misses else "n/a"
+
+    metric_stats, chart_stats = cache_stats(), chart_cache_stats()
+
+    col1, col2, col3, col4 = st.columns(4)
+
+    with col1:
+        st.metric("Metric Cache Hit Rate", hit_rate('cache'),
+                  f"{metric_stats['bytes'] / 1e6:.1f} MB cached", delta_color="off")
+
+    with col2:
+        st.metric("Chart Cache Hit Rate", hit_rate('chart'),
+                  f"{chart_stats['bytes'] / 1e6:.1f} MB cached", delta_color="off")
+
+    with col3:
+        st.metric("Process Memory (RSS)", f"{instrument.memory_mb():.0f} MB")
+
+    with col4:
+        st.metric("Recorded Spans", f"{sum(row['count'] for row in summary.values()):,}")
+
+    bundle = current_snapshot()
+    if bundle is None:
+        st.caption("No snapshot bundle for the current data; every view is computed on demand.")
+    else:
+        st.caption(f"Serving snapshot {bundle.version} (published {bundle.created}, {len(bundle)} "
+                   f"precomputed views); {counters.get('snapshot.hit', 0):,} lookups answered from it.")
+
+    # Latency by span
+    st.subheader("Latency by Stage")
+    st.caption("Spans nest: a chart render includes its render.matplotlib time and a "
+               "computation includes the loads it triggers, so stage totals overlap.")
+
+    if not summary:
+        st.write("Nothing recorded yet; open a few pages first.")
+        return
+
+    table = pd.DataFrame.from_dict(summary, orient='index')
+    table.insert(0, 'stage', table.index.str.split('.').str[0])
+    table[['total', 'mean', 'p50', 'p90', 'p99', 'max']] *= 1000
+    table = table.rename(columns={'total': 'total ms', 'mean': 'mean ms', 'p50': 'p50 ms',
+                                  'p90': 'p90 ms', 'p99': 'p99 ms', 'max': 'max ms'})
+
+    by_stage = table.groupby('stage')[['count', 'total ms']].sum()
+    st.dataframe(by_stage.round(1), use_container_width=True)
+    st.dataframe(table.sort_values('total ms', ascending=False).round(2), use_container_width=True)
+
+    # Export
+    extra = {'metric_cache_bytes': metric_stats['bytes'], 'chart_cache_bytes': chart_stats['bytes']}
+    with st.expander("Prometheus metrics"):
+        st.code(instrument.prometheus(session, extra), language="text")
+
+    if st.button("Reset recorded timings"):
+        instrument.recorder().reset()
+        st.rerun()
+
+if __name__ == "__main__":
+    main()
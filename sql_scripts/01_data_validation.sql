@@ -1,6 +1,7 @@
 -- ==========================================
 -- DATA VALIDATION & CLEANING
 -- Business Need: Ensure data quality before analysis
+-- Python equivalent: analytics/quality.py (adds row-level and calendar checks)
 -- ==========================================
 
 -- Check for duplicates